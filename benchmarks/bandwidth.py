@@ -0,0 +1,94 @@
+"""
+Bytes transferred by repeated provider searches, with and without
+compression and conditional requests.
+
+Runs the same searches against the stub server for several rounds, as a
+frequent schedule would, once with a plain transport (identity encoding, no
+validators) and once with the default one (gzip/brotli, ETag revalidation).
+The response cache is off in both, so every round goes to the network.
+Reports, per provider, the bytes received, the 304s and the bytes saved.
+
+Usage:
+    python benchmarks/bandwidth.py --rounds 10 --records 50
+"""
+
+import argparse
+import os
+import time
+from datetime import datetime
+
+import harness
+from stub_server import StubConfig, StubServer
+
+from service.http_client import HttpClient
+from service.service_arxiv import ArxivAPI
+from service.service_cambrige import CambridgeAPI
+from service.service_explorerieee import XploreAPI
+from service.service_springer import SpringerAPI
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+TERMS = ["machine learning", "robotics", "quantum computing"]
+
+
+def getargs():
+    parser = argparse.ArgumentParser(description="Measure provider bandwidth per transport mode.")
+    parser.add_argument("--rounds", type=int, default=10, help="Times every search is repeated.")
+    parser.add_argument("--records", type=int, default=50, help="Records per response.")
+    parser.add_argument("--latency-ms", type=float, default=5.0, help="Stub latency per request.")
+    parser.add_argument("--output", help="Where to save the report JSON.")
+    return parser.parse_args()
+
+
+def make_apis(urls, http, records):
+    ArxivAPI.BASE_URL = urls["arxiv"]
+    CambridgeAPI.BASE_URL = urls["cambridge"]
+    XploreAPI.BASE_URL = urls["xplore"]
+    SpringerAPI.BASE_URL = urls["springer"]
+    return {
+        "arxiv": ArxivAPI(max_results=records, http=http),
+        "cambridge": CambridgeAPI(max_results=records, http=http),
+        "xplore": XploreAPI("benchmark", http=http),
+        "springer": SpringerAPI("benchmark", max_results=records, http=http),
+    }
+
+
+def run_mode(urls, args, plain):
+    http = HttpClient(cache_ttl=0, revalidate=not plain)
+    if plain:
+        http.session.headers["Accept-Encoding"] = "identity"
+    apis = make_apis(urls, http, args.records)
+    start = time.perf_counter()
+    for _ in range(args.rounds):
+        for api in apis.values():
+            api.search_multiple_terms(TERMS)
+    elapsed = time.perf_counter() - start
+    http.close()
+    return {"elapsed_s": elapsed, "traffic": http.traffic_report()}
+
+
+def main():
+    args = getargs()
+    server = StubServer(StubConfig(latency_ms=args.latency_ms, records=args.records)).start()
+    try:
+        urls = server.provider_urls()
+        plain = run_mode(urls, args, plain=True)
+        optimized = run_mode(urls, args, plain=False)
+    finally:
+        server.stop()
+
+    report = {"config": vars(args), "plain": plain, "optimized": optimized}
+    print(f"{'provider':<10} {'plain bytes':>12} {'optimized bytes':>16} {'304s':>6} {'reduction':>10}")
+    for provider in sorted(plain["traffic"]):
+        before = plain["traffic"][provider].get("wire_bytes", 0)
+        after = optimized["traffic"].get(provider, {}).get("wire_bytes", 0)
+        not_modified = optimized["traffic"].get(provider, {}).get("not_modified", 0)
+        print(f"{provider:<10} {before:>12} {after:>16} {not_modified:>6} {1 - after / max(before, 1):>9.1%}")
+    print(f"\nElapsed: plain {plain['elapsed_s']:.2f} s, optimized {optimized['elapsed_s']:.2f} s")
+    output = args.output or os.path.join(
+        RESULTS_DIR, "bandwidth-" + datetime.now().strftime("%Y%m%d-%H%M%S") + ".json")
+    harness.save_results(output, report)
+    print(f"Results saved to {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""
+Throughput of the schema-driven decoders in ``models.response_api``: one
+case per provider schema, plus the JSON decoder on its own (orjson when it
+is installed, the standard library otherwise) and, when feedparser is
+installed, the path the arXiv provider used before, for comparison.
+"""
+
+import importlib.util
+import json
+
+import payloads
+
+
+def _schema(name, body):
+    from models import response_api
+
+    schema = getattr(response_api, name)
+    return lambda: schema.decode(body)
+
+
+def _arxiv_feedparser(size):
+    import feedparser
+    from models.paper_model import ArticleMetadata
+
+    body = payloads.arxiv_atom(size)
+
+    def run():
+        feed = feedparser.parse(body.decode("utf-8"))
+        return [ArticleMetadata(entry.title, entry.summary, entry.published, entry.link)
+                for entry in feed.entries]
+    return run
+
+
+def _json_stdlib(size):
+    body = payloads.springer_records(size)
+    return lambda: json.loads(body)
+
+
+def _json_fast(size):
+    from models.response_api import loads
+
+    body = payloads.springer_records(size)
+    return lambda: loads(body)
+
+
+def register(suite):
+    from models.response_api import FAST_JSON
+
+    FEEDPARSER = importlib.util.find_spec("feedparser") is not None
+
+    for size in suite.sizes:
+        suite.add("decode.arxiv", size, lambda size=size: _schema("ARXIV", payloads.arxiv_atom(size)))
+        if FEEDPARSER:
+            suite.add("decode.arxiv.feedparser", size, lambda size=size: _arxiv_feedparser(size))
+        suite.add("decode.cambridge", size, lambda size=size: _schema("CAMBRIDGE", payloads.cambridge_items(size)))
+        suite.add("decode.xplore", size, lambda size=size: _schema("XPLORE", payloads.xplore_articles(size)))
+        suite.add("decode.springer", size, lambda size=size: _schema("SPRINGER", payloads.springer_records(size)))
+        suite.add("decode.json.stdlib", size, lambda size=size: _json_stdlib(size))
+        if FAST_JSON:
+            suite.add("decode.json.orjson", size, lambda size=size: _json_fast(size))
@@ -0,0 +1,43 @@
+"""
+Discord channel lookup: the linear scan over every channel of every guild
+that ``get_channel_if`` used to do, against the ChannelIndex. The size is the
+number of guilds, with 20 channels each.
+"""
+
+from types import SimpleNamespace
+
+CHANNELS_PER_GUILD = 20
+
+
+def _channels(guilds):
+    channels = []
+    for g in range(guilds):
+        guild = SimpleNamespace(id=g, name=f"guild-{g}")
+        for c in range(CHANNELS_PER_GUILD):
+            channels.append(SimpleNamespace(id=g * 1000 + c, name=f"channel-{g}-{c}", guild=guild))
+    return channels
+
+
+def _scan(guilds):
+    import discord
+
+    channels = _channels(guilds)
+    target = channels[-1].name
+    # Como get_all_channels(), el generador se recorre de nuevo en cada búsqueda
+    return lambda: discord.utils.get(iter(channels), name=target)
+
+
+def _index(guilds):
+    from chats.discord_channels import ChannelIndex
+
+    channels = _channels(guilds)
+    index = ChannelIndex()
+    index.rebuild(channels)
+    target = channels[-1].name
+    return lambda: index.get(target)
+
+
+def register(suite):
+    for size in suite.sizes:
+        suite.add("discord.channel_lookup.scan", size, lambda size=size: _scan(size))
+        suite.add("discord.channel_lookup.index", size, lambda size=size: _index(size))
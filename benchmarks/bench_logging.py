@@ -0,0 +1,22 @@
+"""
+Cost of a log call on the caller's thread with the queue-based pipeline.
+"""
+
+import tempfile
+
+
+def _log_calls(size):
+    from models.logger_model import LoggerConfig, configure_logging
+
+    configure_logging(log_folder=tempfile.mkdtemp(prefix="botpaper-bench-"), console=False)
+    logger = LoggerConfig(name="BenchmarkLogger", log_file="benchmark.log").get_logger()
+
+    def run():
+        for i in range(size):
+            logger.info(f"Found {i} articles in arxiv.")
+    return run
+
+
+def register(suite):
+    for size in suite.sizes:
+        suite.add("logging.info", size, lambda size=size: _log_calls(size))
@@ -0,0 +1,83 @@
+"""
+Post-processing steps run on every digest: date parsing, deduplication,
+sorting, formatting and Discord embed packing.
+"""
+
+import random
+from types import SimpleNamespace
+
+from harness import quiet_logger
+import payloads
+
+
+def _articles(size, duplicate_ratio=0.0):
+    """Builds ``size`` articles from the date samples, repeating a share of them."""
+    from models.paper_model import ArticleMetadata
+
+    rng = random.Random(size)
+    unique = max(1, int(size * (1 - duplicate_ratio)))
+    base = [
+        ArticleMetadata(
+            title=f"Paper {i}",
+            summary="Lorem ipsum " * 20,
+            published=payloads.DATE_SAMPLES[i % len(payloads.DATE_SAMPLES)],
+            link=f"http://arxiv.org/abs/2310.{i:05d}v1",
+        )
+        for i in range(unique)
+    ]
+    articles = base + [rng.choice(base) for _ in range(size - unique)]
+    rng.shuffle(articles)
+    return articles
+
+
+def _searcher():
+    from service.api_consumer import ResearchPaperSearcher
+    return ResearchPaperSearcher({}, logger=quiet_logger())
+
+
+def _parse_date(size):
+    from models.paper_model import ArticleMetadata
+
+    article = ArticleMetadata("title", "summary", "2023", "link")
+    dates = [payloads.DATE_SAMPLES[i % len(payloads.DATE_SAMPLES)] for i in range(size)]
+
+    def run():
+        for date in dates:
+            article._parse_date(date)
+    return run
+
+
+def _filter_unique(size):
+    searcher = _searcher()
+    articles = _articles(size, duplicate_ratio=0.3)
+    return lambda: searcher.filter_unique_articles(articles)
+
+
+def _sort_by_date(size):
+    searcher = _searcher()
+    articles = _articles(size)
+    return lambda: searcher.sort_by_date(articles)
+
+
+def _format_articles(size):
+    from infrastructure.bot_abstract import AbstractChatBot
+
+    bot = SimpleNamespace(logger=quiet_logger())
+    articles = _articles(size)
+    return lambda: AbstractChatBot.format_articles(bot, articles)
+
+
+def _pack_embeds(size):
+    from chats.discord_digest import pack_embeds
+
+    articles = _articles(size)
+    return lambda: pack_embeds(articles)
+
+
+def register(suite):
+    for size in suite.sizes:
+        suite.add("model.parse_date", size, lambda size=size: _parse_date(size))
+        suite.add("searcher.filter_unique_articles", size, lambda size=size: _filter_unique(size))
+        suite.add("searcher.sort_by_date", size, lambda size=size: _sort_by_date(size))
+        suite.add("bot.format_articles", size, lambda size=size: _format_articles(size))
+        suite.add("discord.pack_embeds", size, lambda size=size: _pack_embeds(size))
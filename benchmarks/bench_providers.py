@@ -0,0 +1,75 @@
+"""
+Parsing cost of each provider's ``search``.
+
+The HTTP transport is replaced by one returning the recorded payload, with
+the response cache off, so the timings cover decoding the body and mapping
+every record to ``ArticleMetadata``.
+"""
+
+from unittest import mock
+
+import payloads
+
+
+def _client(body: bytes):
+    """HTTP client without cache or revalidation whose transport returns ``body`` for every request."""
+    from service.http_client import Fetched, HttpClient
+
+    client = HttpClient(cache_ttl=0, revalidate=False)
+    client._fetch = mock.Mock(return_value=Fetched(200, body, wire_bytes=len(body)))
+    return client
+
+
+def _arxiv(size):
+    from service.service_arxiv import ArxivAPI
+
+    api = ArxivAPI(max_results=size, http=_client(payloads.arxiv_atom(size)))
+
+    def run():
+        result = api.search(["ml"], ["all"])
+        assert len(result.data) == size, result
+    return run
+
+
+def _cambridge(size):
+    from service.service_cambrige import CambridgeAPI
+
+    api = CambridgeAPI(max_results=size, http=_client(payloads.cambridge_items(size)))
+
+    def run():
+        result = api.search(term="ml", limit=size)
+        assert len(result.data) == size, result
+    return run
+
+
+def _xplore(size):
+    from service.service_explorerieee import XploreAPI
+
+    api = XploreAPI(api_access_key="benchmark", http=_client(payloads.xplore_articles(size)))
+
+    def run():
+        result = api.search({"querytext": "ml"}, {}, {})
+        assert result.data, result
+    return run
+
+
+def _springer(size):
+    from service.service_springer import SpringerAPI
+
+    api = SpringerAPI(api_access_key="benchmark", max_results=size,
+                      http=_client(payloads.springer_records(size, total=size)))
+    # Una sola página con todos los registros (sin el tope de la API): se mide la decodificación, no la paginación
+    api.page_size = size
+
+    def run():
+        result = api.search(["ml"], ["all"])
+        assert len(result.data) == size, result
+    return run
+
+
+def register(suite):
+    for size in suite.sizes:
+        suite.add("provider.arxiv.search", size, lambda size=size: _arxiv(size))
+        suite.add("provider.cambridge.search", size, lambda size=size: _cambridge(size))
+        suite.add("provider.xplore.search", size, lambda size=size: _xplore(size))
+        suite.add("provider.springer.search", size, lambda size=size: _springer(size))
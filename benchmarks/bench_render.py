@@ -0,0 +1,33 @@
+"""
+Digest building per platform, with the fragment cache cold (every article
+rendered again, as before the cache) and warm (the same articles already sent
+to another channel or on an earlier tick). The size is the number of articles.
+"""
+
+import bench_pipeline
+
+
+def _digest(size, platform, warm):
+    from chats import rendering
+    from chats.discord_digest import pack_embeds
+    from chats.matrix_digest import pack_html
+    from chats.slack_digest import pack_blocks
+
+    pack = {"discord": pack_embeds, "slack": pack_blocks, "matrix": pack_html}[platform]
+    articles = bench_pipeline._articles(size)
+    cache = rendering.FRAGMENTS
+    cache.resize(max(cache.size, size * 3))
+
+    def run():
+        if not warm:
+            cache.clear()
+        return pack(articles)
+    run()
+    return run
+
+
+def register(suite):
+    for size in suite.sizes:
+        for platform in ("discord", "slack", "matrix"):
+            suite.add(f"render.{platform}.cold", size, lambda size=size, platform=platform: _digest(size, platform, False))
+            suite.add(f"render.{platform}.warm", size, lambda size=size, platform=platform: _digest(size, platform, True))
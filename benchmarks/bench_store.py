@@ -0,0 +1,33 @@
+"""
+Startup cost of the SQLite schedule store: opening it and reading the first
+page of due schedules should not grow with the number of schedules stored.
+"""
+
+import os
+import tempfile
+import time
+
+
+def _startup(size):
+    from models.paper_model import Schedule
+    from service.schedule_store import ScheduleStore
+
+    path = os.path.join(tempfile.mkdtemp(prefix="botpaper-bench-"), "schedules.db")
+    store = ScheduleStore(path)
+    store.upsert_many(
+        Schedule(channel=f"channel-{i}", app="discord", cron_schedule=f"{i % 60} * * * *",
+                 search_keywords=["machine learning", "robotics"])
+        for i in range(size))
+    store.close()
+
+    def run():
+        store = ScheduleStore(path)
+        store.next_due_at()
+        store.due(time.time() + 3600, limit=200)
+        store.close()
+    return run
+
+
+def register(suite):
+    for size in suite.sizes:
+        suite.add("store.startup", size, lambda size=size: _startup(size))
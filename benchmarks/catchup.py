@@ -0,0 +1,109 @@
+"""
+Catch-up of the fires missed while the dispatcher was stopped.
+
+Fills a schedule store with ``--schedules`` schedules (every minute, every
+five minutes and hourly), "stops" the process for ``--downtime`` minutes and
+then runs one dispatch on a StoreDispatcher per misfire mode. Catch-up runs
+are recorded with their delay instead of being slept on. The report shows,
+for each mode, how many runs were started and the most runs started in any
+one second, with and without ``--spread``.
+
+Usage:
+    python benchmarks/catchup.py --schedules 2000 --downtime 30 --spread 300
+"""
+
+import argparse
+import asyncio
+import os
+import tempfile
+from collections import Counter
+from datetime import datetime
+
+import harness
+
+from bot import StoreDispatcher
+from models.paper_model import Schedule
+from service.misfire import MISFIRE_MODES, CatchUpPolicy
+from service.schedule_store import ScheduleStore
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+
+CRONS = ["* * * * *", "*/5 * * * *", "0 * * * *"]
+
+
+class RecordingDispatcher(StoreDispatcher):
+    """Records when each run would start instead of searching and notifying."""
+
+    def __init__(self, store, catch_up):
+        super().__init__(store, {}, lambda app: "token", catch_up=catch_up)
+        self.starts = []
+
+    def _start(self, run, schedule):
+        run.close()
+
+    def _run_later(self, schedule, delay):
+        self.starts.append(delay)
+        return super()._run_later(schedule, delay)
+
+
+def getargs():
+    parser = argparse.ArgumentParser(description="Measure the catch-up after a dispatcher restart.")
+    parser.add_argument("--schedules", type=int, default=2000)
+    parser.add_argument("--downtime", type=float, default=30.0, help="Minutes the dispatcher was stopped.")
+    parser.add_argument("--spread", type=float, default=300.0)
+    parser.add_argument("--max-runs", type=int, default=10)
+    parser.add_argument("--output", help="Where to save the report JSON.")
+    return parser.parse_args()
+
+
+def seed(path, count):
+    store = ScheduleStore(path)
+    store.sync([Schedule(channel=f"channel-{i}", app="discord", cron_schedule=CRONS[i % len(CRONS)],
+                         search_keywords=["robotics"], id=f"schedule-{i:05d}") for i in range(count)])
+    start = store.next_due_at()
+    store.close()
+    return start
+
+
+def restart(path, start, downtime, policy):
+    """One dispatch, ``downtime`` minutes after the first fire time, on a fresh copy of the store."""
+    store = ScheduleStore(path)
+    dispatcher = RecordingDispatcher(store, policy)
+    dispatched = dispatcher.dispatch_due(start + downtime * 60)
+    store.close()
+    per_second = Counter(int(delay) for delay in dispatcher.starts)
+    return {
+        "on_time_runs": dispatched - len(dispatcher.starts),
+        "catch_up_runs": len(dispatcher.starts),
+        "peak_starts_per_second": max(per_second.values(), default=0),
+        "last_start_s": max(dispatcher.starts, default=0.0),
+    }
+
+
+async def measure(args, folder):
+    report = {}
+    for mode in MISFIRE_MODES:
+        for spread in (0.0, args.spread):
+            path = os.path.join(folder, f"{mode}-{spread:.0f}.db")
+            start = seed(path, args.schedules)
+            policy = CatchUpPolicy(mode=mode, spread=spread, max_runs=args.max_runs)
+            report[f"{mode}, spread {spread:.0f} s"] = restart(path, start, args.downtime, policy)
+    return report
+
+
+def main():
+    args = getargs()
+    with tempfile.TemporaryDirectory() as folder:
+        results = asyncio.run(measure(args, folder))
+    print(f"{args.schedules} schedules, stopped for {args.downtime:.0f} minutes")
+    for name, result in results.items():
+        print(f"  {name:<24} {result['catch_up_runs']:>6} catch-up runs, "
+              f"peak {result['peak_starts_per_second']:>6}/s, last after {result['last_start_s']:.0f} s")
+    output = args.output or os.path.join(
+        RESULTS_DIR, "catchup-" + datetime.now().strftime("%Y%m%d-%H%M%S") + ".json")
+    harness.save_results(output, {"config": vars(args), "results": results})
+    print(f"\nResults saved to {output}")
+
+
+if __name__ == "__main__":
+    main()
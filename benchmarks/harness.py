@@ -0,0 +1,155 @@
+"""
+Small timing harness shared by the benchmark modules.
+
+Each benchmark module exposes ``register(suite)`` and adds cases with
+``suite.add(name, size, setup)``, where ``setup()`` returns the zero-argument
+callable that is timed. Results are written as JSON so two runs can be
+compared with ``compare_results``.
+"""
+
+import json
+import logging
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import timeit
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SRC_DIR = os.path.join(ROOT_DIR, "src")
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+if SRC_DIR not in sys.path:
+    sys.path.insert(0, SRC_DIR)
+
+
+def quiet_logger(name: str = "benchmarks") -> logging.Logger:
+    """Logger that drops everything, so log I/O does not pollute timings."""
+    logger = logging.getLogger(name)
+    logger.addHandler(logging.NullHandler())
+    logger.propagate = False
+    logger.disabled = True
+    return logger
+
+
+def read_fixture(name: str, mode: str = "r"):
+    with open(os.path.join(FIXTURES_DIR, name), mode) as file:
+        return file.read()
+
+
+class BenchmarkCase:
+    def __init__(self, name: str, size: int, setup: Callable[[], Callable[[], object]]):
+        self.name = name
+        self.size = size
+        self.setup = setup
+
+    @property
+    def key(self) -> str:
+        return f"{self.name}[{self.size}]"
+
+
+class BenchmarkSuite:
+    def __init__(self, sizes: List[int], repeat: int = 5, min_time: float = 0.2):
+        """
+        Args:
+            sizes (List[int]): Input sizes every case is generated for.
+            repeat (int): Number of timed samples per case.
+            min_time (float): Minimum duration of one sample in seconds;
+                the loop count is calibrated to reach it.
+        """
+        self.sizes = sizes
+        self.repeat = repeat
+        self.min_time = min_time
+        self.cases: List[BenchmarkCase] = []
+
+    def add(self, name: str, size: int, setup: Callable[[], Callable[[], object]]):
+        self.cases.append(BenchmarkCase(name, size, setup))
+
+    def run(self, selected: Optional[str] = None, echo: Callable[[str], None] = print) -> Dict[str, dict]:
+        results = {}
+        for case in self.cases:
+            if selected and selected not in case.key:
+                continue
+            func = case.setup()
+            timer = timeit.Timer(func)
+            number = self._calibrate(timer)
+            samples = [t / number for t in timer.repeat(repeat=self.repeat, number=number)]
+            median = statistics.median(samples)
+            results[case.key] = {
+                "name": case.name,
+                "size": case.size,
+                "loops": number,
+                "min_s": min(samples),
+                "median_s": median,
+                "mean_s": statistics.fmean(samples),
+                "stdev_s": statistics.stdev(samples) if len(samples) > 1 else 0.0,
+                "items_per_s": case.size / median if median else None,
+            }
+            echo(f"{case.key:<48} {median * 1e6:>12.1f} us  ({number} loops)")
+        return results
+
+    def _calibrate(self, timer: timeit.Timer) -> int:
+        number = 1
+        while True:
+            elapsed = timer.timeit(number)
+            if elapsed >= self.min_time or number >= 1_000_000:
+                return number
+            number *= 10 if elapsed < self.min_time / 10 else 2
+
+
+def environment_info() -> dict:
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=ROOT_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "commit": commit,
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+    }
+
+
+def save_results(path: str, results: Dict[str, dict]):
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, "w") as file:
+        json.dump({"meta": environment_info(), "results": results}, file, indent=2)
+
+
+def load_results(path: str) -> Dict[str, dict]:
+    with open(path, "r") as file:
+        return json.load(file)["results"]
+
+
+def compare_results(baseline: Dict[str, dict], current: Dict[str, dict], threshold: float) -> List[dict]:
+    """
+    Compares the median of every case present in both runs.
+
+    Returns:
+        List[dict]: One row per shared case with the ``ratio`` current/baseline
+        and a ``regression`` flag set when the slowdown exceeds ``threshold``.
+    """
+    rows = []
+    for key in sorted(set(baseline) & set(current)):
+        before = baseline[key]["median_s"]
+        after = current[key]["median_s"]
+        ratio = after / before if before else float("inf")
+        rows.append({
+            "key": key,
+            "baseline_s": before,
+            "current_s": after,
+            "ratio": ratio,
+            "regression": ratio > 1 + threshold,
+            "improvement": ratio < 1 - threshold,
+        })
+    return rows
@@ -0,0 +1,243 @@
+"""
+Load driver: runs N schedules x M keywords the way ``main.py`` does, against
+the local stub providers, and reports throughput, tail latency, memory and
+event-loop lag.
+
+Every schedule gets its own ``ResearchBotScheduler`` (and so its own searcher,
+bot object and APScheduler instance), exactly as in production. Only the chat
+platform is swapped for a bot whose ``notify`` records the delivery, and the
+cron expression gains a seconds field so a run lasts seconds instead of hours.
+
+Usage:
+    python benchmarks/loadgen.py --schedules 50 --keywords 5 --every 10 --duration 60
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import statistics
+import time
+from collections import Counter
+from datetime import datetime
+from unittest import mock
+
+from apscheduler.events import EVENT_JOB_MAX_INSTANCES, EVENT_JOB_MISSED
+
+import harness
+from stub_server import StubConfig, StubServer
+
+from bot import ResearchBotScheduler
+from infrastructure.bot_abstract import AbstractChatBot
+from models.paper_model import Schedule
+from service.service_arxiv import ArxivAPI
+from service.service_cambrige import CambridgeAPI
+from service.service_explorerieee import XploreAPI
+from service.service_springer import SpringerAPI
+from service.http_client import configure_http
+from service.load_spreading import configure_spreading
+from service.prefetch import configure_prefetch
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+KEYWORDS = ["machine learning", "robotics", "auv", "rov", "sonar", "transformers",
+            "federated learning", "graph neural networks", "reinforcement learning",
+            "computer vision", "llm", "clinical risk", "attention", "segmentation"]
+
+
+class Metrics:
+    def __init__(self):
+        self.run_latencies = []
+        self.loop_lag = []
+        self.rss_samples = []
+        self.outcomes = Counter()
+
+
+class LoadBot(AbstractChatBot):
+    """Chat bot that records deliveries instead of talking to a platform."""
+
+    metrics: Metrics = None
+
+    def get_channel_if(self, channel_name: str):
+        return channel_name
+
+    def register_events(self):
+        pass
+
+    def register_commands(self):
+        pass
+
+    async def run(self, schedule=None):
+        started = time.perf_counter()
+        await super().run(schedule)
+        self.metrics.run_latencies.append(time.perf_counter() - started)
+
+    async def notify(self, message, channel=None):
+        self.metrics.outcomes["delivered"] += 1
+
+    async def start_bot(self):
+        self.scheduler.add_listener(self._on_skipped, EVENT_JOB_MAX_INSTANCES | EVENT_JOB_MISSED)
+        self.scheduler.start()
+
+    def _on_skipped(self, event):
+        # A fire is dropped when the previous run of the same job is still going
+        self.metrics.outcomes["skipped"] += 1
+
+
+def rss_bytes() -> int:
+    with open("/proc/self/statm") as file:
+        return int(file.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+
+
+async def monitor_loop(metrics: Metrics, interval: float = 0.05):
+    """Samples how late the loop wakes up from a short sleep, plus RSS."""
+    loop = asyncio.get_running_loop()
+    while True:
+        expected = loop.time() + interval
+        await asyncio.sleep(interval)
+        metrics.loop_lag.append(max(0.0, loop.time() - expected))
+        metrics.rss_samples.append(rss_bytes())
+
+
+def percentiles(values, points=(50, 95, 99)):
+    if len(values) < 2:
+        return {f"p{p}": (values[0] if values else None) for p in points}
+    cuts = statistics.quantiles(values, n=100, method="inclusive")
+    return {f"p{p}": cuts[p - 1] for p in points}
+
+
+def build_schedules(count: int, keywords: int):
+    schedules = []
+    for i in range(count):
+        terms = [KEYWORDS[(i + k) % len(KEYWORDS)] for k in range(keywords)]
+        schedules.append(Schedule(channel=f"load-{i}", app="discord",
+                                  cron_schedule="* * * * *", search_keywords=terms))
+    return schedules
+
+
+async def drive(args, server: StubServer) -> dict:
+    metrics = Metrics()
+    LoadBot.metrics = metrics
+    tokens = {"xplore": "stub", "springer": "stub"}
+    every = args.every
+
+    def parse_cron_string(self, cron_string):
+        return {"second": f"*/{every}", "minute": "*", "hour": "*",
+                "day": "*", "month": "*", "day_of_week": "*"}
+
+    def get_bot(self, app_name, token, crondict):
+        return LoadBot(token, self.research_searcher, crondict, self.schedule)
+
+    monitor = asyncio.create_task(monitor_loop(metrics))
+    baseline_rss = rss_bytes()
+    started = time.perf_counter()
+    with mock.patch.object(ResearchBotScheduler, "parse_cron_string", parse_cron_string), \
+            mock.patch.object(ResearchBotScheduler, "get_bot", get_bot):
+        schedulers = [ResearchBotScheduler(schedule, "stub-token", tokens)
+                      for schedule in build_schedules(args.schedules, args.keywords)]
+    setup_s = time.perf_counter() - started
+
+    for scheduler in schedulers:
+        await scheduler.initialize()
+    await asyncio.sleep(args.duration)
+    elapsed = time.perf_counter() - started
+
+    for scheduler in schedulers:
+        scheduler.bot_instance.scheduler.shutdown(wait=False)
+    monitor.cancel()
+
+    requests_total = sum(count for path, count in server.stats.items() if path.startswith("/"))
+    return {
+        "config": vars(args),
+        "setup_s": setup_s,
+        "elapsed_s": elapsed,
+        "runs_completed": len(metrics.run_latencies),
+        "digests_delivered": metrics.outcomes["delivered"],
+        "fires_skipped": metrics.outcomes["skipped"],
+        "runs_per_s": len(metrics.run_latencies) / elapsed,
+        "provider_requests": requests_total,
+        "provider_requests_per_s": requests_total / elapsed,
+        "peak_provider_requests_per_s": max(server.arrivals.values(), default=0),
+        "provider_errors": server.stats["errors"],
+        "bytes_served": server.stats["bytes"],
+        "run_latency_s": {**percentiles(metrics.run_latencies),
+                          "max": max(metrics.run_latencies, default=None)},
+        "loop_lag_s": {**percentiles(metrics.loop_lag), "max": max(metrics.loop_lag, default=None)},
+        "rss_bytes": {"baseline": baseline_rss, "peak": max(metrics.rss_samples, default=baseline_rss),
+                      "final": rss_bytes()},
+    }
+
+
+def print_report(report: dict):
+    def ms(value):
+        return "n/a" if value is None else f"{value * 1000:.1f} ms"
+
+    print(f"\nSchedules x keywords : {report['config']['schedules']} x {report['config']['keywords']}")
+    print(f"Elapsed              : {report['elapsed_s']:.1f} s (setup {ms(report['setup_s'])})")
+    print(f"Runs completed       : {report['runs_completed']} ({report['runs_per_s']:.2f}/s), "
+          f"{report['digests_delivered']} digests delivered, {report['fires_skipped']} fires skipped")
+    print(f"Provider requests    : {report['provider_requests']} "
+          f"({report['provider_requests_per_s']:.1f}/s, peak {report['peak_provider_requests_per_s']}/s, "
+          f"{report['provider_errors']} errors, "
+          f"{report['bytes_served'] / 1e6:.1f} MB)")
+    lat = report["run_latency_s"]
+    print(f"Run latency          : p50 {ms(lat['p50'])}  p95 {ms(lat['p95'])}  "
+          f"p99 {ms(lat['p99'])}  max {ms(lat['max'])}")
+    lag = report["loop_lag_s"]
+    print(f"Event-loop lag       : p50 {ms(lag['p50'])}  p95 {ms(lag['p95'])}  "
+          f"p99 {ms(lag['p99'])}  max {ms(lag['max'])}")
+    rss = report["rss_bytes"]
+    print(f"RSS                  : baseline {rss['baseline'] / 2**20:.1f} MiB  "
+          f"peak {rss['peak'] / 2**20:.1f} MiB  final {rss['final'] / 2**20:.1f} MiB")
+
+
+def getargs():
+    parser = argparse.ArgumentParser(description="Drive N schedules x M keywords against stub providers.")
+    parser.add_argument("--schedules", type=int, default=20, help="Number of schedules (N).")
+    parser.add_argument("--keywords", type=int, default=3, help="Keywords per schedule (M).")
+    parser.add_argument("--every", type=int, default=10, choices=[1, 2, 3, 4, 5, 6, 10, 12, 15, 20, 30],
+                        help="Seconds between fires; all schedules fire on the same second unless --fire-jitter is set.")
+    parser.add_argument("--fire-jitter", type=float, default=0.0,
+                        help="Spread the schedules' fires over this many seconds (main.py --jitter).")
+    parser.add_argument("--max-starts-per-second", type=float, default=0.0,
+                        help="Most runs started per second (main.py --max-starts-per-second; 0 for no limit).")
+    parser.add_argument("--prefetch", type=float, default=0.0,
+                        help="Start each search this many seconds before its fire (main.py --prefetch).")
+    parser.add_argument("--duration", type=float, default=30.0, help="Seconds to keep the schedulers running.")
+    parser.add_argument("--latency-ms", type=float, default=100.0)
+    parser.add_argument("--jitter-ms", type=float, default=20.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--records", type=int, default=10, help="Records per provider response.")
+    parser.add_argument("--http-cache-ttl", type=float, default=0.0,
+                        help="Provider response cache TTL; 0 sends every search to the stub server.")
+    parser.add_argument("--log-level", default="INFO",
+                        help="Minimum level the bot loggers emit during the run.")
+    parser.add_argument("--output", help="Where to save the JSON report.")
+    return parser.parse_args()
+
+
+def main():
+    args = getargs()
+    logging.disable(logging.getLevelName(args.log_level.upper()) - 1)
+
+    configure_http(cache_ttl=args.http_cache_ttl)
+    configure_spreading(jitter_window=args.fire_jitter, max_starts_per_second=args.max_starts_per_second)
+    configure_prefetch(lead=args.prefetch)
+    server = StubServer(StubConfig(args.latency_ms, args.jitter_ms, args.error_rate, args.records)).start()
+    urls = server.provider_urls()
+    try:
+        with mock.patch.object(ArxivAPI, "BASE_URL", urls["arxiv"]), \
+                mock.patch.object(CambridgeAPI, "BASE_URL", urls["cambridge"]), \
+                mock.patch.object(XploreAPI, "BASE_URL", urls["xplore"]), \
+                mock.patch.object(SpringerAPI, "BASE_URL", urls["springer"]):
+            report = asyncio.run(drive(args, server))
+    finally:
+        server.stop()
+
+    print_report(report)
+    output = args.output or os.path.join(RESULTS_DIR, "load-" + datetime.now().strftime("%Y%m%d-%H%M%S") + ".json")
+    harness.save_results(output, report)
+    print(f"\nReport saved to {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+"""
+Sustained throughput of the outbound delivery queue.
+
+Enqueues digests for many channels into a DeliveryQueue on disk, the way
+runs do with ``--outbox``, while a DeliveryWorker drains them through a fake
+bot with a configurable send latency and failure rate. Reports how fast runs
+can enqueue, how fast the worker delivers, how many sends the batching saved
+and how the retries went.
+
+Usage:
+    python benchmarks/outbox_throughput.py --digests 5000 --channels 200 --latency-ms 80 \
+        --error-rate 0.05 --global-rate 50 --channel-rate 1
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import tempfile
+import time
+from datetime import datetime
+
+import harness
+
+from models.paper_model import ArticleMetadata
+from service.delivery_queue import DeliveryQueue, DeliveryWorker
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+
+
+class FakeBot:
+    """Stands in for a chat bot: ``deliver`` takes ``latency`` seconds and fails at ``error_rate``."""
+
+    def __init__(self, latency: float, error_rate: float, seed: int):
+        self.latency = latency
+        self.error_rate = error_rate
+        self.rng = random.Random(seed)
+        self.send_latencies = []
+        self.articles = 0
+
+    async def deliver(self, articles, channel):
+        start = time.perf_counter()
+        await asyncio.sleep(self.latency)
+        if self.rng.random() < self.error_rate:
+            raise ConnectionError("simulated send failure")
+        self.articles += len(articles)
+        self.send_latencies.append(time.perf_counter() - start)
+
+
+def getargs():
+    parser = argparse.ArgumentParser(description="Measure delivery queue throughput.")
+    parser.add_argument("--digests", type=int, default=2000, help="Digests enqueued in total.")
+    parser.add_argument("--channels", type=int, default=100, help="Distinct channels they go to.")
+    parser.add_argument("--articles", type=int, default=10, help="Articles per digest.")
+    parser.add_argument("--producer-rate", type=float, default=0,
+                        help="Digests enqueued per second (0 = as fast as possible).")
+    parser.add_argument("--latency-ms", type=float, default=50.0, help="Latency of every send.")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of sends that fail.")
+    parser.add_argument("--global-rate", type=float, default=50.0, help="Sends per second across channels.")
+    parser.add_argument("--channel-rate", type=float, default=1.0, help="Sends per second per channel.")
+    parser.add_argument("--max-in-flight", type=int, default=50, help="Channels sent to at the same time.")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", help="Where to save the report JSON.")
+    return parser.parse_args()
+
+
+def make_articles(count, offset):
+    return [ArticleMetadata(f"Paper {offset + i}", "summary", "2023-10-01",
+                            f"http://arxiv.org/abs/2310.{offset + i:05d}v1") for i in range(count)]
+
+
+async def produce(queue, args, rng):
+    start = time.perf_counter()
+    for i in range(args.digests):
+        channel = f"channel-{rng.randrange(args.channels)}"
+        queue.enqueue("load", channel, make_articles(args.articles, i * args.articles))
+        if args.producer_rate:
+            await asyncio.sleep(1 / args.producer_rate)
+        elif i % 100 == 0:
+            await asyncio.sleep(0)
+    return time.perf_counter() - start
+
+
+async def drive(args, path):
+    queue = DeliveryQueue(path)
+    bot = FakeBot(args.latency_ms / 1000, args.error_rate, args.seed)
+    worker = DeliveryWorker(queue, lambda app: bot,
+                            global_rate=args.global_rate,
+                            channel_rate=args.channel_rate,
+                            max_in_flight=args.max_in_flight,
+                            retry_delay=0.05,
+                            max_retry_delay=0.5,
+                            poll_interval=0.01)
+    start = time.perf_counter()
+    consumer = asyncio.create_task(worker.run_forever())
+    enqueue_s = await produce(queue, args, random.Random(args.seed))
+    while queue.pending_count() or worker.tasks:
+        await asyncio.sleep(0.05)
+    elapsed = time.perf_counter() - start
+    consumer.cancel()
+    await worker.shutdown()
+
+    latencies = sorted(bot.send_latencies) or [0.0]
+    report = {
+        "config": vars(args),
+        "elapsed_s": elapsed,
+        "enqueue_per_s": args.digests / enqueue_s if enqueue_s else None,
+        "digests_per_s": worker.stats["digests"] / elapsed,
+        "sends_per_s": worker.stats["sent"] / elapsed,
+        "sends": worker.stats["sent"],
+        "digests_delivered": worker.stats["digests"],
+        "digests_per_send": worker.stats["digests"] / max(worker.stats["sent"], 1),
+        "retried": worker.stats["retried"],
+        "dead": queue.dead_count(),
+        "send_latency_ms": {
+            "p50": statistics.median(latencies) * 1e3,
+            "p99": latencies[int(0.99 * (len(latencies) - 1))] * 1e3,
+        },
+    }
+    queue.close()
+    return report
+
+
+def print_report(report):
+    print(f"Delivered {report['digests_delivered']} digests in {report['sends']} sends "
+          f"({report['digests_per_send']:.1f} digests/send) in {report['elapsed_s']:.1f} s")
+    print(f"Enqueue rate         : {report['enqueue_per_s']:.0f} digests/s")
+    print(f"Delivery throughput  : {report['digests_per_s']:.0f} digests/s, {report['sends_per_s']:.1f} sends/s")
+    print(f"Retries / dead       : {report['retried']} / {report['dead']}")
+    print(f"Send latency         : p50 {report['send_latency_ms']['p50']:.1f} ms  "
+          f"p99 {report['send_latency_ms']['p99']:.1f} ms")
+
+
+def main():
+    args = getargs()
+    with tempfile.TemporaryDirectory() as folder:
+        report = asyncio.run(drive(args, os.path.join(folder, "outbox.db")))
+    print_report(report)
+    output = args.output or os.path.join(
+        RESULTS_DIR, "outbox-" + datetime.now().strftime("%Y%m%d-%H%M%S") + ".json")
+    harness.save_results(output, report)
+    print(f"\nResults saved to {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+Builds provider payloads of arbitrary size from the recorded fixtures.
+
+Records are cycled and their identifying fields (title, link, DOI) suffixed
+with the copy number so deduplication still sees distinct articles.
+"""
+
+import json
+import re
+from typing import List
+
+from harness import read_fixture
+
+ARXIV_FIXTURE = "arxiv_atom.xml"
+CAMBRIDGE_FIXTURE = "cambridge_items.json"
+XPLORE_FIXTURE = "xplore_articles.json"
+SPRINGER_FIXTURE = "springer_records.json"
+
+_ENTRY_RE = re.compile(r"  <entry>.*?</entry>\n", re.S)
+
+
+def arxiv_atom(size: int) -> bytes:
+    document = read_fixture(ARXIV_FIXTURE)
+    entries = _ENTRY_RE.findall(document)
+    head = document[:document.index("  <entry>")]
+    tail = document[document.rindex("</entry>\n") + len("</entry>\n"):]
+    body = []
+    for i in range(size):
+        entry = entries[i % len(entries)]
+        copy = i // len(entries)
+        if copy:
+            entry = entry.replace("</title>", f" ({copy})</title>")
+            entry = re.sub(r"(arxiv\.org/(?:abs|pdf)/[\d.]+)v1", rf"\1v{copy + 1}", entry)
+        body.append(entry)
+    return (head + "".join(body) + tail).encode("utf-8")
+
+
+def _cycle(records: List[dict], size: int, mutate) -> List[dict]:
+    result = []
+    for i in range(size):
+        record = json.loads(json.dumps(records[i % len(records)]))
+        copy = i // len(records)
+        if copy:
+            mutate(record, copy)
+        result.append(record)
+    return result
+
+
+def cambridge_items(size: int) -> bytes:
+    payload = json.loads(read_fixture(CAMBRIDGE_FIXTURE))
+
+    def mutate(hit, copy):
+        hit["item"]["title"] += f" ({copy})"
+        hit["item"]["doi"] += f".{copy}"
+
+    payload["itemHits"] = _cycle(payload["itemHits"], size, mutate)
+    return json.dumps(payload).encode("utf-8")
+
+
+def xplore_articles(size: int) -> bytes:
+    payload = json.loads(read_fixture(XPLORE_FIXTURE))
+
+    def mutate(article, copy):
+        article["title"] += f" ({copy})"
+        article["html_url"] = article["html_url"].rstrip("/") + f"-{copy}/"
+
+    payload["articles"] = _cycle(payload["articles"], size, mutate)
+    return json.dumps(payload).encode("utf-8")
+
+
+def springer_records(size: int, start: int = 1, total: int = None) -> bytes:
+    """A page of ``size`` records starting at ``start`` (the ``s`` parameter) out of ``total``."""
+    payload = json.loads(read_fixture(SPRINGER_FIXTURE))
+    records = payload["records"]
+
+    def mutate(record, copy):
+        record["title"] += f" ({copy})"
+        record["doi"] += f".{copy}"
+        record["url"] = [dict(url, value=url["value"] + f".{copy}") for url in record["url"]]
+
+    # La copia depende de la posición absoluta para que cada página traiga artículos distintos
+    offset = start - 1
+    page = _cycle(records, offset + size, mutate)[offset:]
+    payload["records"] = page
+    payload["result"] = [{"total": str(total if total is not None else offset + size), "start": str(start),
+                          "pageLength": str(size), "recordsDisplayed": str(len(page))}]
+    return json.dumps(payload).encode("utf-8")
+
+
+# Date strings in the shapes the providers return: arXiv/Cambridge ISO
+# timestamps and the free-form conference dates used by Xplore.
+DATE_SAMPLES = [
+    "2023-10-02T17:59:01Z",
+    "2023-10-05T12:00:00.000Z",
+    "2023-10-05",
+    "12 Oct. 2023",
+    "1 Nov. 2023",
+    "22 May 2023",
+    "October 2023",
+    "Dec. 2023",
+    "2023",
+]
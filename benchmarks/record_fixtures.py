@@ -0,0 +1,64 @@
+"""
+Refreshes the fixtures in ``benchmarks/fixtures`` from the live provider APIs.
+
+Usage:
+    XPLORE_API_KEY=... python benchmarks/record_fixtures.py --term "machine learning"
+
+Xplore and Springer are skipped when their API key is not available.
+"""
+
+import argparse
+import json
+import os
+import urllib.parse
+import urllib.request
+
+from harness import FIXTURES_DIR
+import payloads
+
+ARXIV_URL = "http://export.arxiv.org/api/query?search_query=all:{}&sortBy=lastUpdatedDate&sortOrder=ascending&max_results={}"
+CAMBRIDGE_URL = "https://www.cambridge.org/engage/miir/public-api/v1/items?term={}&limit={}&sort=PUBLISHED_DATE_DESC"
+XPLORE_URL = "https://ieeexploreapi.ieee.org/api/v1/search/articles?querytext={}&max_records={}&apikey={}"
+SPRINGER_URL = "https://api.springernature.com/metadata/json?q=%22{}%22&s=1&p={}&api_key={}"
+
+
+def fetch(url: str) -> bytes:
+    with urllib.request.urlopen(url, timeout=30) as response:
+        return response.read()
+
+
+def save(name: str, body: bytes, pretty_json: bool = False):
+    if pretty_json:
+        body = (json.dumps(json.loads(body), indent=2, ensure_ascii=False) + "\n").encode("utf-8")
+    with open(os.path.join(FIXTURES_DIR, name), "wb") as file:
+        file.write(body)
+    print(f"Recorded {name} ({len(body)} bytes)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Record provider payloads used by the benchmarks.")
+    parser.add_argument("--term", default="machine learning")
+    parser.add_argument("--limit", type=int, default=10)
+    args = parser.parse_args()
+    term = urllib.parse.quote(args.term)
+
+    save(payloads.ARXIV_FIXTURE, fetch(ARXIV_URL.format(term, args.limit)))
+    save(payloads.CAMBRIDGE_FIXTURE, fetch(CAMBRIDGE_URL.format(term, args.limit)), pretty_json=True)
+
+    api_key = os.getenv("XPLORE_API_KEY")
+    if api_key:
+        save(payloads.XPLORE_FIXTURE, fetch(XPLORE_URL.format(term, args.limit, api_key)), pretty_json=True)
+    else:
+        print("XPLORE_API_KEY not set, keeping the current Xplore fixture.")
+
+    api_key = os.getenv("SPRINGER_API_KEY")
+    if api_key:
+        body = json.loads(fetch(SPRINGER_URL.format(term, args.limit, api_key)))
+        body["apiKey"] = "<redacted>"
+        save(payloads.SPRINGER_FIXTURE, json.dumps(body).encode("utf-8"), pretty_json=True)
+    else:
+        print("SPRINGER_API_KEY not set, keeping the current Springer fixture.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+"""
+Several dispatcher replicas sharing one schedule store, on a simulated clock.
+
+Starts ``--replicas`` StoreDispatchers on the same SQLite schedule store, each
+with its own ShardCoordinator and lease store connection (SQLite or file
+locks). Every replica fires through a recording bot. Halfway through, one
+replica stops renewing its leases, as if it had died, and later a new one
+joins. The report checks that every fire time of every schedule was fired
+exactly once, and shows how the shards moved and how late fires got during
+the handovers.
+
+Usage:
+    python benchmarks/replicas.py --replicas 3 --schedules 500 --minutes 12 --backend file
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+from collections import Counter
+from datetime import datetime
+
+import harness
+
+from bot import StoreDispatcher
+from models.paper_model import Schedule
+from service.coordination import FileLeaseStore, ShardCoordinator, SqliteLeaseStore
+from service.schedule_store import ScheduleStore
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+
+
+class RecordingBot:
+    """Stands in for a chat bot: records which replica fired which schedule, and when."""
+
+    def __init__(self, worker, fires, clock):
+        self.worker = worker
+        self.fires = fires
+        self.clock = clock
+        self.outbox = None
+
+    async def run(self, schedule):
+        self.fires.append((schedule.id, self.clock[0], self.worker))
+
+
+class SimulatedDispatcher(StoreDispatcher):
+
+    def __init__(self, store, coordinator, bot):
+        super().__init__(store, {}, lambda app: "token", coordinator=coordinator)
+        self.bot = bot
+
+    def get_bot(self, app):
+        return self.bot
+
+
+def getargs():
+    parser = argparse.ArgumentParser(description="Simulate sharded dispatcher replicas.")
+    parser.add_argument("--replicas", type=int, default=3)
+    parser.add_argument("--schedules", type=int, default=500)
+    parser.add_argument("--minutes", type=int, default=12, help="Simulated minutes; every schedule fires each minute.")
+    parser.add_argument("--step", type=float, default=5.0, help="Simulated seconds between dispatcher ticks.")
+    parser.add_argument("--lease-ttl", type=float, default=30.0)
+    parser.add_argument("--backend", choices=["sqlite", "file"], default="sqlite")
+    parser.add_argument("--output", help="Where to save the report JSON.")
+    return parser.parse_args()
+
+
+def lease_store(args, folder):
+    if args.backend == "file":
+        return FileLeaseStore(os.path.join(folder, "leases"))
+    return SqliteLeaseStore(os.path.join(folder, "leases.db"))
+
+
+async def simulate(args, folder):
+    path = os.path.join(folder, "schedules.db")
+    seed = ScheduleStore(path)
+    seed.sync([Schedule(channel=f"channel-{i}", app="discord", cron_schedule="* * * * *",
+                        search_keywords=["robotics"], id=f"schedule-{i:05d}") for i in range(args.schedules)])
+    start = seed.next_due_at()
+    seed.close()
+
+    clock = [start]
+    fires = []
+    replicas = {}
+
+    def add_replica(name):
+        coordinator = ShardCoordinator(lease_store(args, folder), name, lease_ttl=args.lease_ttl)
+        replicas[name] = SimulatedDispatcher(ScheduleStore(path), coordinator, RecordingBot(name, fires, clock))
+
+    for i in range(args.replicas):
+        add_replica(f"worker-{i}")
+
+    end = start + args.minutes * 60
+    kill_at = start + args.minutes * 60 / 3
+    join_at = start + args.minutes * 60 * 2 / 3
+    killed = joined = None
+    ownership = []
+
+    while clock[0] < end:
+        now = clock[0]
+        if killed is None and now >= kill_at:
+            # Stops ticking without leaving: its leases must expire before the others take over
+            killed = sorted(replicas)[0]
+            replicas.pop(killed)
+        if joined is None and now >= join_at:
+            joined = f"worker-{args.replicas}"
+            add_replica(joined)
+        for dispatcher in replicas.values():
+            dispatcher.coordinator.tick(now)
+        for dispatcher in replicas.values():
+            dispatcher.dispatch_due(now)
+        await asyncio.sleep(0)
+        ownership.append((now - start, {name: len(d.coordinator.owned) for name, d in replicas.items()}))
+        clock[0] += args.step
+
+    await asyncio.sleep(0)
+    for dispatcher in replicas.values():
+        dispatcher.coordinator.leave()
+        dispatcher.store.close()
+    return start, fires, ownership, killed, joined
+
+
+def analyse(args, start, fires, ownership, killed, joined):
+    per_slot = Counter((schedule_id, int((at - start) // 60)) for schedule_id, at, _ in fires)
+    slots = args.schedules * args.minutes
+    delays = [(at - start) % 60 for _, at, _ in fires]
+    return {
+        "config": vars(args),
+        "fires": len(fires),
+        "expected_fires": slots,
+        "duplicates": sum(count - 1 for count in per_slot.values() if count > 1),
+        "missed": slots - len(per_slot),
+        "fires_per_worker": dict(Counter(worker for _, _, worker in fires)),
+        "delay_s": {"median": statistics.median(delays), "max": max(delays)},
+        "killed": killed,
+        "joined": joined,
+        "ownership": [{"t": t, "shards": shards} for t, shards in ownership[::max(1, int(60 // args.step))]],
+    }
+
+
+def main():
+    args = getargs()
+    with tempfile.TemporaryDirectory() as folder:
+        report = analyse(args, *asyncio.run(simulate(args, folder)))
+    print(f"Fires: {report['fires']} of {report['expected_fires']} expected, "
+          f"{report['duplicates']} duplicates, {report['missed']} missed")
+    print(f"Fire delay: median {report['delay_s']['median']:.0f} s, max {report['delay_s']['max']:.0f} s")
+    print(f"Killed {report['killed']}, then {report['joined']} joined. Fires per worker: "
+          f"{report['fires_per_worker']}")
+    for entry in report["ownership"]:
+        print(f"  t={entry['t']:>5.0f}s shards {entry['shards']}")
+    output = args.output or os.path.join(
+        RESULTS_DIR, "replicas-" + datetime.now().strftime("%Y%m%d-%H%M%S") + ".json")
+    harness.save_results(output, report)
+    print(f"\nResults saved to {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Runs the microbenchmark suite and optionally compares it with a previous run.
+
+Usage:
+    python benchmarks/run.py                                  # run and save
+    python benchmarks/run.py --compare benchmarks/results/baseline.json
+    python benchmarks/run.py --filter provider --sizes 10 100
+"""
+
+import argparse
+import os
+import sys
+from datetime import datetime
+
+import harness
+import bench_decoding
+import bench_discord
+import bench_logging
+import bench_pipeline
+import bench_providers
+import bench_render
+import bench_store
+
+MODULES = [bench_providers, bench_decoding, bench_pipeline, bench_logging, bench_store, bench_discord, bench_render]
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+
+
+def getargs():
+    parser = argparse.ArgumentParser(description="Run the botpaper microbenchmarks.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000],
+                        help="Input sizes (number of records) for every case.")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed samples per case.")
+    parser.add_argument("--min-time", type=float, default=0.2,
+                        help="Minimum seconds per sample; loops are calibrated to reach it.")
+    parser.add_argument("--filter", help="Only run cases whose name contains this text.")
+    parser.add_argument("--output", help="Where to save the results JSON. "
+                        "Defaults to benchmarks/results/<timestamp>.json.")
+    parser.add_argument("--compare", help="Results JSON of a previous run to compare against.")
+    parser.add_argument("--threshold", type=float, default=0.10,
+                        help="Relative slowdown of the median that counts as a regression.")
+    parser.add_argument("--fail-on-regression", action="store_true",
+                        help="Exit with status 1 when a regression is flagged.")
+    return parser.parse_args()
+
+
+def print_comparison(rows, threshold):
+    print(f"\nComparison (threshold {threshold:.0%}):")
+    for row in rows:
+        flag = "REGRESSION" if row["regression"] else ("faster" if row["improvement"] else "")
+        print(f"{row['key']:<48} {row['baseline_s'] * 1e6:>12.1f} -> "
+              f"{row['current_s'] * 1e6:>12.1f} us  x{row['ratio']:.2f}  {flag}")
+
+
+def main():
+    args = getargs()
+    suite = harness.BenchmarkSuite(args.sizes, repeat=args.repeat, min_time=args.min_time)
+    for module in MODULES:
+        module.register(suite)
+
+    results = suite.run(selected=args.filter)
+    output = args.output or os.path.join(
+        RESULTS_DIR, datetime.now().strftime("%Y%m%d-%H%M%S") + ".json")
+    harness.save_results(output, results)
+    print(f"\nResults saved to {output}")
+
+    if args.compare:
+        rows = harness.compare_results(harness.load_results(args.compare), results, args.threshold)
+        print_comparison(rows, args.threshold)
+        regressions = [row for row in rows if row["regression"]]
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) flagged.")
+            if args.fail_on_regression:
+                sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""
+Startup benchmark: import time, peak RSS and heavy third-party modules loaded
+by a fresh process that prepares one deployment (a chat platform and a set of
+providers), compared with importing every platform and provider up front.
+
+Each sample runs in a new interpreter so nothing is cached between runs.
+
+Usage:
+    python benchmarks/startup.py                                  # discord + arxiv
+    python benchmarks/startup.py --app slack --providers arxiv xplore --repeat 10
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from datetime import datetime
+
+import harness
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+SRC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+HEAVY_MODULES = ["discord", "slack", "slack_sdk", "nio", "feedparser", "requests", "aiohttp", "pandas"]
+
+# Runs in the child process; prints one JSON line with its measurements.
+CHILD = """
+import json, resource, sys, time
+start = time.perf_counter()
+sys.path.insert(0, {src!r})
+import bot
+from service.api_consumer import PROVIDERS
+if {eager!r}:
+    for name in bot.CHAT_PLATFORMS.names():
+        bot.CHAT_PLATFORMS.load(name)
+    for name in PROVIDERS.names():
+        PROVIDERS.load(name)
+else:
+    bot.CHAT_PLATFORMS.load({app!r})
+    for name in {providers!r}:
+        PROVIDERS.load(name)
+elapsed = time.perf_counter() - start
+heavy = sorted(name for name in {heavy!r} if name in sys.modules)
+print(json.dumps({{"seconds": elapsed, "max_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+                  "modules": len(sys.modules), "heavy_modules": heavy}}))
+"""
+
+
+def getargs():
+    parser = argparse.ArgumentParser(description="Measure botpaper startup cost with lazy plugin loading.")
+    parser.add_argument("--app", default="discord", help="Chat platform of the deployment.")
+    parser.add_argument("--providers", nargs="+", default=["arxiv"], help="Providers of the deployment.")
+    parser.add_argument("--repeat", type=int, default=5, help="Fresh processes per variant.")
+    parser.add_argument("--output", help="Where to save the results JSON.")
+    return parser.parse_args()
+
+
+def sample(app, providers, eager):
+    code = CHILD.format(src=SRC_DIR, eager=eager, app=app, providers=list(providers), heavy=HEAVY_MODULES)
+    # Los avisos de deprecación de los SDK no deben mezclarse con la salida JSON
+    completed = subprocess.run([sys.executable, "-W", "ignore", "-c", code],
+                               capture_output=True, text=True, check=True)
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def measure(app, providers, eager, repeat):
+    samples = [sample(app, providers, eager) for _ in range(repeat)]
+    return {
+        "median_s": statistics.median(s["seconds"] for s in samples),
+        "min_s": min(s["seconds"] for s in samples),
+        "max_rss_kb": statistics.median(s["max_rss_kb"] for s in samples),
+        "modules": samples[-1]["modules"],
+        "heavy_modules": samples[-1]["heavy_modules"],
+    }
+
+
+def print_report(report):
+    print(f"Deployment: {report['app']} + {', '.join(report['providers'])} ({report['repeat']} runs each)")
+    for variant in ("lazy", "eager"):
+        row = report[variant]
+        print(f"{variant:<6} {row['median_s'] * 1e3:>8.1f} ms  RSS {row['max_rss_kb'] / 1024:>6.1f} MiB  "
+              f"{row['modules']:>5} modules  heavy: {', '.join(row['heavy_modules']) or '-'}")
+    print(f"Speed-up: x{report['eager']['median_s'] / report['lazy']['median_s']:.2f}")
+
+
+def main():
+    args = getargs()
+    report = {
+        "app": args.app,
+        "providers": args.providers,
+        "repeat": args.repeat,
+        "lazy": measure(args.app, args.providers, False, args.repeat),
+        "eager": measure(args.app, args.providers, True, args.repeat),
+    }
+    print_report(report)
+    output = args.output or os.path.join(
+        RESULTS_DIR, "startup-" + datetime.now().strftime("%Y%m%d-%H%M%S") + ".json")
+    harness.save_results(output, report)
+    print(f"\nResults saved to {output}")
+
+
+if __name__ == "__main__":
+    main()
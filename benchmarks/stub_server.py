@@ -0,0 +1,243 @@
+"""
+Local stand-in for the arXiv, Cambridge, IEEE Xplore and Springer search endpoints.
+
+Responses are built from the recorded fixtures, so the providers parse the
+same documents they get in production. Latency, error rate and payload size
+are configurable. Bodies are gzipped for clients that accept it, and every
+response carries an ETag, so a conditional request for an unchanged body gets
+a 304. The server runs in its own thread so it never shares the event loop
+being measured.
+
+Usage:
+    python benchmarks/stub_server.py --port 8085 --latency-ms 150 --error-rate 0.02
+"""
+
+import argparse
+import gzip
+import hashlib
+import random
+import threading
+import time
+from collections import Counter
+from functools import lru_cache
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import payloads
+
+ARXIV_PATH = "/api/query"
+CAMBRIDGE_PATH = "/engage/miir/public-api/v1/items"
+XPLORE_PATH = "/api/v1/search/articles"
+SPRINGER_PATH = "/metadata/json"
+
+
+class StubConfig:
+    def __init__(self, latency_ms: float = 100.0, jitter_ms: float = 0.0,
+                 error_rate: float = 0.0, records: int = 10, seed: int = 0,
+                 compress: bool = True, etags: bool = True):
+        """
+        Args:
+            latency_ms (float): Mean delay added before every response.
+            jitter_ms (float): Standard deviation of the delay.
+            error_rate (float): Share of requests answered with HTTP 503.
+            records (int): Records per response when the request does not ask
+                for fewer (``max_results``, ``limit`` or ``max_records``).
+            seed (int): Seed for latency and error sampling.
+            compress (bool): Gzip the body when the request accepts it.
+            etags (bool): Send ETag / Last-Modified and answer matching
+                conditional requests with 304.
+        """
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.records = records
+        self.compress = compress
+        self.etags = etags
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+
+    def sample(self):
+        with self.lock:
+            delay = max(0.0, self.random.gauss(self.latency_ms, self.jitter_ms)) / 1000
+            failed = self.random.random() < self.error_rate
+        return delay, failed
+
+
+@lru_cache(maxsize=None)
+def _body(path: str, records: int, start: int = 1, total: int = 0) -> bytes:
+    if path == SPRINGER_PATH:
+        return payloads.springer_records(records, start, total)
+    if path == ARXIV_PATH:
+        return payloads.arxiv_atom(records)
+    if path == CAMBRIDGE_PATH:
+        return payloads.cambridge_items(records)
+    return payloads.xplore_articles(records)
+
+
+@lru_cache(maxsize=None)
+def _gzipped(body: bytes) -> bytes:
+    return gzip.compress(body, compresslevel=6)
+
+
+@lru_cache(maxsize=None)
+def _etag(body: bytes) -> str:
+    return '"' + hashlib.sha1(body).hexdigest() + '"'
+
+
+# The fixtures never change, so every response reports the same modification date
+LAST_MODIFIED = "Mon, 02 Oct 2023 00:00:00 GMT"
+
+_CONTENT_TYPES = {
+    ARXIV_PATH: "application/atom+xml; charset=utf-8",
+    CAMBRIDGE_PATH: "application/json",
+    XPLORE_PATH: "application/json",
+    SPRINGER_PATH: "application/json",
+}
+_SIZE_PARAMS = {ARXIV_PATH: "max_results", CAMBRIDGE_PATH: "limit", XPLORE_PATH: "max_records",
+                SPRINGER_PATH: "p"}
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Headers and body are written separately; without this, Nagle plus the
+    # client's delayed ACK add ~40 ms to every response on a kept-alive connection
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        if url.path not in _CONTENT_TYPES:
+            self._reply(404, b"not found", "text/plain")
+            return
+
+        config: StubConfig = self.server.config
+        with config.lock:
+            # Arrivals per wall-clock second, to see how bursty the clients are
+            self.server.arrivals[int(time.time())] += 1
+        delay, failed = config.sample()
+        time.sleep(delay)
+
+        with config.lock:
+            self.server.stats[url.path] += 1
+        if failed:
+            with config.lock:
+                self.server.stats["errors"] += 1
+            self._reply(503, b"service unavailable", "text/plain")
+            return
+
+        query = parse_qs(url.query)
+        requested = query.get(_SIZE_PARAMS[url.path], [None])[0]
+        records = min(int(requested), config.records) if requested and requested.isdigit() else config.records
+        if url.path == SPRINGER_PATH:
+            # Springer pagina con 's' (desde 1) sobre un total de config.records registros
+            start = int(query.get("s", ["1"])[0])
+            records = max(0, min(int(requested or config.records), config.records - start + 1))
+            body = _body(url.path, records, start, config.records)
+        else:
+            body = _body(url.path, records)
+
+        headers = {}
+        if config.etags:
+            headers = {"ETag": _etag(body), "Last-Modified": LAST_MODIFIED}
+            if self.headers.get("If-None-Match") == headers["ETag"]:
+                with config.lock:
+                    self.server.stats["not_modified"] += 1
+                self._reply(304, b"", None, headers)
+                return
+        if config.compress and "gzip" in self.headers.get("Accept-Encoding", ""):
+            body = _gzipped(body)
+            headers["Content-Encoding"] = "gzip"
+        with config.lock:
+            self.server.stats["bytes"] += len(body)
+        self._reply(200, body, _CONTENT_TYPES[url.path], headers)
+
+    def _reply(self, status, body, content_type, headers=None):
+        self.send_response(status)
+        if content_type:
+            self.send_header("Content-Type", content_type)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        if status != 304:
+            self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class _StubHTTPServer(ThreadingHTTPServer):
+    # The default backlog (5) drops connections when many clients connect at
+    # once, and the dropped SYNs are only retried after a second
+    request_queue_size = 128
+
+
+class StubServer:
+    """Threaded HTTP server exposing the four provider endpoints."""
+
+    def __init__(self, config: StubConfig, host: str = "127.0.0.1", port: int = 0):
+        self.httpd = _StubHTTPServer((host, port), StubHandler)
+        self.httpd.daemon_threads = True
+        self.httpd.config = config
+        self.httpd.stats = Counter()
+        self.httpd.arrivals = Counter()
+        self.thread = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def stats(self) -> Counter:
+        return self.httpd.stats
+
+    @property
+    def arrivals(self) -> Counter:
+        """Requests received in each second (epoch seconds -> count)."""
+        return self.httpd.arrivals
+
+    def start(self):
+        self.thread = threading.Thread(target=self.httpd.serve_forever, name="stub-server", daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def provider_urls(self) -> dict:
+        """Base URLs in the format each provider class expects."""
+        return {
+            "arxiv": (self.base_url + ARXIV_PATH + "?"
+                      "search_query={}&sortBy=lastUpdatedDate&sortOrder=ascending&max_results={}"),
+            "cambridge": self.base_url + CAMBRIDGE_PATH,
+            "xplore": self.base_url + XPLORE_PATH + "?",
+            "springer": self.base_url + SPRINGER_PATH,
+        }
+
+
+def getargs():
+    parser = argparse.ArgumentParser(description="Serve stub provider endpoints.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8085)
+    parser.add_argument("--latency-ms", type=float, default=100.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--records", type=int, default=10)
+    parser.add_argument("--no-compress", action="store_true", help="Never gzip response bodies.")
+    parser.add_argument("--no-etags", action="store_true", help="Send no validators and never answer 304.")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = getargs()
+    config = StubConfig(args.latency_ms, args.jitter_ms, args.error_rate, args.records,
+                        compress=not args.no_compress, etags=not args.no_etags)
+    server = StubServer(config, args.host, args.port)
+    print(f"Stub providers listening on {server.base_url}")
+    for name, url in server.provider_urls().items():
+        print(f"  {name}: {url}")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        server.stop()
@@ -0,0 +1,95 @@
+"""
+Sequential versus batched queries through the IEEE Xplore SDK.
+
+Points the SDK at the local stub server and runs the same searches twice:
+one ``callAPI()`` after another, and all at once with ``XPLORE.callMany``
+over the shared curl pool. Reports wall time and queries per second.
+
+Usage:
+    python benchmarks/xplore_sdk.py --queries 50 --latency-ms 150 --max-concurrent 16
+"""
+
+import argparse
+import os
+import time
+from datetime import datetime
+
+import harness
+from stub_server import XPLORE_PATH, StubConfig, StubServer
+
+from service.sdks.xploreapi import XPLORE
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+
+
+def getargs():
+    parser = argparse.ArgumentParser(description="Measure batched queries in the Xplore SDK.")
+    parser.add_argument("--queries", type=int, default=40, help="Searches issued per run.")
+    parser.add_argument("--records", type=int, default=10, help="Records per response.")
+    parser.add_argument("--latency-ms", type=float, default=100.0, help="Stub latency per request.")
+    parser.add_argument("--max-concurrent", type=int, default=16, help="Requests in flight for callMany.")
+    parser.add_argument("--output", help="Where to save the report JSON.")
+    return parser.parse_args()
+
+
+def make_queries(count, records):
+    queries = []
+    for i in range(count):
+        query = XPLORE("stub-key")
+        query.dataType("json")
+        query.dataFormat("object")
+        query.maximumResults(records)
+        query.queryText(f"topic {i}")
+        queries.append(query)
+    return queries
+
+
+def run_sequential(queries):
+    start = time.perf_counter()
+    articles = sum(len(query.callAPI().get("articles", [])) for query in queries)
+    return time.perf_counter() - start, articles
+
+
+def run_batched(queries, max_concurrent):
+    start = time.perf_counter()
+    articles = 0
+    errors = 0
+    for _, data, error in XPLORE.callMany(queries, max_concurrent):
+        if error:
+            errors += 1
+        else:
+            articles += len(data.get("articles", []))
+    return time.perf_counter() - start, articles, errors
+
+
+def main():
+    args = getargs()
+    server = StubServer(StubConfig(latency_ms=args.latency_ms, records=args.records)).start()
+    XPLORE.endPoint = server.base_url + XPLORE_PATH
+    try:
+        sequential_s, sequential_articles = run_sequential(make_queries(args.queries, args.records))
+        batched_s, batched_articles, errors = run_batched(make_queries(args.queries, args.records),
+                                                          args.max_concurrent)
+    finally:
+        server.stop()
+
+    report = {
+        "config": vars(args),
+        "sequential": {"elapsed_s": sequential_s, "queries_per_s": args.queries / sequential_s,
+                       "articles": sequential_articles},
+        "batched": {"elapsed_s": batched_s, "queries_per_s": args.queries / batched_s,
+                    "articles": batched_articles, "errors": errors},
+        "speedup": sequential_s / batched_s,
+    }
+    print(f"Sequential callAPI : {sequential_s:.2f} s ({report['sequential']['queries_per_s']:.1f} queries/s)")
+    print(f"XPLORE.callMany    : {batched_s:.2f} s ({report['batched']['queries_per_s']:.1f} queries/s), "
+          f"{errors} errors")
+    print(f"Speedup            : {report['speedup']:.1f}x")
+    output = args.output or os.path.join(
+        RESULTS_DIR, "xplore-sdk-" + datetime.now().strftime("%Y%m%d-%H%M%S") + ".json")
+    harness.save_results(output, report)
+    print(f"\nResults saved to {output}")
+
+
+if __name__ == "__main__":
+    main()
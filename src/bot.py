@@ -1,30 +1,57 @@
 import asyncio
-from typing import List
-from chats.discord_bot import DiscordBot
-from chats.matrix_bot import MatrixBot
-from chats.slack_bot import SlackBot
+import time
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Set
+from infrastructure.bot_abstract import AbstractChatBot
+from infrastructure.plugins import PluginRegistry
 from models.logger_model import LoggerConfig
-from models.paper_model import ArticleMetadata, Schedule
+from models.paper_model import ArticleMetadata, Schedule, parse_cron_string
 from service.api_consumer import ResearchPaperSearcher
+from service.delivery_queue import DeliveryQueue
+from service.coordination import ShardCoordinator
+from service.misfire import CatchUpPolicy
+from service.load_spreading import start_slot
+from service import prefetch
+from service.query_planner import QueryPlanner
+from service.schedule_store import ScheduleStore
+from apscheduler.events import EVENT_JOB_SUBMITTED
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
+from tzlocal import get_localzone
 
 config = LoggerConfig(name="ResearchBotScheduler", log_file="scheduler_bot.log")
 logger = config.get_logger()
 
+# Cada plataforma se importa (con su SDK) solo cuando alguna programación la usa
+CHAT_PLATFORMS = PluginRegistry("chat platform")
+CHAT_PLATFORMS.register("discord", "chats.discord_bot:DiscordBot")
+CHAT_PLATFORMS.register("slack", "chats.slack_bot:SlackBot")
+CHAT_PLATFORMS.register("matrix", "chats.matrix_bot:MatrixBot")
+
+def create_bot(app_name, token, research_searcher, crondict=None, schedule=None):
+    if app_name not in CHAT_PLATFORMS:
+        logger.error(f"Unsupported app_name: {app_name}")
+        raise ValueError(f"Unsupported app_name: {app_name}")
+    bot_class = CHAT_PLATFORMS.load(app_name)
+    bot = bot_class(token, research_searcher, crondict, schedule)
+    bot.app = app_name
+    return bot
+
 class ResearchBotScheduler:
-    def __init__(self, schedule: Schedule, bot_token: str, extraction_tokens: dict):
+    def __init__(self, schedule: Schedule, bot_token: str, extraction_tokens: dict,
+                 searcher: Optional[QueryPlanner] = None):
         if not bot_token or not extraction_tokens:
             logger.error("Invalid or missing bot_token or extraction_tokens.")
             raise ValueError("Bot token and extraction tokens are required.")
 
         self.schedule = schedule
         self.bot_token = bot_token
-        self.research_searcher = ResearchPaperSearcher(extraction_tokens, logger=logger)
+        # Con un QueryPlanner, la búsqueda se comparte con las demás programaciones del mismo tick
+        self.research_searcher = searcher or ResearchPaperSearcher(extraction_tokens, logger=logger)
         self.observers = []
 
         cron_args = self.parse_cron_string(self.schedule.cron_schedule)
         
-        if self.schedule.app in ["discord", "slack", "matrix"]:
+        if self.schedule.app in CHAT_PLATFORMS:
             self.bot_instance = self.get_bot(self.schedule.app, bot_token, cron_args)
         else:
             logger.error(f"Invalid app name provided: {self.schedule.app}")
@@ -33,27 +60,485 @@ class ResearchBotScheduler:
     async def initialize(self):
         await self.bot_instance.start_bot()
 
+    def update(self, schedule: Schedule):
+        """Apply new cron expression or keywords to the running bot, keeping its connection."""
+        cron_args = self.parse_cron_string(schedule.cron_schedule)
+        self.bot_instance.reschedule(schedule, cron_args)
+        self.schedule = schedule
+
+    async def shutdown(self):
+        await self.bot_instance.stop_bot()
+
     def get_bot(self, app_name, token, crondict):
-        if app_name == "discord":
-            return DiscordBot(token, self.research_searcher, crondict, self.schedule)
-        elif app_name == "slack":
-            return SlackBot(token, self.research_searcher, crondict, self.schedule)  # Assuming it accepts these params
-        elif app_name == "matrix":
-            return MatrixBot(token, self.research_searcher, crondict, self.schedule)  # Assuming it accepts these params
-        else:
-            logger.error(f"Unsupported app_name: {app_name}")
-            raise ValueError(f"Unsupported app_name: {app_name}")
+        return create_bot(app_name, token, self.research_searcher, crondict, self.schedule)
 
     def parse_cron_string(self, cron_string: str) -> dict:
         try:
-            minute, hour, day_of_month, month, day_of_week = cron_string.split()
-            return {
-                "minute": minute,
-                "hour": hour,
-                "day": day_of_month,
-                "month": month,
-                "day_of_week": day_of_week
-            }
+            return parse_cron_string(cron_string)
         except ValueError:
             logger.error(f"Invalid cron string format: {cron_string}")
             raise ValueError("Invalid cron string format.")
+
+
+class ScheduleManager:
+    """
+    Keeps one ResearchBotScheduler per schedule id and applies configuration
+    changes as a diff: new schedules are started, deleted ones are stopped and
+    changed ones are rescheduled in place, so untouched schedules keep their
+    connection and searcher.
+
+    Each schedule searches once per fire and its bot delivers the result to
+    all of its destinations. Destinations on a platform no schedule runs on
+    get a delivery-only bot, started the first time one of them is reached.
+    """
+
+    def __init__(self, extraction_tokens: dict, token_for: Callable[[str], Optional[str]],
+                 outbox: Optional[DeliveryQueue] = None, planner: Optional[QueryPlanner] = None,
+                 state: Optional[ScheduleStore] = None, catch_up: Optional[CatchUpPolicy] = None):
+        """
+        Args:
+            extraction_tokens (dict): API keys handed to every ResearchPaperSearcher.
+            token_for (Callable): Returns the bot token for an app name, or None.
+            outbox (DeliveryQueue, optional): When given, runs enqueue their digests here instead of sending them.
+            planner (QueryPlanner, optional): When given, every schedule searches through it, so
+                schedules firing together share their provider requests.
+            state (ScheduleStore, optional): When given, every fire is recorded there, and the fires
+                missed while the process was down are caught up on startup following ``catch_up``.
+            catch_up (CatchUpPolicy, optional): How missed fires are caught up (coalesced by default).
+        """
+        self.extraction_tokens = extraction_tokens
+        self.token_for = token_for
+        self.outbox = outbox
+        self.planner = planner
+        self.state = state
+        self.catch_up = catch_up or CatchUpPolicy()
+        self.schedulers: Dict[str, ResearchBotScheduler] = {}
+        self.fingerprints: Dict[str, tuple] = {}
+        self.tasks: Dict[str, asyncio.Task] = {}
+        # Se activa cuando no queda ninguna programación en marcha (ver wait)
+        self.idle = asyncio.Event()
+        # Se activa con stop(): wait() vuelve aunque queden programaciones
+        self.stopping = asyncio.Event()
+        # Bots sin programación propia, para los destinos de plataformas que ninguna programación usa
+        self.delivery_bots: Dict[str, AbstractChatBot] = {}
+        self.delivery_tasks: Dict[str, asyncio.Task] = {}
+
+    async def apply(self, schedules: List[Schedule]):
+        """Bring the running schedulers in line with ``schedules``."""
+        wanted = {schedule.id: schedule for schedule in schedules}
+        removed = [key for key in self.schedulers if key not in wanted]
+        added = [key for key in wanted if key not in self.schedulers]
+        changed = [key for key, schedule in wanted.items()
+                   if key in self.fingerprints and self.fingerprints[key] != schedule.fingerprint()]
+
+        for key in removed:
+            await self.remove(key)
+            if self.state is not None:
+                self.state.delete(key)
+        for key in changed:
+            schedule = wanted[key]
+            if schedule.app != self.schedulers[key].schedule.app:
+                await self.remove(key)
+                self.add(schedule)
+            else:
+                self.update(schedule)
+        # Fire times persisted by the previous process, read before they are brought up to date
+        previous = {key: self.state.get(key) for key in added} if self.state is not None else {}
+        for key in added:
+            self.add(wanted[key])
+        if self.state is not None:
+            self.state.upsert_many([self.schedulers[key].schedule for key in added + changed if key in self.schedulers])
+            self.catch_up_missed([(self.schedulers[key].schedule, previous[key].next_fire_at)
+                                  for key in added if key in self.schedulers and previous.get(key) is not None
+                                  and previous[key].cron_schedule == wanted[key].cron_schedule])
+
+        await self.stop_unused_delivery_bots()
+
+        if removed or added or changed:
+            logger.info(f"Schedules applied: {len(added)} added, {len(changed)} changed, "
+                        f"{len(removed)} removed, {len(self.schedulers)} running.")
+
+    def add(self, schedule: Schedule):
+        try:
+            scheduler = ResearchBotScheduler(schedule, self.token_for(schedule.app), self.extraction_tokens,
+                                             searcher=self.planner)
+        except ValueError as e:
+            logger.error(f"Could not start schedule {schedule.id}: {e}")
+            return
+        scheduler.bot_instance.outbox = self.outbox
+        scheduler.bot_instance.bot_for = self.bot_for
+        if self.state is not None:
+            # Missed fires are caught up from the persisted state instead of on every connect
+            scheduler.bot_instance.run_on_start = False
+            scheduler.bot_instance.scheduler.add_listener(self.record_fire, EVENT_JOB_SUBMITTED)
+        self.schedulers[schedule.id] = scheduler
+        self.fingerprints[schedule.id] = schedule.fingerprint()
+        task = asyncio.create_task(scheduler.initialize(), name=f"schedule:{schedule.id}")
+        self.tasks[schedule.id] = task
+        self.idle.clear()
+        task.add_done_callback(lambda task, key=schedule.id: self.reap(key, task))
+        logger.info(f"Started schedule {schedule}")
+
+    def update(self, schedule: Schedule):
+        try:
+            self.schedulers[schedule.id].update(schedule)
+        except ValueError as e:
+            logger.error(f"Could not update schedule {schedule.id}: {e}")
+            return
+        self.fingerprints[schedule.id] = schedule.fingerprint()
+        logger.info(f"Updated schedule {schedule}")
+
+    def record_fire(self, event):
+        """APScheduler listener: persists the fire so a restart knows what it missed."""
+        key, _, catch_up = event.job_id.partition(":catch-up:")
+        scheduler = self.schedulers.get(key)
+        if scheduler is None or not event.scheduled_run_times:
+            return
+        fired_at = max(event.scheduled_run_times).timestamp()
+        try:
+            if catch_up:
+                self.state.mark_fired([key], fired_at)
+            else:
+                self.state.record_fire(scheduler.schedule, fired_at)
+        except Exception as e:
+            logger.error(f"Could not record fire of schedule {event.job_id}: {e}")
+
+    def catch_up_missed(self, overdue: List[tuple], now: Optional[float] = None):
+        """
+        Schedules the catch-up runs of ``(schedule, persisted next_fire_at)`` pairs
+        as one-off jobs of each bot, spread as ``catch_up`` plans them. They run
+        once the bot has started its scheduler, i.e. once it is connected.
+        """
+        now = now if now is not None else time.time()
+        # The new job only fires from now on, so any past fire time was missed, however recent
+        overdue = [(schedule, next_fire_at) for schedule, next_fire_at in overdue
+                   if next_fire_at is not None and next_fire_at <= now]
+        if not overdue:
+            return
+        plan = self.catch_up.plan(overdue, now)
+        for n, (delay, schedule) in enumerate(plan):
+            bot = self.schedulers[schedule.id].bot_instance
+            bot.scheduler.add_job(bot.run, trigger="date", args=[schedule], id=f"{schedule.id}:catch-up:{n}",
+                                  run_date=datetime.fromtimestamp(now + delay, get_localzone()),
+                                  misfire_grace_time=None)
+        if plan:
+            logger.info(f"{len(overdue)} schedules missed fires while stopped: {len(plan)} catch-up runs "
+                        f"({self.catch_up.mode}) over {self.catch_up.spread:.0f} s.")
+        self.state.advance([schedule for schedule, _ in overdue], now)
+
+    def bot_for(self, app: str) -> AbstractChatBot:
+        """
+        Any running bot of ``app``; they share the token, so any of them can reach every channel.
+        Without one, a delivery-only bot of ``app`` is started and kept for the next deliveries.
+        """
+        for scheduler in self.schedulers.values():
+            if scheduler.schedule.app == app:
+                return scheduler.bot_instance
+        if app not in self.delivery_bots:
+            token = self.token_for(app)
+            if not token:
+                raise LookupError(f"No running bot for app: {app}")
+            bot = create_bot(app, token, self.planner or ResearchPaperSearcher(self.extraction_tokens, logger=logger))
+            bot.outbox = self.outbox
+            bot.bot_for = self.bot_for
+            self.delivery_bots[app] = bot
+            self.delivery_tasks[app] = asyncio.create_task(bot.start_bot(), name=f"bot:{app}")
+            logger.info(f"Started a delivery bot for {app}.")
+        return self.delivery_bots[app]
+
+    async def stop_unused_delivery_bots(self):
+        """Stops the delivery-only bots whose platform no schedule delivers to any more."""
+        wanted = {app for scheduler in self.schedulers.values() for app in scheduler.schedule.apps()}
+        for app in [app for app in self.delivery_bots if app not in wanted]:
+            bot = self.delivery_bots.pop(app)
+            task = self.delivery_tasks.pop(app)
+            try:
+                await bot.stop_bot()
+            except Exception as e:
+                logger.error(f"Error stopping {app} delivery bot: {e}")
+            if not task.done():
+                task.cancel()
+            logger.info(f"Stopped the delivery bot for {app}.")
+
+    async def remove(self, key: str):
+        scheduler = self.schedulers.pop(key)
+        self.fingerprints.pop(key, None)
+        task = self.tasks.pop(key, None)
+        try:
+            await scheduler.shutdown()
+        except Exception as e:
+            logger.error(f"Error stopping schedule {key}: {e}")
+        if task and not task.done():
+            task.cancel()
+        if not self.tasks:
+            self.idle.set()
+        logger.info(f"Removed schedule {key}")
+
+    def reap(self, key: str, task: asyncio.Task):
+        """Done callback of a schedule's task: forgets a schedule whose bot stopped by itself."""
+        if self.tasks.get(key) is not task:
+            # Removed or replaced by apply(), which already forgot it
+            return
+        # Forget it so the next reload starts it again
+        self.tasks.pop(key)
+        self.schedulers.pop(key, None)
+        self.fingerprints.pop(key, None)
+        if not task.cancelled() and task.exception():
+            logger.error(f"Schedule {key} stopped: {task.exception()}")
+        else:
+            logger.info(f"Schedule {key} stopped.")
+        if not self.tasks:
+            self.idle.set()
+
+    async def wait(self, keep_running: bool = False):
+        """
+        Wait while schedules are running; returns once all of them have stopped,
+        or on ``stop()``. With ``keep_running`` (``--watch``, where a reload can
+        start new schedules) it only returns on ``stop()``. Stopped schedules are
+        reaped as they stop.
+        """
+        if not keep_running and not self.tasks:
+            return
+        waits = [asyncio.create_task(self.stopping.wait())]
+        if not keep_running:
+            waits.append(asyncio.create_task(self.idle.wait()))
+        try:
+            await asyncio.wait(waits, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            for task in waits:
+                task.cancel()
+
+    def stop(self):
+        """Makes ``wait`` return; the schedules keep running until ``shutdown``."""
+        self.stopping.set()
+
+    async def shutdown(self):
+        """Stops every schedule and delivery bot."""
+        for key in list(self.schedulers):
+            await self.remove(key)
+        await self.stop_unused_delivery_bots()
+
+
+class StoreDispatcher:
+    """
+    Fires the schedules kept in a ScheduleStore.
+
+    Instead of one bot and one APScheduler job per schedule, a single loop
+    sleeps until the earliest ``next_fire_at`` in the store, reads the due
+    schedules a page at a time and runs them through one shared bot per app.
+    Nothing is loaded up front, so startup does not grow with the number of
+    schedules, and schedules edited in the store are picked up on the next poll.
+    """
+
+    def __init__(self,
+                 store: ScheduleStore,
+                 extraction_tokens: dict,
+                 token_for: Callable[[str], Optional[str]],
+                 page_size: int = 200,
+                 max_concurrent_runs: int = 20,
+                 poll_interval: float = 30.0,
+                 outbox: Optional[DeliveryQueue] = None,
+                 planner: Optional[QueryPlanner] = None,
+                 coordinator: Optional[ShardCoordinator] = None,
+                 catch_up: Optional[CatchUpPolicy] = None,
+                 prefetch_lead: Optional[float] = None):
+        """
+        Args:
+            store (ScheduleStore): Where the schedules and their next fire times live.
+            extraction_tokens (dict): API keys for the shared ResearchPaperSearcher.
+            token_for (Callable): Returns the bot token for an app name, or None.
+            page_size (int): Due schedules read per query.
+            max_concurrent_runs (int): Runs allowed to search and notify at the same time.
+            poll_interval (float): Longest sleep between checks, so new schedules are noticed.
+            outbox (DeliveryQueue, optional): When given, runs enqueue their digests here instead of sending them.
+            planner (QueryPlanner, optional): When given, the schedules due in a tick are searched
+                together, one request set for their unique keywords.
+            coordinator (ShardCoordinator, optional): When given, only the schedules of the shards
+                this replica holds are fired, so several replicas can share the store.
+            catch_up (CatchUpPolicy, optional): How fires missed by more than its grace (the process
+                was down or stalled) are caught up; coalesced and spread over five minutes by default.
+            prefetch_lead (float, optional): Seconds before its fire time that a schedule's search
+                starts, so the digest only has to be sent when it fires (``--prefetch`` by default).
+        """
+        self.store = store
+        self.token_for = token_for
+        self.page_size = page_size
+        self.poll_interval = poll_interval
+        self.outbox = outbox
+        self.planner = planner
+        self.coordinator = coordinator
+        self.catch_up = catch_up or CatchUpPolicy()
+        self.prefetch_lead = prefetch.PREFETCH_LEAD if prefetch_lead is None else prefetch_lead
+        # Searches started ahead, keyed by (schedule id, fire time) so a changed schedule does not reuse them
+        self.prefetcher = prefetch.Prefetcher()
+        self.research_searcher = ResearchPaperSearcher(extraction_tokens, logger=logger)
+        self.semaphore = asyncio.Semaphore(max_concurrent_runs)
+        self.bots: Dict[str, AbstractChatBot] = {}
+        self.bot_tasks: Dict[str, asyncio.Task] = {}
+        self.runs: Set[asyncio.Task] = set()
+
+    def get_bot(self, app: str) -> AbstractChatBot:
+        """One connected bot per app, started the first time a schedule needs it."""
+        if app not in self.bots:
+            token = self.token_for(app)
+            if not token:
+                raise ValueError(f"Missing bot token for app: {app}")
+            bot = create_bot(app, token, self.research_searcher)
+            bot.outbox = self.outbox
+            # Los destinos de otras plataformas se entregan con el bot compartido de cada una
+            bot.bot_for = self.get_bot
+            self.bots[app] = bot
+            self.bot_tasks[app] = asyncio.create_task(bot.start_bot(), name=f"bot:{app}")
+        return self.bots[app]
+
+    def dispatch_due(self, now: Optional[float] = None) -> int:
+        """Starts a run for every schedule due at ``now``. Returns how many were started."""
+        now = now if now is not None else time.time()
+        shards = self.shards()
+        if shards is not None and not shards:
+            return 0
+        dispatched = 0
+        overdue = []
+        while True:
+            page = self.store.due(now, self.page_size, shards)
+            if not page:
+                break
+            # Another replica may have fired some of them since they were read
+            due = self.store.claim(page, now)
+            on_time = []
+            for schedule in due:
+                if self.catch_up.is_overdue(schedule.next_fire_at, now):
+                    overdue.append((schedule, schedule.next_fire_at))
+                    continue
+                on_time.append(schedule)
+                search = self.prefetcher.take((schedule.id, schedule.next_fire_at), now)
+                if search is None and self.planner:
+                    # Registered now, before any run waits on the semaphore, so the whole tick is one plan
+                    search = self.planner.submit(schedule.search_keywords, schedule.providers)
+                self._start(self._run(schedule, search), schedule)
+            self.store.mark_fired([schedule.id for schedule in on_time], now)
+            dispatched += len(on_time)
+            if len(page) < self.page_size:
+                break
+        if self.planner:
+            self.planner.flush()
+        if dispatched:
+            logger.info(f"Dispatched {dispatched} due schedules.")
+        if overdue:
+            plan = self.catch_up.plan(overdue, now)
+            for delay, schedule in plan:
+                self._start(self._run_later(schedule, delay), schedule)
+            logger.info(f"{len(overdue)} schedules missed their fire time by more than {self.catch_up.grace:.0f} s: "
+                        f"{len(plan)} catch-up runs ({self.catch_up.mode}) over {self.catch_up.spread:.0f} s.")
+            dispatched += len(plan)
+        return dispatched
+
+    def prefetch_due(self, now: Optional[float] = None) -> int:
+        """
+        Starts the search of every schedule firing within ``prefetch_lead`` seconds
+        of ``now`` that has not started yet. The schedules are only read, not
+        claimed: ``dispatch_due`` claims them at their fire time and hands the
+        prefetched search to the run. Returns how many searches were started.
+        """
+        if self.prefetch_lead <= 0:
+            return 0
+        now = now if now is not None else time.time()
+        shards = self.shards()
+        self.prefetcher.expire(now)
+        if shards is not None and not shards:
+            return 0
+        started = 0
+        # Only schedules not due yet: the ones already due are dispatch_due's
+        cursor = (now, "\uffff")
+        while True:
+            page = self.store.due(now + self.prefetch_lead, self.page_size, shards, after=cursor)
+            for schedule in page:
+                key = (schedule.id, schedule.next_fire_at)
+                if key in self.prefetcher:
+                    continue
+                if self.planner:
+                    search = self.planner.submit(schedule.search_keywords, schedule.providers)
+                else:
+                    search = self.research_searcher.search_async(schedule.search_keywords, schedule.providers)
+                self.prefetcher.start(key, search, schedule.next_fire_at)
+                started += 1
+            if len(page) < self.page_size:
+                break
+            cursor = (page[-1].next_fire_at, page[-1].id)
+        if self.planner and started:
+            self.planner.flush()
+        if started:
+            logger.info(f"Prefetching {started} schedules firing in the next {self.prefetch_lead:.0f} s.")
+        return started
+
+    def _start(self, run, schedule: Schedule):
+        task = asyncio.create_task(run, name=f"run:{schedule.id}")
+        self.runs.add(task)
+        task.add_done_callback(self.runs.discard)
+
+    def shards(self) -> Optional[Set[int]]:
+        """Shards this replica fires, or None to fire every schedule."""
+        return None if self.coordinator is None else self.coordinator.owned
+
+    async def run_forever(self):
+        interval = self.poll_interval
+        if self.coordinator is not None:
+            interval = min(interval, self.coordinator.renew_interval)
+        while True:
+            if self.coordinator is not None:
+                try:
+                    self.coordinator.tick()
+                except Exception as e:
+                    logger.error(f"Could not renew shard leases: {e}")
+            self.dispatch_due()
+            now = time.time()
+            self.prefetch_due(now)
+            wake_at = self.store.next_due_at(self.shards())
+            if self.prefetch_lead > 0:
+                # Everything firing within the lead is prefetched; the next one to prefetch fires after it
+                next_prefetch = self.store.next_due_at(self.shards(), after=now + self.prefetch_lead)
+                if next_prefetch is not None:
+                    wake_at = min(wake_at, next_prefetch - self.prefetch_lead)
+            delay = interval if wake_at is None else wake_at - time.time()
+            await asyncio.sleep(min(max(delay, 0.0), interval))
+
+    async def _run_later(self, schedule: Schedule, delay: float):
+        """A catch-up run: waits its turn, then runs like an on-time one (sharing a plan with its neighbours)."""
+        await asyncio.sleep(delay)
+        self.store.mark_fired([schedule.id])
+        search = self.planner.submit(schedule.search_keywords, schedule.providers) if self.planner else None
+        await self._run(schedule, search)
+
+    async def _run(self, schedule: Schedule, search: Optional[asyncio.Future] = None):
+        try:
+            articles = await search if search is not None else None
+        except Exception as e:
+            logger.error(f"Error searching for schedule {schedule.id}: {e}")
+            return
+        if search is not None:
+            # The planned search is shared with the whole tick; only the run itself is paced (bot.run paces itself)
+            await start_slot()
+        async with self.semaphore:
+            try:
+                bot = self.get_bot(schedule.app)
+                if search is None:
+                    await bot.run(schedule)
+                else:
+                    await bot.publish(schedule, articles)
+            except Exception as e:
+                logger.error(f"Error running schedule {schedule.id}: {e}")
+
+    async def shutdown(self):
+        if self.coordinator is not None:
+            try:
+                self.coordinator.leave()
+            except Exception as e:
+                logger.error(f"Could not release shard leases: {e}")
+        self.prefetcher.clear()
+        for task in list(self.runs):
+            task.cancel()
+        for app, bot in self.bots.items():
+            try:
+                await bot.stop_bot()
+            except Exception as e:
+                logger.error(f"Error stopping {app} bot: {e}")
@@ -1,36 +1,79 @@
+import asyncio
+import time
+from collections import defaultdict
 from random import choice
+from typing import Dict, List, Optional
 import discord
 from discord.ext import commands
+from chats.discord_channels import ChannelIndex
+from chats.discord_digest import pack_embeds, pack_text
 from infrastructure.bot_abstract import AbstractChatBot
 from models.logger_model import LoggerConfig
-from models.paper_model import Schedule
+from models.paper_model import ArticleMetadata, Schedule
 from service.api_consumer import ResearchPaperSearcher
 
 config = LoggerConfig(name="DiscordBot", log_file="DiscordBot.log")
 logger = config.get_logger()
 class DiscordBot(AbstractChatBot):
+    # Separación mínima entre envíos a un canal; Discord permite unas 5 peticiones cada 5 s por canal
+    send_interval = 1.0
+    # Segundos que un envío espera a la conexión con Discord antes de fallar (y reintentarse)
+    ready_timeout = 60.0
+
     def __init__(self, token, 
                  research_paper_searcher: ResearchPaperSearcher, 
-                 crondict: dict,
-                 schedule: Schedule,
+                 crondict: Optional[dict] = None,
+                 schedule: Optional[Schedule] = None,
                  prefix='!'):
         super().__init__(token, research_paper_searcher, crondict, schedule, prefix)
         self.intents = discord.Intents.default()
         self.bot = commands.Bot(command_prefix=self.prefix, intents=self.intents)
+        # Los envíos a un mismo canal van en orden y espaciados send_interval segundos
+        self.send_locks: Dict[str, asyncio.Lock] = defaultdict(asyncio.Lock)
+        self.last_send: Dict[str, float] = {}
+        self.channels = ChannelIndex()
         
         self.register_events()
         self.register_commands()
 
     def get_channel_if(self, channel_name: str):
-        target_channel = discord.utils.get(self.bot.get_all_channels(), name=channel_name)
-        return target_channel
+        """Channel by ID, 'guild/channel' or name, from the index kept by the channel events."""
+        return self.channels.get(channel_name)
 
     def register_events(self):
         @self.bot.event
         async def on_ready():
-            await self.run()
+            # Tras una reconexión pueden haber cambiado los canales: se reconstruye el índice
+            self.channels.rebuild(self.bot.get_all_channels())
+            logger.info(f"Indexed {len(self.channels)} channels.")
+            # on_ready fires again after every reconnect
+            if self.scheduler.running:
+                return
+            if self.schedule and self.run_on_start:
+                await self.run()
             self.scheduler.start()
 
+        @self.bot.event
+        async def on_guild_channel_create(channel):
+            self.channels.add(channel)
+
+        @self.bot.event
+        async def on_guild_channel_update(before, after):
+            self.channels.update(before, after)
+
+        @self.bot.event
+        async def on_guild_channel_delete(channel):
+            self.channels.remove(channel)
+
+        @self.bot.event
+        async def on_guild_join(guild):
+            for channel in guild.channels:
+                self.channels.add(channel)
+
+        @self.bot.event
+        async def on_guild_remove(guild):
+            self.channels.remove_guild(guild)
+
         # If more events are needed, they can be added here
 
     def register_commands(self):
@@ -46,18 +89,47 @@ class DiscordBot(AbstractChatBot):
 
         # If more commands are needed, they can be added here
 
-    async def notify(self, message):
+    async def notify(self, message, channel: Optional[str] = None):
+        # Los mensajes largos se reparten en varios de como mucho 2000 caracteres
+        await self.send_all(channel, [{"content": part} for part in pack_text(message.split("\n"))])
+
+    async def deliver(self, articles: List[ArticleMetadata], channel: Optional[str] = None):
+        """Send the digest as embeds, packing the articles into as few messages as Discord allows."""
+        messages = pack_embeds(articles, title=f"{len(articles)} new papers")
+        logger.info(f"Packed {len(articles)} articles into {len(messages)} messages.")
+        await self.send_all(channel, [{"embeds": [discord.Embed.from_dict(embed) for embed in embeds]}
+                                      for embeds in messages])
+
+    async def send_all(self, channel: Optional[str], payloads: List[dict]):
+        """Send ``payloads`` (keyword arguments of ``channel.send``) in order through the paced pipeline."""
+        channel_name = channel or self.schedule.channel
         try:
-            await self.bot.wait_until_ready()
-            logger.info(f"searching channel {self.schedule.channel}")
-            channel = self.get_channel_if(self.schedule.channel)
-            logger.info(f"Enviando mensaje a {channel}")
-            if channel:
-                await channel.send(message)
+            try:
+                await asyncio.wait_for(self.bot.wait_until_ready(), self.ready_timeout)
+            except asyncio.TimeoutError:
+                raise TimeoutError(f"Discord bot not ready after {self.ready_timeout:.0f} s.") from None
+            logger.info(f"searching channel {channel_name}")
+            target = self.get_channel_if(channel_name)
+            if not target:
+                raise LookupError(f"Channel not found: {channel_name}")
+            logger.info(f"Enviando {len(payloads)} mensajes a {target}")
+            # Discord limita por canal: cada canal tiene su propio turno y espaciado
+            async with self.send_locks[channel_name]:
+                for payload in payloads:
+                    wait = self.last_send.get(channel_name, 0.0) + self.send_interval - time.monotonic()
+                    if wait > 0:
+                        await asyncio.sleep(wait)
+                    await target.send(**payload)
+                    self.last_send[channel_name] = time.monotonic()
             logger.info(f"Mensaje enviado")
         except Exception as e:
             logger.error(f"Error notifying channel: {e}")
+            raise
 
     async def start_bot(self):
         await self.bot.start(self.token)
 
+    async def stop_bot(self):
+        await super().stop_bot()
+        await self.bot.close()
+
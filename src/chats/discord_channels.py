@@ -0,0 +1,85 @@
+from typing import Dict, Iterable, Optional, Union
+
+from models.logger_model import LoggerConfig
+
+config = LoggerConfig(name="DiscordBot", log_file="DiscordBot.log")
+logger = config.get_logger()
+
+
+class ChannelIndex:
+    """
+    Índice de los canales del bot por ID, por nombre y por ``guild/canal``.
+
+    Se construye al conectar y se mantiene con los eventos de creación,
+    modificación y borrado de canales, de modo que buscar un canal no depende
+    del número de servidores. Funciona con cualquier objeto con ``id``, ``name``
+    y ``guild``.
+    """
+
+    def __init__(self):
+        self.by_id: Dict[int, object] = {}
+        # Un mismo nombre puede existir en varios servidores: nombre -> {id: canal}
+        self.by_name: Dict[str, Dict[int, object]] = {}
+        self.by_qualified_name: Dict[str, object] = {}
+
+    def __len__(self) -> int:
+        return len(self.by_id)
+
+    @staticmethod
+    def qualified_name(channel) -> str:
+        return f"{channel.guild.name}/{channel.name}"
+
+    def rebuild(self, channels: Iterable):
+        self.by_id.clear()
+        self.by_name.clear()
+        self.by_qualified_name.clear()
+        for channel in channels:
+            self.add(channel)
+
+    def add(self, channel):
+        if channel.id in self.by_id:
+            self.remove(self.by_id[channel.id])
+        self.by_id[channel.id] = channel
+        self.by_name.setdefault(channel.name, {})[channel.id] = channel
+        self.by_qualified_name[self.qualified_name(channel)] = channel
+
+    def remove(self, channel):
+        indexed = self.by_id.pop(channel.id, None)
+        if indexed is None:
+            return
+        same_name = self.by_name.get(indexed.name, {})
+        same_name.pop(indexed.id, None)
+        if not same_name:
+            self.by_name.pop(indexed.name, None)
+        qualified = self.qualified_name(indexed)
+        if self.by_qualified_name.get(qualified) is indexed:
+            del self.by_qualified_name[qualified]
+
+    def update(self, before, after):
+        self.remove(before)
+        self.add(after)
+
+    def remove_guild(self, guild):
+        for channel in [c for c in self.by_id.values() if c.guild.id == guild.id]:
+            self.remove(channel)
+
+    def get(self, reference: Union[int, str]) -> Optional[object]:
+        """
+        Busca un canal por ID (número o cadena de dígitos), por ``guild/canal`` o por nombre.
+        Si el nombre existe en varios servidores se usa el de menor ID y se avisa.
+        """
+        reference = str(reference)
+        if reference.isdigit():
+            channel = self.by_id.get(int(reference))
+            if channel is not None:
+                return channel
+        channel = self.by_qualified_name.get(reference)
+        if channel is not None:
+            return channel
+        matches = self.by_name.get(reference)
+        if not matches:
+            return None
+        if len(matches) > 1:
+            logger.warning(f"Channel name '{reference}' matches {len(matches)} channels; "
+                           f"using the one with the lowest ID. Use its ID or 'guild/channel' instead.")
+        return matches[min(matches)]
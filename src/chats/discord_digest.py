@@ -0,0 +1,107 @@
+from typing import Iterable, List
+
+from chats.rendering import Template, quote_link, render_fragment
+from models.paper_model import ArticleMetadata
+
+# Límites de la API de Discord (en caracteres)
+MESSAGE_LIMIT = 2000
+EMBED_TITLE_LIMIT = 256
+EMBED_DESCRIPTION_LIMIT = 4096
+EMBED_TOTAL_LIMIT = 6000
+EMBEDS_PER_MESSAGE = 10
+
+DIGEST_COLOUR = 0x5865F2
+
+
+def _escape(text: str) -> str:
+    return text.replace("[", "\\[").replace("]", "\\]")
+
+
+def _truncate(text: str, limit: int) -> str:
+    return text if len(text) <= limit else text[:limit - 1] + "…"
+
+
+def _escape_link(link: str) -> str:
+    # Un paréntesis cerraría el enlace de markdown antes de tiempo
+    return quote_link(link, unsafe="()")
+
+
+# Una línea por artículo: fecha y título enlazado, sin separadores
+ARTICLE_LINE = Template("`{date}` [{title}]({link})", escape=_escape, limit=EMBED_DESCRIPTION_LIMIT,
+                        escape_link=_escape_link)
+
+
+def article_line(article: ArticleMetadata) -> str:
+    """La línea de ``article`` en un embed, desde la caché de fragmentos."""
+    return render_fragment("discord", article, ARTICLE_LINE.render)
+
+
+def pack_text(lines: Iterable[str], limit: int = MESSAGE_LIMIT) -> List[str]:
+    """
+    Agrupa las líneas en el menor número de mensajes de como mucho ``limit``
+    caracteres, manteniendo el orden. Las líneas más largas que el límite se cortan.
+    """
+    messages, current, size = [], [], 0
+    for line in lines:
+        line = _truncate(line, limit)
+        extra = len(line) + (1 if current else 0)
+        if current and size + extra > limit:
+            messages.append("\n".join(current))
+            current, size = [], 0
+            extra = len(line)
+        current.append(line)
+        size += extra
+    if current:
+        messages.append("\n".join(current))
+    return messages
+
+
+def pack_embeds(articles: List[ArticleMetadata], title: str = "New papers") -> List[List[dict]]:
+    """
+    Reparte los artículos en embeds y los embeds en mensajes, llenando cada
+    mensaje al máximo que permiten Discord (descripción por embed, total por
+    mensaje y número de embeds) antes de empezar el siguiente.
+
+    Returns:
+        List[List[dict]]: Un elemento por mensaje, con los embeds en formato ``discord.Embed.to_dict``.
+    """
+    title = _truncate(title, EMBED_TITLE_LIMIT)
+    messages: List[List[dict]] = []
+    embeds: List[dict] = []
+    lines: List[str] = []
+    embed_size = 0
+    message_size = len(title)
+
+    def close_embed():
+        nonlocal lines, embed_size
+        if lines:
+            embed = {"description": "\n".join(lines), "color": DIGEST_COLOUR}
+            if not messages and not embeds:
+                embed["title"] = title
+            embeds.append(embed)
+        lines, embed_size = [], 0
+
+    def close_message():
+        nonlocal embeds, message_size
+        close_embed()
+        if embeds:
+            messages.append(embeds)
+        embeds, message_size = [], 0
+
+    for article in articles:
+        line = article_line(article)
+        extra = len(line) + (1 if lines else 0)
+        if message_size + extra > EMBED_TOTAL_LIMIT:
+            close_message()
+            extra = len(line)
+        elif embed_size + extra > EMBED_DESCRIPTION_LIMIT:
+            if len(embeds) + 1 >= EMBEDS_PER_MESSAGE:
+                close_message()
+            else:
+                close_embed()
+            extra = len(line)
+        lines.append(line)
+        embed_size += extra
+        message_size += extra
+    close_message()
+    return messages
@@ -1,41 +1,106 @@
 import asyncio
-from nio import AsyncClient, MatrixRoom, RoomMessageText
-
-class MatrixBot:
-
-    def __init__(self, homeserver: str, username: str, password: str):
-        self.client = AsyncClient(homeserver, username)
-        self.password = password
-
-    async def connect(self):
-        response = await self.client.login(self.password)
-        if not isinstance(response, str):
-            print(f"Logged in as {self.client.user_id} device id: {self.client.device_id}")
-        else:
-            print(response)
-
-    async def disconnect(self):
-        await self.client.logout()
-
-    async def send_message(self, room_id: str, message: str):
-        await self.client.room_send(
-            room_id=room_id,
-            message_type="m.room.message",
-            content={"msgtype": "m.text", "body": message},
-        )
-
-    async def listen_messages(self, callback):
-        self.client.add_event_callback(callback, RoomMessageText)
-        await self.client.sync_forever(timeout=30000)  # milliseconds
-if __name__=="__main__":
-    # Usage
-    async def custom_message_callback(room: MatrixRoom, event: RoomMessageText) -> None:
-        print(
-            f"Message received in room {room.display_name}\n"
-            f"{room.user_name(event.sender)} | {event.body}"
-        )
-
-    bot = MatrixBot("https://matrix.example.org", "@alice:example.org", "my-secret-password")
-
-    asyncio.run(bot.connect())
-    asyncio.run(bot.listen_messages(custom_message_callback))
+import os
+from typing import List, Optional
+from chats.discord_digest import pack_text
+from chats.matrix_digest import MESSAGE_LIMIT, pack_html
+from chats.matrix_session import MatrixSession
+from infrastructure.bot_abstract import AbstractChatBot
+from models.logger_model import LoggerConfig
+from models.paper_model import ArticleMetadata, Schedule
+from service.api_consumer import ResearchPaperSearcher
+
+config = LoggerConfig(name="MatrixBot", log_file="MatrixBot.log")
+logger = config.get_logger()
+
+
+class MatrixBot(AbstractChatBot):
+    """
+    Bot de Matrix. ``token`` es el access token de la cuenta; el servidor y el
+    usuario vienen de ``MATRIX_HOMESERVER`` y ``MATRIX_USER_ID``, y el estado de
+    la sesión se guarda en ``MATRIX_STORE_PATH``. Todos los bots de la misma
+    cuenta comparten un ``MatrixSession`` (un cliente y un bucle de sync).
+    El canal de una programación puede ser un id de sala, un alias o su nombre.
+    """
+
+    def __init__(self, token,
+                 research_paper_searcher: ResearchPaperSearcher,
+                 crondict: Optional[dict] = None,
+                 schedule: Optional[Schedule] = None,
+                 prefix='!'):
+        super().__init__(token, research_paper_searcher, crondict, schedule, prefix)
+        self.homeserver = os.getenv("MATRIX_HOMESERVER", "")
+        self.user_id = os.getenv("MATRIX_USER_ID", "")
+        self.store_path = os.getenv("MATRIX_STORE_PATH", "./matrix_store")
+        if not self.homeserver or not self.user_id:
+            raise ValueError("MATRIX_HOMESERVER and MATRIX_USER_ID are required for Matrix schedules.")
+        self.session: Optional[MatrixSession] = None
+        self.stopped = asyncio.Event()
+
+        self.register_events()
+        self.register_commands()
+
+    def get_channel_if(self, channel_name: str):
+        """Room id of a room id, alias or name already known to the session."""
+        return self.session.room_id(channel_name) if self.session else None
+
+    def register_events(self):
+        # La sesión compartida sigue los cambios de salas en su propio bucle de sync
+        pass
+
+    def register_commands(self):
+        pass
+
+    async def notify(self, message, channel: Optional[str] = None):
+        await self.send_all(channel, [{"msgtype": "m.text", "body": part}
+                                      for part in pack_text(message.split("\n"), limit=MESSAGE_LIMIT)])
+
+    async def deliver(self, articles: List[ArticleMetadata], channel: Optional[str] = None):
+        """Send the digest as HTML lists (with a plain-text body), in as few events as fit."""
+        messages = pack_html(articles, title=f"{len(articles)} new papers")
+        logger.info(f"Packed {len(articles)} articles into {len(messages)} messages.")
+        await self.send_all(channel, messages)
+
+    async def send_all(self, channel: Optional[str], contents: List[dict]):
+        channel_name = channel or self.schedule.channel
+        try:
+            # The outbox worker may deliver before start_bot has run
+            self.connect()
+            await self.session.wait_ready(timeout=self.session.ready_timeout)
+            room_id = await self.session.resolve(channel_name)
+            if not room_id:
+                raise LookupError(f"Room not found: {channel_name}")
+            for content in contents:
+                await self.session.send(room_id, content)
+            logger.info(f"Sent {len(contents)} messages to {channel_name}.")
+        except Exception as e:
+            logger.error(f"Error notifying room {channel_name}: {e}")
+            raise
+
+    def connect(self) -> MatrixSession:
+        """Joins the account's shared session, starting it if this is its first bot."""
+        if self.session is None:
+            self.session = MatrixSession.acquire(self.homeserver, self.user_id, self.token, self.store_path)
+        return self.session
+
+    async def start_bot(self):
+        try:
+            await self.connect().wait_ready()
+        except Exception:
+            # El login o el primer sync fallaron
+            await self.release()
+            raise
+        if self.schedule and self.run_on_start:
+            await self.run()
+        self.scheduler.start()
+        # Como el bot de Discord, start_bot dura lo que el bot
+        await self.stopped.wait()
+
+    async def release(self):
+        if self.session is not None:
+            session, self.session = self.session, None
+            await session.release()
+
+    async def stop_bot(self):
+        await super().stop_bot()
+        self.stopped.set()
+        await self.release()
@@ -0,0 +1,60 @@
+import html
+from typing import List
+
+from chats.rendering import Template, render_fragment
+from models.paper_model import ArticleMetadata
+
+# Un evento de Matrix admite 64 KiB; los resúmenes largos se parten en mensajes de este tamaño
+# (texto plano y HTML sumados)
+MESSAGE_LIMIT = 16000
+
+HTML_FORMAT = "org.matrix.custom.html"
+
+# Cada artículo va en texto plano (``body``, para clientes sin HTML) y en HTML (``formatted_body``)
+ARTICLE_TEXT = Template("{date} {title} - {link}", limit=MESSAGE_LIMIT // 4)
+ARTICLE_HTML = Template('<li><a href="{link}">{title}</a> <em>{date}</em></li>', escape=html.escape,
+                        limit=MESSAGE_LIMIT // 2, escape_link=html.escape)
+
+
+def _render(article: ArticleMetadata) -> tuple:
+    return ARTICLE_TEXT.render(article), ARTICLE_HTML.render(article)
+
+
+def article_fragment(article: ArticleMetadata) -> tuple:
+    """``(texto, html)`` de un artículo, desde la caché de fragmentos."""
+    return render_fragment("matrix", article, _render)
+
+
+def _content(text_lines: List[str], html_items: List[str], heading: str) -> dict:
+    return {"msgtype": "m.text", "body": "\n".join(text_lines),
+            "format": HTML_FORMAT, "formatted_body": f"{heading}<ul>{''.join(html_items)}</ul>"}
+
+
+def pack_html(articles: List[ArticleMetadata], title: str = "New papers",
+              limit: int = MESSAGE_LIMIT) -> List[dict]:
+    """
+    Reparte los artículos en el menor número de mensajes cuyo texto y HTML
+    juntos no pasen de ``limit``; el primero empieza con el título.
+
+    Returns:
+        List[dict]: El contenido de cada evento ``m.room.message``.
+    """
+    messages: List[dict] = []
+    heading_text, heading_html = title, f"<h4>{html.escape(title)}</h4>"
+    text_lines, html_items = [heading_text], []
+    size = len(heading_text) + len(heading_html) + len("<ul></ul>")
+    for article in articles:
+        text, item = article_fragment(article)
+        extra = len(text) + 1 + len(item)
+        if html_items and size + extra > limit:
+            messages.append(_content(text_lines, html_items, heading_html))
+            heading_html = ""
+            text_lines, html_items = [], []
+            size = len("<ul></ul>")
+            extra = len(text) + len(item)
+        text_lines.append(text)
+        html_items.append(item)
+        size += extra
+    if html_items:
+        messages.append(_content(text_lines, html_items, heading_html))
+    return messages
@@ -0,0 +1,237 @@
+"""
+Conexión a Matrix compartida por todos los bots de una misma cuenta.
+
+Un único ``nio.AsyncClient`` por (servidor, usuario, token) hace un solo bucle
+de sync para todas las programaciones. El estado que hace falta para arrancar
+rápido se guarda en ``<store_path>/state.json``:
+
+- ``next_batch``: el token del último sync, de modo que un reinicio pide solo
+  la línea de tiempo desde entonces. El primer sync de cada arranque trae aun
+  así el estado completo de las salas (``full_state``), porque el cliente
+  empieza sin salas y los envíos cifrados necesitan conocerlas.
+- ``device_id``: el dispositivo de la sesión, para no crear uno nuevo en cada
+  arranque. Si ``matrix-nio`` tiene soporte de cifrado, sus claves se guardan
+  en el mismo directorio.
+- ``aliases``: alias y nombres de sala ya resueltos a su id. Se corrigen con
+  cada sync: las salas renombradas pierden el nombre antiguo y las que se han
+  abandonado desaparecen.
+
+El filtro de sync deja fuera la línea de tiempo, la presencia, los eventos
+efímeros y los miembros, que un bot que solo envía resúmenes no necesita; así
+el primer sync de una cuenta con muchas salas sigue siendo pequeño.
+"""
+
+import asyncio
+import json
+import os
+import time
+from typing import Dict, Optional, Tuple
+
+from nio import (AsyncClient, AsyncClientConfig, RoomResolveAliasError, RoomSendError, SyncError,
+                 WhoamiError)
+
+from models.logger_model import LoggerConfig
+
+config = LoggerConfig(name="MatrixSession", log_file="MatrixBot.log")
+logger = config.get_logger()
+
+SYNC_FILTER = {
+    "presence": {"not_types": ["*"]},
+    "account_data": {"not_types": ["*"]},
+    "room": {
+        "timeline": {"limit": 1, "types": ["m.room.name", "m.room.canonical_alias"]},
+        "state": {"types": ["m.room.name", "m.room.canonical_alias", "m.room.create", "m.room.encryption"],
+                  "lazy_load_members": True},
+        "ephemeral": {"not_types": ["*"]},
+        "account_data": {"not_types": ["*"]},
+    },
+}
+
+
+class MatrixSession:
+    """Cliente, bucle de sync y estado persistido de una cuenta; ver el docstring del módulo."""
+
+    # (servidor, usuario, token) -> sesión abierta; la comparten todos los MatrixBot de la cuenta
+    _sessions: Dict[Tuple[str, str, str], "MatrixSession"] = {}
+
+    sync_timeout_ms = 30000
+    # Segundos que un envío espera al primer sync antes de fallar
+    ready_timeout = 60.0
+    # Segundos mínimos entre escrituras del estado (además de al cerrar)
+    save_interval = 30.0
+    retry_delay = 5.0
+
+    def __init__(self, homeserver: str, user_id: str, token: str, store_path: str):
+        self.key = (homeserver, user_id, token)
+        self.store_path = store_path
+        self.state_path = os.path.join(store_path, "state.json")
+        os.makedirs(store_path, exist_ok=True)
+        self.state = self._load()
+        self.aliases: Dict[str, str] = self.state.setdefault("aliases", {})
+        self.client = AsyncClient(homeserver, user_id, device_id=self.state.get("device_id") or "",
+                                  store_path=store_path, config=AsyncClientConfig(store_sync_tokens=False))
+        self.token = token
+        self.users = 0
+        self.ready = asyncio.Event()
+        self.sync_task: Optional[asyncio.Task] = None
+        self.saved_at = 0.0
+
+    @classmethod
+    def acquire(cls, homeserver: str, user_id: str, token: str, store_path: str) -> "MatrixSession":
+        """
+        La sesión de la cuenta, creada y arrancada la primera vez (o de nuevo si
+        su bucle de sync ha terminado); cada ``acquire`` necesita su ``release``.
+        """
+        key = (homeserver, user_id, token)
+        session = cls._sessions.get(key)
+        if session is None or (session.sync_task is not None and session.sync_task.done()):
+            # Una sesión cuyo sync ha terminado queda para quien aún la usa, que la suelta
+            # con su release; los nuevos usuarios reciben una sesión nueva
+            session = cls._sessions[key] = cls(homeserver, user_id, token, store_path)
+        session.users += 1
+        if session.sync_task is None:
+            session.sync_task = asyncio.create_task(session._sync_forever(), name=f"matrix-sync:{user_id}")
+        return session
+
+    async def release(self):
+        """Deja de usar la sesión; la última en soltarla para el sync, guarda el estado y cierra el cliente."""
+        self.users -= 1
+        if self.users > 0:
+            return
+        if self._sessions.get(self.key) is self:
+            del self._sessions[self.key]
+        if self.sync_task is not None:
+            self.sync_task.cancel()
+            try:
+                await self.sync_task
+            except (asyncio.CancelledError, Exception):
+                pass
+        self._save(force=True)
+        await self.client.close()
+
+    def _load(self) -> dict:
+        try:
+            with open(self.state_path) as file:
+                return json.load(file)
+        except (OSError, ValueError):
+            return {}
+
+    def _save(self, force: bool = False):
+        if not force and time.monotonic() - self.saved_at < self.save_interval:
+            return
+        self.state["next_batch"] = self.client.next_batch or self.state.get("next_batch")
+        self.state["device_id"] = self.client.device_id or self.state.get("device_id")
+        temporary = self.state_path + ".tmp"
+        try:
+            with open(temporary, "w") as file:
+                json.dump(self.state, file)
+            os.replace(temporary, self.state_path)
+            self.saved_at = time.monotonic()
+        except OSError as e:
+            logger.error(f"Could not save Matrix state to {self.state_path}: {e}")
+
+    async def _login(self):
+        device_id = self.state.get("device_id")
+        if not device_id:
+            self.client.access_token = self.token
+            response = await self.client.whoami()
+            if isinstance(response, WhoamiError):
+                raise ConnectionError(f"Matrix login failed: {response.message}")
+            device_id = response.device_id or ""
+        self.client.restore_login(self.client.user, device_id, self.token)
+
+    async def _sync_forever(self):
+        await self._login()
+        since = self.state.get("next_batch")
+        logger.info(f"Matrix sync for {self.client.user_id} "
+                    f"{'resuming from the saved token' if since else 'starting with a full initial sync'}.")
+        while True:
+            started = time.perf_counter()
+            response = await self.client.sync(timeout=self.sync_timeout_ms if self.ready.is_set() else 0,
+                                              sync_filter=SYNC_FILTER, since=self.client.next_batch or since,
+                                              full_state=not self.ready.is_set())
+            if isinstance(response, SyncError):
+                # Sin un primer sync, o con el token rechazado, no hay nada que reintentar: el
+                # error llega a quien espera la sesión (wait_ready)
+                if not self.ready.is_set() or self._is_auth_error(response):
+                    logger.error(f"Matrix sync stopped: {response}")
+                    raise ConnectionError(f"Matrix sync for {self.client.user_id} failed: {response}")
+                logger.error(f"Matrix sync failed: {response.message}")
+                await asyncio.sleep(self.retry_delay)
+                continue
+            self._index(response.rooms.join, response.rooms.leave)
+            if not self.ready.is_set():
+                # El primer sync trae todas las salas: lo que apunte a otras es de salas abandonadas
+                self._forget(set(self.aliases.values()) - set(self.client.rooms))
+                logger.info(f"Matrix first sync took {time.perf_counter() - started:.2f} s, "
+                            f"{len(self.client.rooms)} rooms.")
+                self.ready.set()
+                self._save(force=True)
+            else:
+                self._save()
+
+    @staticmethod
+    def _is_auth_error(response: SyncError) -> bool:
+        """Token revocado, desconocido o sin permiso (401/403)."""
+        transport = getattr(response, "transport_response", None)
+        status = getattr(transport, "status", None)
+        return status in (401, 403) or response.status_code in ("M_UNKNOWN_TOKEN", "M_MISSING_TOKEN", "M_FORBIDDEN")
+
+    async def wait_ready(self, timeout: Optional[float] = None):
+        """Espera al primer sync; si el bucle de sync ha terminado o no llega a tiempo, lanza su error."""
+        if self.ready.is_set() and not self.sync_task.done():
+            return
+        ready = asyncio.create_task(self.ready.wait())
+        done, _ = await asyncio.wait([ready, self.sync_task], timeout=timeout,
+                                     return_when=asyncio.FIRST_COMPLETED)
+        ready.cancel()
+        if self.sync_task.done():
+            error = None if self.sync_task.cancelled() else self.sync_task.exception()
+            raise ConnectionError(f"Matrix session for {self.client.user_id} stopped: {error}")
+        if not done:
+            raise TimeoutError(f"Matrix session for {self.client.user_id} not ready after {timeout:.0f} s.")
+
+    def _index(self, joined, left=()):
+        """Apunta de nuevo los alias y nombres de las salas que han cambiado en el último sync."""
+        self._forget(set(joined) | set(left))
+        for room_id in joined:
+            room = self.client.rooms.get(room_id)
+            if room is None:
+                continue
+            if room.canonical_alias:
+                self.aliases[room.canonical_alias] = room_id
+            if room.name:
+                self.aliases[room.name] = room_id
+
+    def _forget(self, room_ids):
+        """Quita los alias y nombres que apuntan a ``room_ids``."""
+        if room_ids:
+            for reference in [ref for ref, room_id in self.aliases.items() if room_id in room_ids]:
+                del self.aliases[reference]
+
+    def room_id(self, reference: str) -> Optional[str]:
+        """Id de sala de un id (``!...``), alias (``#...``) o nombre ya conocidos, sin consultar al servidor."""
+        if reference.startswith("!"):
+            return reference
+        return self.aliases.get(reference)
+
+    async def resolve(self, reference: str) -> Optional[str]:
+        """Como ``room_id``, preguntando al servidor por los alias que aún no están en la caché."""
+        room_id = self.room_id(reference)
+        if room_id is None and reference.startswith("#"):
+            response = await self.client.room_resolve_alias(reference)
+            if isinstance(response, RoomResolveAliasError):
+                logger.warning(f"Could not resolve Matrix alias {reference}: {response.message}")
+                return None
+            room_id = self.aliases[reference] = response.room_id
+        return room_id
+
+    async def send_text(self, room_id: str, body: str):
+        await self.send(room_id, {"msgtype": "m.text", "body": body})
+
+    async def send(self, room_id: str, content: dict):
+        """Envía un ``m.room.message`` con ``content`` (texto plano o con ``formatted_body``)."""
+        response = await self.client.room_send(room_id, "m.room.message", content,
+                                               ignore_unverified_devices=True)
+        if isinstance(response, RoomSendError):
+            raise ConnectionError(f"Matrix send to {room_id} failed: {response.message}")
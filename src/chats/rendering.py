@@ -0,0 +1,142 @@
+"""
+Fragmentos de resumen por plataforma, con caché.
+
+Cada plataforma describe cómo se ve un artículo con una ``Template``: el
+patrón se compila una vez (``str.format`` ligado) junto con el escapado y el
+límite de longitud del título. Lo renderizado se guarda en una caché LRU
+compartida por todo el proceso, con clave (plataforma, artículo), de modo que
+los artículos populares que aparecen en varios canales y disparos se
+renderizan una sola vez. Los ``pack_*`` de cada plataforma solo juntan
+fragmentos ya hechos.
+
+El artículo se identifica por su enlace junto con el título y la fecha que
+aparecen en el fragmento, para que un título corregido no se sirva desde la
+caché con el texto antiguo.
+"""
+
+import urllib.parse
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional, Tuple
+
+from models.paper_model import ArticleMetadata
+
+# Fragmentos guardados entre todas las plataformas (0 desactiva la caché)
+RENDER_CACHE_SIZE = 4096
+
+
+def _identity(text: str) -> str:
+    return text
+
+
+def _truncate(text: str, limit: int) -> str:
+    return text if len(text) <= limit else text[:limit - 1] + "…"
+
+
+# Caracteres que un enlace conserva tal cual; el resto (espacios, ``|``, ``<``, ``>``, no ASCII...) va con %
+URL_SAFE = ":/?#[]@!$&'()*+,;=%~"
+
+
+def quote_link(link: str, unsafe: str = "") -> str:
+    """El enlace con los caracteres fuera de ``URL_SAFE``, y los de ``unsafe``, codificados con %."""
+    return urllib.parse.quote(link, safe="".join(c for c in URL_SAFE if c not in unsafe))
+
+
+class Template:
+    """
+    Patrón de un artículo con los campos ``{title}``, ``{link}``, ``{date}``
+    (``AAAA-MM-DD``) y ``{published}`` (la fecha completa). El título se escapa
+    con ``escape`` y el enlace con ``escape_link``, y el título se recorta para
+    que el resultado no pase de ``limit``.
+    """
+
+    def __init__(self, pattern: str, escape: Callable[[str], str] = _identity,
+                 limit: Optional[int] = None, strip: bool = True,
+                 escape_link: Callable[[str], str] = _identity):
+        self.pattern = pattern
+        self.escape = escape
+        self.limit = limit
+        self.strip = strip
+        self.escape_link = escape_link
+        self._format = pattern.format
+
+    def render(self, article: ArticleMetadata) -> str:
+        link = self.escape_link(article.link)
+        fields = {"link": link, "date": article.published.strftime("%Y-%m-%d"), "published": article.published}
+        title = self.escape(article.title.strip() if self.strip else article.title)
+        if self.limit is not None:
+            room = self.limit - len(self._format(title="", **fields))
+            title = _truncate(title, max(room, 1))
+        return self._format(title=title, **fields)
+
+
+class FragmentCache:
+    """Caché LRU de fragmentos renderizados, con clave (plataforma, artículo)."""
+
+    def __init__(self, size: int = RENDER_CACHE_SIZE):
+        """
+        Args:
+            size (int): Fragmentos guardados como máximo; los menos usados se descartan primero.
+        """
+        self.size = size
+        self.entries: "OrderedDict[Tuple[str, Hashable], Any]" = OrderedDict()
+        self.stats = {"hits": 0, "misses": 0, "evictions": 0}
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    @staticmethod
+    def article_key(article: ArticleMetadata) -> Hashable:
+        return (article.link, article.title, article.published)
+
+    def get(self, platform: str, article: ArticleMetadata, render: Callable[[ArticleMetadata], Any]) -> Any:
+        """El fragmento de ``article`` para ``platform``, renderizándolo con ``render`` si no está guardado."""
+        key = (platform, self.article_key(article))
+        fragment = self.entries.get(key)
+        if fragment is not None:
+            self.entries.move_to_end(key)
+            self.stats["hits"] += 1
+            return fragment
+        self.stats["misses"] += 1
+        fragment = render(article)
+        if self.size > 0:
+            self.entries[key] = fragment
+            while len(self.entries) > self.size:
+                self.entries.popitem(last=False)
+                self.stats["evictions"] += 1
+        return fragment
+
+    def resize(self, size: int):
+        self.size = size
+        while len(self.entries) > max(size, 0):
+            self.entries.popitem(last=False)
+
+    def clear(self):
+        self.entries.clear()
+
+    def hit_rate(self) -> float:
+        total = self.stats["hits"] + self.stats["misses"]
+        return self.stats["hits"] / total if total else 0.0
+
+
+FRAGMENTS = FragmentCache()
+
+
+def configure_rendering(cache_size: Optional[int] = None):
+    """Tamaño de la caché de fragmentos del proceso (``--render-cache-size``)."""
+    global RENDER_CACHE_SIZE
+    if cache_size is not None:
+        RENDER_CACHE_SIZE = cache_size
+        FRAGMENTS.resize(cache_size)
+
+
+def render_fragment(platform: str, article: ArticleMetadata, render: Callable[[ArticleMetadata], Any]) -> Any:
+    """Fragmento de ``article`` para ``platform`` desde la caché compartida."""
+    return FRAGMENTS.get(platform, article, render)
+
+
+# Texto plano de AbstractChatBot.format_articles, para plataformas sin formato propio
+TEXT_LINE = Template("{published}-{title} - {link}", strip=False)
+
+
+def text_line(article: ArticleMetadata) -> str:
+    return render_fragment("text", article, TEXT_LINE.render)
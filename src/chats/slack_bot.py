@@ -1,63 +1,110 @@
-import slack
-from slack.errors import SlackApiError
-from flask import Flask
-from slackeventsapi import SlackEventAdapter
+import asyncio
+import os
+from typing import List, Optional
+from chats.discord_digest import pack_text
+from chats.slack_digest import TEXT_LIMIT, pack_blocks
+from chats.slack_session import SlackSession
 from infrastructure.bot_abstract import AbstractChatBot
+from models.logger_model import LoggerConfig
+from models.paper_model import ArticleMetadata, Schedule
+from service.api_consumer import ResearchPaperSearcher
+
+config = LoggerConfig(name="SlackBot", log_file="SlackBot.log")
+logger = config.get_logger()
+
 
 class SlackBot(AbstractChatBot):
+    """
+    Bot de Slack asíncrono, en el mismo bucle de eventos que el scheduler.
+    ``token`` es el bot token (``xoxb-…``); todos los bots del mismo token
+    comparten un ``SlackSession``. Con ``SLACK_APP_TOKEN`` recibe además los
+    mensajes de los canales por Socket Mode (ver ``listen_messages``).
+    """
 
-    def __init__(self, token, signing_secret):
-        self.token = token
-        self.signing_secret = signing_secret
-        self.client = slack.WebClient(token=self.token)
-        self.app = Flask(__name__)
-        self.slack_event_adapter = SlackEventAdapter(self.signing_secret, '/slack/events', self.app)
+    def __init__(self, token,
+                 research_paper_searcher: ResearchPaperSearcher,
+                 crondict: Optional[dict] = None,
+                 schedule: Optional[Schedule] = None,
+                 prefix='!'):
+        super().__init__(token, research_paper_searcher, crondict, schedule, prefix)
+        self.app_token = os.getenv("SLACK_APP_TOKEN")
+        self.session: Optional[SlackSession] = None
+        self.stopped = asyncio.Event()
+        self.message_callbacks = []
 
-    def run(self):
-        self.app.run(debug=True)
+        self.register_events()
+        self.register_commands()
 
-    def send_message(self, channel, message):
-        self.client.chat_postMessage(channel=channel, text=message)
+    def get_channel_if(self, channel_name: str):
+        """Channel id of a channel id or of a name already indexed by the session."""
+        if self.session is None:
+            return None
+        return self.session.channels.get(channel_name.lstrip("#"))
 
-    def send_image(self, channel, file_path, initial_comment):
-        try:
-            response = self.client.files_upload(
-                file=file_path,
-                initial_comment=initial_comment,
-                channels=channel
-            )
-        except SlackApiError as e:
-            print(f"Got an error: {e.response['error']}")
+    def register_events(self):
+        # Los eventos llegan por la sesión compartida, que ya descarta los mensajes del propio bot
+        pass
+
+    def register_commands(self):
+        pass
 
     def listen_messages(self, callback):
-        @self.slack_event_adapter.on('message')
-        def message(payload):
-            event = payload.get('event', {})
-            user_id = event.get('user')
-            text = event.get('text')
-            
-            # Ignore messages from the bot itself
-            if user_id == self.client.auth_test()["user_id"]:
-                return
-            
-            # Pass the event to the provided callback
-            callback(event)
-
-if __name__ == "__main__":
-    # Create an instance of the SlackBot
-    bot = SlackBot("<Your Token>", "<Your SIGNING SECRET>")
-
-    # Logic for processing incoming messages
-    def my_callback(event):
-        channel_id = event.get('channel')
-        text = event.get('text')
-        
-        if text == "hi":
-            bot.send_message(channel_id, "Hello")
-        
-        if text == "image":
-            bot.send_image(channel_id, '/home/pragnakalpdev23/mysite/slack_file_display/download (2).jpg', 'This is a sample Image')
-
-    bot.listen_messages(my_callback)
-    bot.run()
+        """Calls ``await callback(event)`` for every message that is not the bot's own (needs SLACK_APP_TOKEN)."""
+        self.message_callbacks.append(callback)
+        if self.session is not None:
+            self.session.listeners.append(callback)
+
+    def connect(self) -> SlackSession:
+        """Joins the token's shared session, connecting it if this is its first bot."""
+        if self.session is None:
+            self.session = SlackSession.acquire(self.token, self.app_token)
+            self.session.listeners.extend(self.message_callbacks)
+        return self.session
+
+    async def notify(self, message, channel: Optional[str] = None):
+        await self.send_all(channel, [{"text": part} for part in pack_text(message.split("\n"), limit=TEXT_LIMIT)])
+
+    async def deliver(self, articles: List[ArticleMetadata], channel: Optional[str] = None):
+        """Send the digest as Block Kit messages, as few as Slack's block limit allows."""
+        title = f"{len(articles)} new papers"
+        messages = pack_blocks(articles, title=title)
+        logger.info(f"Packed {len(articles)} articles into {len(messages)} messages.")
+        await self.send_all(channel, [{"blocks": blocks, "text": title} for blocks in messages])
+
+    async def send_all(self, channel: Optional[str], messages: List[dict]):
+        channel_name = channel or self.schedule.channel
+        try:
+            session = self.connect()
+            await session.wait_ready()
+            channel_id = await session.channel_id(channel_name)
+            if not channel_id:
+                raise LookupError(f"Channel not found: {channel_name}")
+            await session.post_all(channel_id, messages)
+            logger.info(f"Sent {len(messages)} messages to {channel_name}.")
+        except Exception as e:
+            logger.error(f"Error notifying channel {channel_name}: {e}")
+            raise
+
+    async def start_bot(self):
+        try:
+            await self.connect().wait_ready()
+        except Exception:
+            await self.release()
+            raise
+        if self.schedule and self.run_on_start:
+            await self.run()
+        self.scheduler.start()
+        # Como el bot de Discord, start_bot dura lo que el bot
+        await self.stopped.wait()
+
+    async def stop_bot(self):
+        await super().stop_bot()
+        self.stopped.set()
+        await self.release()
 
+    async def release(self):
+        if self.session is not None:
+            session, self.session = self.session, None
+            if self.message_callbacks:
+                session.listeners[:] = [cb for cb in session.listeners if cb not in self.message_callbacks]
+            await session.release()
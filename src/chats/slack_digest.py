@@ -0,0 +1,59 @@
+from typing import List
+
+from chats.rendering import Template, quote_link, render_fragment
+from models.paper_model import ArticleMetadata
+
+# Límites de la API de Slack
+TEXT_LIMIT = 4000
+SECTION_TEXT_LIMIT = 3000
+HEADER_TEXT_LIMIT = 150
+BLOCKS_PER_MESSAGE = 50
+
+
+def _escape(text: str) -> str:
+    """Escapa los caracteres de control de mrkdwn (``&``, ``<`` y ``>``)."""
+    return text.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+
+
+def _truncate(text: str, limit: int) -> str:
+    return text if len(text) <= limit else text[:limit - 1] + "…"
+
+
+def _escape_link(link: str) -> str:
+    # ``|`` y ``>`` terminarían el enlace: van con %, y ``&`` se escapa como en el texto
+    return _escape(quote_link(link))
+
+
+# El texto mrkdwn de cada artículo: título enlazado y fecha
+ARTICLE_TEXT = Template("*<{link}|{title}>*\n{date}", escape=_escape, limit=SECTION_TEXT_LIMIT,
+                        escape_link=_escape_link)
+
+
+def _render_block(article: ArticleMetadata) -> dict:
+    return {"type": "section", "text": {"type": "mrkdwn", "text": ARTICLE_TEXT.render(article)}}
+
+
+def article_block(article: ArticleMetadata) -> dict:
+    """Un bloque ``section`` por artículo, desde la caché de fragmentos (no se debe modificar)."""
+    return render_fragment("slack", article, _render_block)
+
+
+def pack_blocks(articles: List[ArticleMetadata], title: str = "New papers") -> List[List[dict]]:
+    """
+    Reparte los artículos en el menor número de mensajes de como mucho
+    ``BLOCKS_PER_MESSAGE`` bloques; el primero empieza con una cabecera.
+
+    Returns:
+        List[List[dict]]: Los bloques de cada mensaje, tal y como los recibe ``chat.postMessage``.
+    """
+    header = {"type": "header", "text": {"type": "plain_text", "text": _truncate(title, HEADER_TEXT_LIMIT)}}
+    messages: List[List[dict]] = []
+    blocks: List[dict] = [header]
+    for article in articles:
+        if len(blocks) >= BLOCKS_PER_MESSAGE:
+            messages.append(blocks)
+            blocks = []
+        blocks.append(article_block(article))
+    if blocks and blocks != [header]:
+        messages.append(blocks)
+    return messages
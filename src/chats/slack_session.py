@@ -0,0 +1,153 @@
+"""
+Conexión a Slack compartida por todos los bots de un mismo token.
+
+Un ``AsyncWebClient`` con una única sesión de aiohttp, en el mismo bucle que
+el scheduler: sin servidor Flask ni hilos. El id de usuario del bot se pide una
+vez (``auth.test``) al conectar, y los nombres de canal se resuelven a su id
+con una sola paginación de ``conversations.list`` que se guarda en memoria.
+
+Los envíos a un canal van en orden y como mucho uno por segundo, que es lo
+que Slack admite para ``chat.postMessage``; si aun así responde 429, el
+cliente espera lo que indica ``Retry-After`` y reintenta. Con un app token
+(``SLACK_APP_TOKEN``) la sesión también recibe eventos por Socket Mode.
+"""
+
+import asyncio
+from collections import defaultdict
+from typing import Awaitable, Callable, Dict, List, Optional
+
+import aiohttp
+from slack_sdk.errors import SlackApiError
+from slack_sdk.http_retry.builtin_async_handlers import (AsyncConnectionErrorRetryHandler,
+                                                         AsyncRateLimitErrorRetryHandler)
+from slack_sdk.socket_mode.aiohttp import SocketModeClient
+from slack_sdk.socket_mode.request import SocketModeRequest
+from slack_sdk.socket_mode.response import SocketModeResponse
+from slack_sdk.web.async_client import AsyncWebClient
+
+from models.logger_model import LoggerConfig
+from service.delivery_queue import RateLimiter
+
+config = LoggerConfig(name="SlackSession", log_file="SlackBot.log")
+logger = config.get_logger()
+
+# Envíos por segundo a un mismo canal
+CHANNEL_RATE = 1.0
+
+
+class SlackSession:
+    """Cliente, caché de canales y límites de envío de un token; ver el docstring del módulo."""
+
+    _sessions: Dict[str, "SlackSession"] = {}
+
+    base_url = AsyncWebClient.BASE_URL
+
+    def __init__(self, token: str, app_token: Optional[str] = None):
+        self.token = token
+        self.app_token = app_token
+        self.http: Optional[aiohttp.ClientSession] = None
+        self.client: Optional[AsyncWebClient] = None
+        self.socket: Optional[SocketModeClient] = None
+        self.bot_user_id: Optional[str] = None
+        self.channels: Dict[str, str] = {}
+        self.channels_listed = False
+        self.users = 0
+        self.ready = asyncio.Event()
+        self.connect_task: Optional[asyncio.Task] = None
+        self.channel_locks: Dict[str, asyncio.Lock] = defaultdict(asyncio.Lock)
+        self.channel_limiters: Dict[str, RateLimiter] = defaultdict(lambda: RateLimiter(CHANNEL_RATE))
+        self.list_lock = asyncio.Lock()
+        self.listeners: List[Callable[[dict], Awaitable[None]]] = []
+
+    @classmethod
+    def acquire(cls, token: str, app_token: Optional[str] = None) -> "SlackSession":
+        """La sesión del token, conectándola la primera vez; cada ``acquire`` necesita su ``release``."""
+        session = cls._sessions.get(token)
+        if session is None:
+            session = cls._sessions[token] = cls(token, app_token)
+        session.users += 1
+        if session.connect_task is None:
+            session.connect_task = asyncio.create_task(session._connect(), name="slack-connect")
+        return session
+
+    async def release(self):
+        self.users -= 1
+        if self.users > 0:
+            return
+        self._sessions.pop(self.token, None)
+        if self.connect_task is not None and not self.connect_task.done():
+            self.connect_task.cancel()
+        if self.socket is not None:
+            await self.socket.close()
+        if self.http is not None:
+            await self.http.close()
+
+    async def _connect(self):
+        self.http = aiohttp.ClientSession()
+        self.client = AsyncWebClient(token=self.token, base_url=self.base_url, session=self.http, logger=logger,
+                                     retry_handlers=[AsyncConnectionErrorRetryHandler(),
+                                                     AsyncRateLimitErrorRetryHandler(max_retry_count=3)])
+        response = await self.client.auth_test()
+        self.bot_user_id = response["user_id"]
+        logger.info(f"Connected to Slack as {response.get('user')} ({self.bot_user_id}).")
+        if self.app_token:
+            self.socket = SocketModeClient(app_token=self.app_token, web_client=self.client, logger=logger)
+            self.socket.socket_mode_request_listeners.append(self._on_request)
+            await self.socket.connect()
+        self.ready.set()
+
+    async def wait_ready(self):
+        """Espera a la conexión; si ha fallado, lanza su error."""
+        ready = asyncio.create_task(self.ready.wait())
+        await asyncio.wait([ready, self.connect_task], return_when=asyncio.FIRST_COMPLETED)
+        ready.cancel()
+        if not self.ready.is_set():
+            error = None if self.connect_task.cancelled() else self.connect_task.exception()
+            raise ConnectionError(f"Slack connection failed: {error}")
+
+    async def _on_request(self, client: SocketModeClient, request: SocketModeRequest):
+        await client.send_socket_mode_response(SocketModeResponse(envelope_id=request.envelope_id))
+        event = request.payload.get("event", {}) if request.type == "events_api" else {}
+        # Los mensajes del propio bot no se reenvían (el id se guardó al conectar)
+        if event.get("type") != "message" or event.get("user") in (None, self.bot_user_id):
+            return
+        for listener in self.listeners:
+            try:
+                await listener(event)
+            except Exception as e:
+                logger.error(f"Error handling Slack message: {e}")
+
+    async def channel_id(self, reference: str) -> Optional[str]:
+        """Id de un canal por id (``C…``/``G…``) o nombre (con o sin ``#``)."""
+        name = reference.lstrip("#")
+        if name in self.channels:
+            return self.channels[name]
+        if reference[:1] in ("C", "G", "D") and reference.isupper():
+            return reference
+        async with self.list_lock:
+            if not self.channels_listed:
+                await self._list_channels()
+        return self.channels.get(name)
+
+    async def _list_channels(self):
+        cursor = None
+        while True:
+            response = await self.client.conversations_list(types="public_channel,private_channel",
+                                                            exclude_archived=True, limit=1000, cursor=cursor)
+            for channel in response["channels"]:
+                self.channels[channel["name"]] = channel["id"]
+            cursor = response.get("response_metadata", {}).get("next_cursor")
+            if not cursor:
+                break
+        self.channels_listed = True
+        logger.info(f"Indexed {len(self.channels)} Slack channels.")
+
+    async def post_all(self, channel_id: str, messages: List[dict]):
+        """Envía los mensajes (argumentos de ``chat.postMessage``) en orden, al ritmo que admite el canal."""
+        async with self.channel_locks[channel_id]:
+            for message in messages:
+                await self.channel_limiters[channel_id].acquire()
+                try:
+                    await self.client.chat_postMessage(channel=channel_id, **message)
+                except SlackApiError as e:
+                    raise ConnectionError(f"Slack post to {channel_id} failed: {e.response.get('error')}") from e
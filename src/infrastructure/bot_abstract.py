@@ -1,24 +1,56 @@
+import asyncio
+import time
 from abc import ABC, abstractmethod
-from typing import List
+from typing import Callable, List, Optional
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
+from chats.rendering import text_line
 from models.logger_model import LoggerConfig
-from models.paper_model import ArticleMetadata, Schedule
+from models.paper_model import ArticleMetadata, Destination, Schedule
 from service.api_consumer import ResearchPaperSearcher
+from service.load_spreading import cron_trigger, start_slot
+from service import prefetch
+
+ARTICLE_SEPARATOR = "----" * 10
 
 class AbstractChatBot(ABC):
 
     def __init__(self, token, 
                  research_paper_searcher: ResearchPaperSearcher, 
-                 crondict: dict, 
-                 schedule: Schedule, 
+                 crondict: Optional[dict] = None, 
+                 schedule: Optional[Schedule] = None, 
                  prefix='!'):
+        """
+        Without ``crondict`` and ``schedule`` the bot schedules nothing by itself
+        and only delivers the runs it is handed through ``run(schedule)``.
+        ``research_paper_searcher`` can also be a QueryPlanner shared by several bots.
+        """
         self.token = token
         self.prefix = prefix
         self.schedule = schedule
         self.research_paper_searcher = research_paper_searcher  
         self.scheduler = AsyncIOScheduler()
-        cron_args = crondict
-        self.scheduler.add_job(self.run, trigger='cron', **cron_args)
+        self.job = None
+        # DeliveryQueue opcional: si existe, run() encola el resumen en lugar de enviarlo
+        self.outbox = None
+        # Plataforma del bot (la fija create_bot) y, para los destinos de otras plataformas,
+        # quien da el bot de cada una; lo asigna el ScheduleManager o StoreDispatcher dueño del bot
+        self.app: Optional[str] = None
+        self.bot_for: Optional[Callable[[str], "AbstractChatBot"]] = None
+        # Ejecutar la programación nada más conectar; ScheduleManager lo desactiva cuando recupera
+        # los disparos perdidos por su cuenta (ver service.misfire)
+        self.run_on_start = True
+        # Con --prefetch, la búsqueda de cada disparo empieza antes y run() solo envía el resumen
+        self.prefetcher = prefetch.Prefetcher()
+        self.prefetch_lead = prefetch.PREFETCH_LEAD
+        self.prefetch_job = None
+        if crondict and schedule:
+            cron_args = crondict
+            # Con --jitter, cada programación se dispara con su propio desfase dentro de la ventana
+            self.job = self.scheduler.add_job(self.run, trigger=cron_trigger(cron_args, schedule.id), id=schedule.id)
+            if self.prefetch_lead > 0:
+                self.prefetch_job = self.scheduler.add_job(
+                    self.prefetch, trigger=cron_trigger(cron_args, schedule.id, lead=self.prefetch_lead),
+                    id=f"{schedule.id}:prefetch")
         
         # Logger setup inside class
         config = LoggerConfig(name="ChatBot", log_file="ChatBot.log")
@@ -39,28 +71,73 @@ class AbstractChatBot(ABC):
         """Register bot commands. Platform-specific."""
         pass
 
-    async def notify(self, message):
-        """Send a notification message. Should be implemented in derived classes based on platform specifics."""
+    async def notify(self, message, channel: Optional[str] = None):
+        """Send a notification message to ``channel`` (the schedule's channel by default).
+        Should be implemented in derived classes based on platform specifics."""
         pass  
 
-    async def run(self):
-        """Search for articles and notify the results."""
-        articles = self.research_paper_searcher.search(self.schedule.search_keywords)
-        
+    async def run(self, schedule: Optional[Schedule] = None):
+        """Search for articles and notify the results, for ``schedule`` or the bot's own schedule."""
+        # Only the bot's own cron fires have a prefetched search; catch-up and dispatched runs search now
+        prefetched = self.prefetcher.take(self.schedule.id) if schedule is None and self.schedule else None
+        schedule = schedule or self.schedule
+        await start_slot()
+        if prefetched is not None:
+            articles = await prefetched
+        else:
+            articles = await self.research_paper_searcher.search_async(schedule.search_keywords,
+                                                                       providers=schedule.providers)
+        await self.publish(schedule, articles)
+
+    async def prefetch(self):
+        """Start the search of the bot's next fire, ``prefetch_lead`` seconds ahead of it."""
+        schedule = self.schedule
+        next_run = self.job.next_run_time if self.job else None
+        fire_at = next_run.timestamp() if next_run else time.time() + self.prefetch_lead
+        self.prefetcher.start(schedule.id, self.research_paper_searcher.search_async(
+            schedule.search_keywords, providers=schedule.providers), fire_at)
+
+    async def publish(self, schedule: Schedule, articles: List[ArticleMetadata]):
+        """Queue or send the digest of a run whose articles were already searched,
+        to every destination of the schedule at once."""
         if not articles:
             self.logger.warning("No articles found for the given search keywords.")
             return
+        await asyncio.gather(*(self.publish_to(schedule, destination, articles)
+                               for destination in schedule.destinations))
+
+    async def publish_to(self, schedule: Schedule, destination: Destination, articles: List[ArticleMetadata]):
+        """Queue or send the digest to one destination; a failed destination does not stop the others."""
+        if self.outbox is not None:
+            self.outbox.enqueue(destination.app, destination.channel, articles)
+            self.logger.info(f"Queued {len(articles)} articles for {destination}.")
+            return
+        try:
+            await self.peer(schedule, destination.app).deliver(articles, destination.channel)
+        except Exception as e:
+            self.logger.error(f"Error delivering to {destination}: {e}")
+
+    def peer(self, schedule: Schedule, app: str) -> "AbstractChatBot":
+        """The bot that delivers to ``app``: this one for its own platform, else the one ``bot_for`` gives."""
+        if app == (self.app or schedule.app):
+            return self
+        if self.bot_for is None:
+            raise LookupError(f"No bot for app: {app}")
+        return self.bot_for(app)
 
+    async def deliver(self, articles: List[ArticleMetadata], channel: Optional[str] = None):
+        """Send a digest of ``articles``, raising if it could not be sent.
+        Platforms with richer messages can pack them their own way."""
         message = self.format_articles(articles)
-        await self.notify(message)
+        await self.notify(message, channel)
 
     def format_articles(self, articles: List[ArticleMetadata]) -> str:
-        """Format the list of articles into a string."""
+        """Format the list of articles into a string; each line comes from the shared fragment cache."""
         formatted_articles = []
         self.logger.info(f"Formatting articles...{len(articles)} found.")
         for article in articles:
-            formatted_articles.append(f"{article.published}-{article.title} - {article.link}")
-            formatted_articles.append("----"*10)
+            formatted_articles.append(text_line(article))
+            formatted_articles.append(ARTICLE_SEPARATOR)
         return "\n".join(formatted_articles)
 
     @abstractmethod
@@ -68,8 +145,23 @@ class AbstractChatBot(ABC):
         """Start the bot. This might differ based on the chat platform being used."""
         pass
 
+    def reschedule(self, schedule: Schedule, crondict: dict):
+        """Apply a changed schedule (cron expression or keywords) without restarting the bot."""
+        self.schedule = schedule
+        self.job.reschedule(trigger=cron_trigger(crondict, schedule.id))
+        # A search started for the old cron or keywords is no longer valid
+        self.prefetcher.discard(schedule.id)
+        if self.prefetch_job is not None:
+            self.prefetch_job.reschedule(trigger=cron_trigger(crondict, schedule.id, lead=self.prefetch_lead))
+
+    async def stop_bot(self):
+        """Stop scheduling runs. Platforms that hold a connection close it as well."""
+        self.prefetcher.clear()
+        if self.scheduler.running:
+            self.scheduler.shutdown(wait=False)
+
     def __del__(self):
         """Shutdown the scheduler when the bot is destroyed."""
-        if self.scheduler:
+        if self.scheduler and self.scheduler.running:
             self.scheduler.shutdown()
 
@@ -0,0 +1,50 @@
+import importlib
+import threading
+from typing import Dict, List
+
+
+class PluginRegistry:
+    """
+    Maps plugin names to ``"module:attribute"`` paths and imports each module
+    the first time its plugin is requested, so chat platforms and providers a
+    deployment never uses are never imported.
+    """
+
+    def __init__(self, kind: str):
+        """
+        Args:
+            kind (str): What the plugins are, used in error messages (e.g. "provider").
+        """
+        self.kind = kind
+        self._paths: Dict[str, str] = {}
+        self._loaded: Dict[str, object] = {}
+        self._lock = threading.Lock()
+
+    def register(self, name: str, path: str):
+        if ":" not in path:
+            raise ValueError(f"Invalid {self.kind} path '{path}', expected 'module:attribute'.")
+        self._paths[name] = path
+        self._loaded.pop(name, None)
+
+    def names(self) -> List[str]:
+        return list(self._paths)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._paths
+
+    def is_loaded(self, name: str) -> bool:
+        return name in self._loaded
+
+    def load(self, name: str):
+        """Returns the plugin object, importing its module on first use."""
+        plugin = self._loaded.get(name)
+        if plugin is not None:
+            return plugin
+        if name not in self._paths:
+            raise ValueError(f"Unknown {self.kind}: {name}")
+        with self._lock:
+            if name not in self._loaded:
+                module_name, attribute = self._paths[name].split(":", 1)
+                module = importlib.import_module(module_name)
+                self._loaded[name] = getattr(module, attribute)
+            return self._loaded[name]
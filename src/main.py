@@ -1,20 +1,43 @@
 import asyncio
 import os
 import argparse
+import signal
+import socket
+import sys
 from typing import List
 import yaml
 from dotenv import load_dotenv
-from bot import ResearchBotScheduler
-from models.logger_model import LoggerConfig
-
-from models.paper_model import Schedule
+from bot import ScheduleManager, StoreDispatcher
+from chats.rendering import RENDER_CACHE_SIZE, configure_rendering
+from models.logger_model import LoggerConfig, configure_logging
+
+from models.paper_model import Destination, Schedule
+from service.config_watcher import ConfigWatcher
+from service.coordination import ShardCoordinator, open_lease_store
+from service.delivery_queue import DeliveryQueue, DeliveryWorker
+from service.api_consumer import PROVIDERS, ResearchPaperSearcher, configure_search
+from service.batch_run import format_summary, run_once
+from service.http_client import configure_http
+from service.load_spreading import configure_spreading
+from service.prefetch import configure_prefetch
+from service.misfire import MISFIRE_MODES, CatchUpPolicy
+from service.query_planner import QueryPlanner
+from service.schedule_store import ScheduleStore
 
 load_dotenv()
 ENV_VARS = {
     "discord": "DISCORD_BOT_TOKEN",
-    "slack": "SLACK_BOT_TOKEN"
+    "slack": "SLACK_BOT_TOKEN",
+    "matrix": "MATRIX_ACCESS_TOKEN"
+}
+# Variables que, además del token, necesita cada plataforma
+APP_SETTINGS = {
+    "matrix": ["MATRIX_HOMESERVER", "MATRIX_USER_ID"]
+}
+API_KEYS = {
+    "xplore": "XPLORE_API_KEY",
+    "springer": "SPRINGER_API_KEY"
 }
-API_KEYS = ["XPLORE_API_KEY", "SPRINGER_API_KEY"]
 DEFAULT_YAML_PATH = os.getenv('DEFAULT_YAML_PATH')
 
 config = LoggerConfig(name="ResearchBot", log_file="research_bot.log")
@@ -22,20 +45,24 @@ logger = config.get_logger()
 
 
 
-def check_env_vars(app):
+def check_env_vars(app, providers=None):
     """
     Checks if the necessary environment variables are set for the specified app.
+    When ``providers`` is given, only the API keys of those providers are required.
     """
     missing_vars = []
 
     # Check API keys
-    for key in API_KEYS:
+    for provider, key in API_KEYS.items():
+        if providers is not None and provider not in providers:
+            continue
         if not os.getenv(key):
             missing_vars.append(key)
 
     # Check bot tokens
     if app in ENV_VARS and not os.getenv(ENV_VARS[app]):
         missing_vars.append(ENV_VARS[app])
+    missing_vars.extend(key for key in APP_SETTINGS.get(app, []) if not os.getenv(key))
 
     return missing_vars
 
@@ -50,6 +77,17 @@ def check_yaml_exists(yaml_path):
         bool: True si el archivo existe, False de lo contrario.
     """
     return os.path.exists(yaml_path)
+def get_destinations(schedule_data: dict) -> List[Destination]:
+    """
+    Destinos de una programación del YAML: ``app``/``channel`` si los tiene,
+    seguidos de los de su lista ``destinations``.
+    """
+    entries = ([schedule_data] if 'app' in schedule_data else []) + list(schedule_data.get('destinations') or [])
+    if not entries:
+        raise ValueError(f"Schedule without app/channel or destinations: {schedule_data}")
+    # Un ID de canal sin comillas llega como número
+    return [Destination(entry['app'], str(entry['channel'])) for entry in entries]
+
 def get_schedules_from_yaml(yaml_path: str) -> List[Schedule]:
     """
     Lee los datos de programación de un archivo YAML y devuelve una lista de objetos Schedule.
@@ -61,16 +99,26 @@ def get_schedules_from_yaml(yaml_path: str) -> List[Schedule]:
         List[Schedule]: Una lista de objetos Schedule.
     """
     schedules = []
+    seen_ids = {}
     with open(yaml_path, 'r') as file:
         data = yaml.safe_load(file)
         if data and 'schedules' in data:
             for schedule_data in data['schedules']:
+                destinations = get_destinations(schedule_data)
                 schedule = Schedule(
-                    channel=schedule_data['channel'],
-                    app=schedule_data['app'],
+                    channel=destinations[0].channel,
+                    app=destinations[0].app,
                     cron_schedule=schedule_data['cron_schedule'],
-                    search_keywords=schedule_data['search_keywords']
+                    search_keywords=schedule_data['search_keywords'],
+                    id=schedule_data.get('id'),
+                    providers=schedule_data.get('providers'),
+                    destinations=destinations
                 )
+                # Varias programaciones sin 'id' para el mismo canal se distinguen por su orden
+                occurrences = seen_ids.get(schedule.id, 0)
+                seen_ids[schedule.id] = occurrences + 1
+                if occurrences:
+                    schedule.id = f"{schedule.id}#{occurrences}"
                 schedules.append(schedule)
     return schedules
 def get_apps_from_yaml(yaml_path):
@@ -88,7 +136,7 @@ def get_apps_from_yaml(yaml_path):
         data = yaml.safe_load(file)
         if data and 'schedules' in data:
             for schedule in data['schedules']:
-                apps.append(schedule['app'])
+                apps.extend(destination.app for destination in get_destinations(schedule))
     return apps
 
 
@@ -96,31 +144,195 @@ def getargs():
     parser = argparse.ArgumentParser(description="Run a bot for specific apps.")
     parser.add_argument("--config", help="Path to the YAML configuration file.", default=DEFAULT_YAML_PATH)
     parser.add_argument("--logdir", help="Directory path for logs.", default="./logs")  # Argumento para el directorio de logs
+    parser.add_argument("--log-max-bytes", type=int, default=10 * 1024 * 1024,
+                        help="Rotate each log file when it reaches this size (0 disables size rotation).")
+    parser.add_argument("--log-backup-count", type=int, default=5, help="Rotated log files to keep.")
+    parser.add_argument("--log-rotate-when", default=None,
+                        help="Rotate logs by time instead of size (e.g. 'midnight', 'H').")
+    parser.add_argument("--http-timeout", type=float, default=30.0,
+                        help="Seconds to wait for a provider to answer.")
+    parser.add_argument("--http-cache-ttl", type=float, default=300.0,
+                        help="Seconds a provider response is reused for identical searches (0 disables).")
+    parser.add_argument("--no-http-revalidate", dest="http_revalidate", action="store_false",
+                        help="Do not send conditional requests (If-None-Match / If-Modified-Since) for expired responses.")
+    parser.add_argument("--http-report-interval", type=float, default=3600.0,
+                        help="Seconds between logs of the bytes received and saved per provider (0 disables).")
+    parser.add_argument("--batch-queries", action="store_true",
+                        help="Combine each schedule's keywords into as few OR queries as every provider allows, "
+                             "instead of one request per keyword.")
+    parser.add_argument("--plan-queries", action="store_true",
+                        help="Search the schedules that fire together as one plan, so requests depend on their "
+                             "unique keywords rather than on the number of schedules.")
+    parser.add_argument("--plan-window", type=float, default=1.0,
+                        help="Seconds a search waits for other schedules to join its plan when --plan-queries is set.")
+    parser.add_argument("--jitter", type=float, default=0.0,
+                        help="Spread each schedule's fires over this many seconds with a fixed per-schedule offset, "
+                             "so round cron expressions do not all fire in the same second.")
+    parser.add_argument("--max-starts-per-second", type=float, default=0.0,
+                        help="Most runs started per second across the process (0 for no limit).")
+    parser.add_argument("--prefetch", type=float, default=0.0,
+                        help="Start each schedule's search this many seconds before it fires, so the digest "
+                             "is sent right at the scheduled time (0 searches when it fires).")
+    parser.add_argument("--render-cache-size", type=int, default=RENDER_CACHE_SIZE,
+                        help="Rendered article fragments kept across digests, channels and platforms (0 disables).")
+    parser.add_argument("--store", help="Path to a SQLite schedule store. When set, schedules are read "
+                        "from the store instead of the YAML file.")
+    parser.add_argument("--import-config", action="store_true",
+                        help="Replace the contents of --store with the schedules of --config before starting.")
+    parser.add_argument("--lease-store",
+                        help="Shard the schedules of --store across every replica started with the same lease store: "
+                             "a SQLite file, or a directory for file locks.")
+    parser.add_argument("--worker-id", default=f"{socket.gethostname()}-{os.getpid()}",
+                        help="Unique name of this replica in the lease store.")
+    parser.add_argument("--lease-ttl", type=float, default=30.0,
+                        help="Seconds after which the shards of a replica that stopped renewing move to the others.")
+    parser.add_argument("--state", help="Path to a SQLite file where the YAML schedules' fire times are recorded, "
+                        "so the fires missed while stopped are caught up on the next start.")
+    parser.add_argument("--misfire", choices=MISFIRE_MODES, default="coalesce",
+                        help="Missed fires to catch up per schedule: none, one, or each of them (up to --catchup-max-runs).")
+    parser.add_argument("--misfire-grace", type=float, default=60.0,
+                        help="Seconds late a --store fire can still run as on time instead of as a catch-up.")
+    parser.add_argument("--catchup-spread", type=float, default=300.0,
+                        help="Seconds over which catch-up runs are spread, so a restart does not fire them all at once.")
+    parser.add_argument("--catchup-max-runs", type=int, default=10,
+                        help="Most missed fires caught up per schedule with --misfire all.")
+    parser.add_argument("--outbox", help="Path to a SQLite delivery queue. When set, digests are queued "
+                        "and sent by a separate worker with rate limits and retries.")
+    parser.add_argument("--outbox-rate", type=float, default=10.0,
+                        help="Digest sends per second across all channels.")
+    parser.add_argument("--outbox-channel-rate", type=float, default=1.0,
+                        help="Digest sends per second to any one channel.")
+    parser.add_argument("--outbox-max-attempts", type=int, default=5,
+                        help="Attempts before a digest is kept aside as a dead letter.")
+    parser.add_argument("--once", "--dry-run", dest="once", action="store_true",
+                        help="Run every schedule's search once, concurrently, and write the digests as JSON lines "
+                             "instead of sending them. Needs no chat token and leaves the stored fire times alone.")
+    parser.add_argument("--output", default="-",
+                        help="Where --once writes the digests (JSON lines); '-' for stdout.")
+    parser.add_argument("--once-concurrency", type=int, default=20,
+                        help="Searches --once runs at the same time.")
+    parser.add_argument("--provider-url", action="append", default=[], metavar="NAME=URL",
+                        help="Base URL of a provider, in the format its class expects (e.g. the stub "
+                             "server of benchmarks/). Can be repeated.")
+    parser.add_argument("--watch", action="store_true",
+                        help="Reload the schedules when the YAML configuration file changes.")
+    parser.add_argument("--watch-interval", type=float, default=5.0,
+                        help="Seconds between checks of the configuration file when --watch is set.")
     args = parser.parse_args()
     return args
 
-async def run_scheduler(schedule: Schedule):
+def filter_runnable_schedules(schedules: List[Schedule], require_chat: bool = True) -> List[Schedule]:
+    """
+    Drops the schedules whose app, or the app of any of their destinations,
+    is unsupported or lacks environment variables. With ``require_chat`` False
+    (``--once``), only the providers' API keys are checked.
+    """
+    runnable = []
+    for schedule in schedules:
+        unsupported = [app for app in schedule.apps() if app not in ENV_VARS]
+        if unsupported and require_chat:
+            logger.error(f"Unsupported app: {', '.join(unsupported)}")
+            continue
+
+        apps = schedule.apps() if require_chat else [None]
+        missing_vars = list(dict.fromkeys(var for app in apps
+                                          for var in check_env_vars(app, schedule.providers)))
+        if missing_vars:
+            logger.error(f"Error for {schedule.id}: Missing environment variables: {', '.join(missing_vars)}")
+            continue
+
+        runnable.append(schedule)
+    return runnable
+
+def get_runnable_schedules(yaml_path: str) -> List[Schedule]:
+    return filter_runnable_schedules(get_schedules_from_yaml(yaml_path))
+
+def get_bot_token(app: str):
+    return os.getenv(ENV_VARS[app]) if app in ENV_VARS else None
+
+def get_outbox(args):
+    return DeliveryQueue(args.outbox) if args.outbox else None
+
+def get_planner(args, extraction_tokens: dict):
+    if not args.plan_queries:
+        return None
+    return QueryPlanner(ResearchPaperSearcher(extraction_tokens, logger=logger), window=args.plan_window)
+
+def get_coordinator(args):
+    if not args.lease_store:
+        return None
+    logger.info(f"Sharding schedules as worker {args.worker_id} through {args.lease_store}.")
+    return ShardCoordinator(open_lease_store(args.lease_store), args.worker_id, lease_ttl=args.lease_ttl)
+
+def configure_provider_urls(provider_urls: List[str]):
+    """Points each ``NAME=URL`` provider of --provider-url at its URL."""
+    for entry in provider_urls:
+        name, _, url = entry.partition("=")
+        if not url or name not in PROVIDERS:
+            logger.error(f"Invalid --provider-url '{entry}', expected NAME=URL with NAME one of "
+                         f"{', '.join(PROVIDERS.names())}.")
+            exit(1)
+        PROVIDERS.load(name).BASE_URL = url
+        logger.info(f"Provider {name} points at {url}.")
+
+def get_catch_up(args):
+    return CatchUpPolicy(mode=args.misfire, grace=args.misfire_grace, spread=args.catchup_spread,
+                         max_runs=args.catchup_max_runs)
+
+def get_delivery_worker(args, outbox, bot_for):
+    return DeliveryWorker(outbox, bot_for,
+                          global_rate=args.outbox_rate,
+                          channel_rate=args.outbox_channel_rate,
+                          max_attempts=args.outbox_max_attempts)
+
+async def main():
+    args = getargs()
+
+    # Configure log path and rotation for every logger of the process
+    configure_logging(log_folder=args.logdir,
+                      max_bytes=args.log_max_bytes,
+                      backup_count=args.log_backup_count,
+                      when=args.log_rotate_when)
+    # One pooled, cached HTTP client shared by every provider
+    http = configure_http(timeout=(min(5.0, args.http_timeout), args.http_timeout),
+                          cache_ttl=args.http_cache_ttl, revalidate=args.http_revalidate)
+    configure_search(batch_queries=args.batch_queries)
+    configure_spreading(jitter_window=args.jitter, max_starts_per_second=args.max_starts_per_second)
+    configure_prefetch(lead=args.prefetch)
+    configure_rendering(cache_size=args.render_cache_size)
+
+    configure_provider_urls(args.provider_url)
+
     extraction_tokens = {
         "xplore": os.getenv("XPLORE_API_KEY"),
         "springer": os.getenv("SPRINGER_API_KEY"),
     }
 
-    if schedule.app in ENV_VARS:
-        bot_token = os.getenv(ENV_VARS[schedule.app])
-    else:
-        logger.error(f"Unsupported app: {schedule.app}")
+    if args.once:
+        await run_schedules_once(args, extraction_tokens, http)
         return
 
-    scheduler = ResearchBotScheduler(schedule, bot_token, extraction_tokens)
-    await scheduler.initialize()
-
-async def main():
-    args = getargs()
-
-    # Configure log path based on the argument
-    config = LoggerConfig(name="ResearchBot", log_file="research_bot.log", log_folder=args.logdir)
-    logger = config.get_logger()
+    if args.lease_store and not args.store:
+        logger.error("--lease-store shards the schedules of a store; it requires --store.")
+        exit(1)
 
+    reporter = None
+    if args.http_report_interval > 0:
+        reporter = asyncio.create_task(report_http_traffic(http, args.http_report_interval))
+    try:
+        if args.store:
+            await run_from_store(args, extraction_tokens)
+        else:
+            await run_from_config(args, extraction_tokens)
+    finally:
+        if reporter is not None:
+            reporter.cancel()
+            await asyncio.gather(reporter, return_exceptions=True)
+
+async def run_from_config(args, extraction_tokens: dict):
+    """
+    Runs the schedules of the YAML file given by --config, reloading it under --watch.
+    """
     if not check_yaml_exists(args.config):
         logger.error(f"The specified YAML configuration file at '{args.config}' does not exist.")
         exit(1)
@@ -130,24 +342,112 @@ async def main():
         logger.error("No schedules specified in the YAML configuration.")
         exit(1)
 
-    tasks = []
-
-    for schedule in schedules:
-        missing_vars = check_env_vars(schedule.app)
-
-        if missing_vars:
-            logger.error(f"Error for {schedule.app}: Missing environment variables: {', '.join(missing_vars)}")
-            continue
-
-        logger.info(f"Starting scheduler for app: {schedule.app} and channel: {schedule.channel}")
-
-        task = asyncio.create_task(run_scheduler(schedule))
-        tasks.append(task)
+    outbox = get_outbox(args)
+    state = ScheduleStore(args.state) if args.state else None
+    manager = ScheduleManager(extraction_tokens, get_bot_token, outbox, get_planner(args, extraction_tokens),
+                              state=state, catch_up=get_catch_up(args))
+    await manager.apply(filter_runnable_schedules(schedules))
+    logger.info("All schedulers are now running.")
 
-    # Wait for all tasks to complete
-    await asyncio.gather(*tasks)
+    try:
+        # SIGTERM stops the schedules and the process cleanly
+        asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, manager.stop)
+    except (NotImplementedError, RuntimeError):
+        pass
+
+    # Set once every schedule has finished: the outbox worker then stops when the outbox is empty
+    finished = asyncio.Event()
+    background = []
+    if args.watch:
+        watcher = ConfigWatcher(args.config, get_runnable_schedules, manager.apply,
+                                interval=args.watch_interval, logger=logger)
+        background.append(asyncio.create_task(watcher.watch()))
+    worker = None
+    if outbox:
+        worker = asyncio.create_task(get_delivery_worker(args, outbox, manager.bot_for).run_forever(finished))
+        background.append(worker)
+    try:
+        await manager.wait(keep_running=args.watch)
+        if worker is not None and not manager.stopping.is_set():
+            logger.info("All schedules have finished; delivering what is left in the outbox.")
+            finished.set()
+            await worker
+    finally:
+        for task in background:
+            task.cancel()
+        await asyncio.gather(*background, return_exceptions=True)
+        await manager.shutdown()
+        if state is not None:
+            state.close()
+        if outbox:
+            outbox.close()
+
+async def run_schedules_once(args, extraction_tokens: dict, http):
+    """
+    --once: searches every schedule of the YAML file (or of --store) once and
+    writes the digests as JSON lines to --output, then prints a timing summary.
+    """
+    if args.store:
+        store = ScheduleStore(args.store)
+        schedules = [schedule for page in store.iter_pages() for schedule in page]
+        store.close()
+    elif args.config and check_yaml_exists(args.config):
+        schedules = get_schedules_from_yaml(args.config)
+    else:
+        logger.error(f"The specified YAML configuration file at '{args.config}' does not exist.")
+        exit(1)
+    schedules = filter_runnable_schedules(schedules, require_chat=False)
+    if not schedules:
+        logger.error("No runnable schedules to run.")
+        exit(1)
 
-    logger.info("All schedulers are now running.")
+    searcher = ResearchPaperSearcher(extraction_tokens, logger=logger)
+    planner = QueryPlanner(searcher, window=args.plan_window) if args.plan_queries else None
+    output = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8")
+    try:
+        summary = await run_once(schedules, searcher, output, planner=planner, concurrency=args.once_concurrency)
+    finally:
+        if output is not sys.stdout:
+            output.close()
+    logger.info(f"Ran {summary['schedules']} schedules once in {summary['elapsed_s']:.3f} s.")
+    http.log_traffic(logger)
+    # El resumen va a stderr: stdout puede llevar las líneas JSON
+    print(format_summary(summary, http.stats), file=sys.stderr)
+
+async def report_http_traffic(http, interval: float):
+    """Logs the bytes received and saved per provider every ``interval`` seconds."""
+    while True:
+        await asyncio.sleep(interval)
+        http.log_traffic(logger)
+
+async def run_from_store(args, extraction_tokens: dict):
+    """
+    Runs the schedules kept in the SQLite store given by --store.
+    """
+    store = ScheduleStore(args.store)
+    if args.import_config:
+        if not args.config or not check_yaml_exists(args.config):
+            logger.error(f"The specified YAML configuration file at '{args.config}' does not exist.")
+            exit(1)
+        store.sync(filter_runnable_schedules(get_schedules_from_yaml(args.config)))
+        logger.info(f"Imported {args.config} into {args.store}.")
+
+    logger.info(f"Running schedules from store {args.store}.")
+    outbox = get_outbox(args)
+    coordinator = get_coordinator(args)
+    dispatcher = StoreDispatcher(store, extraction_tokens, get_bot_token, outbox=outbox,
+                                 planner=get_planner(args, extraction_tokens), coordinator=coordinator,
+                                 catch_up=get_catch_up(args))
+    tasks = [dispatcher.run_forever()]
+    if outbox:
+        tasks.append(get_delivery_worker(args, outbox, dispatcher.get_bot).run_forever())
+    try:
+        await asyncio.gather(*tasks)
+    finally:
+        await dispatcher.shutdown()
+        store.close()
+        if outbox:
+            outbox.close()
 
 if __name__ == "__main__":
     asyncio.run(main())
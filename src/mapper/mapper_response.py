@@ -1,7 +1,5 @@
-
-
 from models.paper_model import ArticleMetadata
-from models.response_api import CambrigeResponse
+from models.response_api import CAMBRIDGE, CambrigeResponse
 from typing import List
 
 
@@ -9,15 +7,5 @@ def from_cambrige_response(response: CambrigeResponse) -> List['ArticleMetadata'
     if not response.itemHits:
         raise ValueError("CambrigeResponse no tiene items")
 
-    articles = []
-    for item_hit in response.itemHits:
-        item = item_hit.item
-        article = ArticleMetadata(
-            id=item.id,
-            title=item.title,
-            abstract=item.abstract,
-            authors=item.authors,
-        )
-        articles.append(article)
-
-    return articles
\ No newline at end of file
+    # Los registros que no se pueden interpretar se descartan sin perder el resto
+    return CAMBRIDGE.decode_records(response.itemHits).articles
@@ -1,33 +1,184 @@
+import atexit
+import copy
 import logging
 import os
+import queue
+import threading
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler, TimedRotatingFileHandler
+from typing import Dict, Optional
+
+DEFAULT_LOG_FOLDER = "./logs"
+LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+
+class _RoutedQueueHandler(QueueHandler):
+    """Encola el registro indicando el archivo al que debe escribirse."""
+
+    def __init__(self, log_queue, log_path: str):
+        super().__init__(log_queue)
+        self.log_path = log_path
+
+    def prepare(self, record):
+        # El formateo y la escritura se hacen en el hilo del listener;
+        # aquí solo se fija el mensaje para que no dependa de argumentos mutables.
+        record = copy.copy(record)
+        if record.args:
+            record.msg = record.getMessage()
+            record.args = None
+        record.log_path = self.log_path
+        return record
+
+
+class _FileRouter(logging.Handler):
+    """Handler del listener que reparte cada registro a su archivo de log."""
+
+    def __init__(self, pipeline: "LoggingPipeline"):
+        super().__init__()
+        self.pipeline = pipeline
+
+    def emit(self, record):
+        log_path = getattr(record, "log_path", None)
+        if log_path:
+            with self.pipeline.lock:
+                self.pipeline.file_handler(log_path).handle(record)
+
+
+class LoggingPipeline:
+    """
+    Pipeline de logging del proceso: los loggers solo encolan registros y un
+    hilo en segundo plano los formatea y escribe en consola y en archivos.
+
+    Los handlers se instalan una única vez por logger, de modo que crear varios
+    ``LoggerConfig`` con el mismo nombre no duplica las líneas de log.
+    """
+
+    def __init__(self):
+        self.lock = threading.RLock()
+        self.queue = queue.SimpleQueue()
+        self.formatter = logging.Formatter(LOG_FORMAT)
+        self.log_folder = DEFAULT_LOG_FOLDER
+        self.max_bytes = 0
+        self.backup_count = 5
+        self.when = None
+        self.stream_handler = logging.StreamHandler()
+        self.stream_handler.setFormatter(self.formatter)
+        self.file_handlers: Dict[str, logging.Handler] = {}
+        # nombre del logger -> (archivo, carpeta explícita o None, handler)
+        self.registrations: Dict[str, tuple] = {}
+        self.listener = None
+
+    def register(self, logger: logging.Logger, log_file: str, log_folder: Optional[str] = None):
+        """Instala (o redirige) el handler de cola del logger."""
+        with self.lock:
+            log_path = os.path.join(log_folder or self.log_folder, log_file)
+            registration = self.registrations.get(logger.name)
+            if registration and registration[2] in logger.handlers:
+                registration[2].log_path = log_path
+                self.registrations[logger.name] = (log_file, log_folder, registration[2])
+            else:
+                handler = _RoutedQueueHandler(self.queue, log_path)
+                logger.addHandler(handler)
+                self.registrations[logger.name] = (log_file, log_folder, handler)
+            self._start()
+
+    def configure(self,
+                  log_folder: Optional[str] = None,
+                  max_bytes: Optional[int] = None,
+                  backup_count: Optional[int] = None,
+                  when: Optional[str] = None,
+                  console: Optional[bool] = None):
+        """
+        Cambia la carpeta por defecto y la rotación de los archivos de log.
+
+        Args:
+        - log_folder (str, optional): Carpeta para los loggers sin carpeta explícita.
+        - max_bytes (int, optional): Tamaño a partir del cual se rota el archivo (0 = sin rotación por tamaño).
+        - backup_count (int, optional): Número de archivos rotados que se conservan.
+        - when (str, optional): Rotación por tiempo (p. ej. 'midnight', 'H'); tiene prioridad sobre max_bytes.
+        - console (bool, optional): Si los registros también se muestran en consola.
+        """
+        with self.lock:
+            if log_folder is not None:
+                self.log_folder = log_folder
+            if max_bytes is not None:
+                self.max_bytes = max_bytes
+            if backup_count is not None:
+                self.backup_count = backup_count
+            if when is not None:
+                self.when = when or None
+            if console is not None:
+                self.stream_handler.setLevel(logging.NOTSET if console else logging.CRITICAL + 1)
+            for log_file, explicit_folder, handler in self.registrations.values():
+                handler.log_path = os.path.join(explicit_folder or self.log_folder, log_file)
+            self._close_file_handlers()
+
+    def file_handler(self, log_path: str) -> logging.Handler:
+        with self.lock:
+            handler = self.file_handlers.get(log_path)
+            if handler is None:
+                folder = os.path.dirname(log_path)
+                if folder:
+                    os.makedirs(folder, exist_ok=True)
+                if self.when:
+                    handler = TimedRotatingFileHandler(log_path, when=self.when,
+                                                       backupCount=self.backup_count, delay=True)
+                else:
+                    handler = RotatingFileHandler(log_path, maxBytes=self.max_bytes,
+                                                  backupCount=self.backup_count, delay=True)
+                handler.setFormatter(self.formatter)
+                self.file_handlers[log_path] = handler
+            return handler
+
+    def stop(self):
+        # El listener se detiene fuera del lock porque vacía la cola escribiendo en los archivos
+        listener, self.listener = self.listener, None
+        if listener is not None:
+            listener.stop()
+        with self.lock:
+            self._close_file_handlers()
+
+    def _start(self):
+        if self.listener is None:
+            self.listener = QueueListener(self.queue, self.stream_handler, _FileRouter(self),
+                                          respect_handler_level=True)
+            self.listener.start()
+
+    def _close_file_handlers(self):
+        for handler in self.file_handlers.values():
+            handler.close()
+        self.file_handlers.clear()
+
+
+_pipeline = LoggingPipeline()
+atexit.register(_pipeline.stop)
+
+
+def configure_logging(log_folder: Optional[str] = None,
+                      max_bytes: Optional[int] = None,
+                      backup_count: Optional[int] = None,
+                      when: Optional[str] = None,
+                      console: Optional[bool] = None):
+    """Configura la carpeta y la rotación de todos los logs del proceso. Ver ``LoggingPipeline.configure``."""
+    _pipeline.configure(log_folder, max_bytes, backup_count, when, console)
+
+
 class LoggerConfig:
-    def __init__(self, name: str, log_file: str, log_level: int = logging.INFO, log_folder: str = "./logs"):
+    def __init__(self, name: str, log_file: str, log_level: int = logging.INFO, log_folder: Optional[str] = None):
         """Inicializa el configurador del logger.
 
         Args:
         - name (str): Nombre del logger.
         - log_file (str): Ruta del archivo donde se guardarán los logs.
         - log_level (int, optional): Nivel de logging. Por defecto es logging.INFO.
+        - log_folder (str, optional): Carpeta de logs. Por defecto la del proceso (ver ``configure_logging``).
         """
         self.logger = logging.getLogger(name)
         self.logger.setLevel(log_level)
-        self.formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-
-        # Configura el handler para escribir logs en un archivo
-        path_logfile = os.path.join(log_folder, log_file)
-        if not os.path.exists(log_folder):
-            os.makedirs(log_folder)
-        if not os.path.exists(path_logfile):
-            open(path_logfile, 'w').close()
-        file_handler = logging.FileHandler(path_logfile)
-        file_handler.setFormatter(self.formatter)
-        self.logger.addHandler(file_handler)
-
-        # Configura el handler para mostrar logs en la consola
-        stream_handler = logging.StreamHandler()
-        stream_handler.setFormatter(self.formatter)
-        self.logger.addHandler(stream_handler)
+        self.formatter = _pipeline.formatter
+
+        # Los handlers se instalan una sola vez por logger y escriben a través de la cola
+        _pipeline.register(self.logger, log_file, log_folder)
 
     def get_logger(self):
         """Retorna el logger configurado."""
-        return self.logger
\ No newline at end of file
+        return self.logger
@@ -1,14 +1,20 @@
+from dataclasses import dataclass
 from datetime import datetime, timezone
 import re
-from typing import Any, List
+from typing import Any, List, Optional, Union
 
 class ArticleMetadata:
-    def __init__(self, title: str, summary: str, published: str, link: str):
+    def __init__(self, title: str, summary: str, published: Union[str, datetime], link: str,
+                 keywords: Optional[List[str]] = None):
         self.title = title
         self.summary = summary
-        self.published = self._parse_date(published)
+        # Una fecha ya interpretada (p. ej. por el esquema del proveedor) se usa tal cual
+        self.published = published if isinstance(published, datetime) else self._parse_date(published)
         self.link = link
-    def clean_date_string(self, date_str: str) -> str:
+        # Palabras clave de la programación a las que corresponde el artículo
+        self.keywords = list(keywords or [])
+    @staticmethod
+    def clean_date_string(date_str: str) -> str:
         """Limpia la cadena de fecha eliminando caracteres no deseados y ajustando nombres de meses no estándar."""
         # Reemplaza nombres de meses no estándar
         month_replacements = {
@@ -30,55 +36,51 @@ class ArticleMetadata:
         return cleaned_str.strip()
 
 
-    def _parse_date(self, date_str: str, cleaning_attempts: int = 0) -> datetime:
+    @staticmethod
+    def _normalize_months(date_str: str) -> str:
+        """Meses sin punto final y "Sept" como "Sep", para que todos sean un nombre completo o de tres letras."""
+        date_str = re.sub(r"\b([A-Za-z]{3,})\.", r"\1", date_str)
+        return re.sub(r"\bSept\b", "Sep", date_str, flags=re.IGNORECASE)
+
+    @staticmethod
+    def _month_format(month: str) -> str:
+        return "%b" if len(month) == 3 else "%B"
+
+    @staticmethod
+    def _parse_date(date_str: str, cleaning_attempts: int = 0) -> datetime:
         """Convierte la fecha en string a un objeto datetime, manejando múltiples formatos."""
         if date_str.endswith('Z'):
             date_str = date_str[:-1]
             return datetime.fromisoformat(date_str).replace(tzinfo=timezone.utc)
+        date_str = ArticleMetadata._normalize_months(date_str)
 
         # Identifica patrones usando regex
         match_iso = re.match(r"(\d{4}-\d{2}-\d{2})", date_str)
-        match_day_month_full_year = re.match(r"(\d{1,2}) ([A-Za-z]+) (\d{4})", date_str)
-        match_day_month_year = re.match(r"(\d{1,2}) (\w+\.?) (\d{4})", date_str)
-        match_range = re.match(r"(\d{1,2})-(\d{1,2}) (\w+\.?) (\d{4})", date_str)
+        match_day_month_year = re.match(r"(\d{1,2}) ([A-Za-z]+) (\d{4})", date_str)
+        match_range = re.match(r"(\d{1,2})-(\d{1,2}) ([A-Za-z]+) (\d{4})", date_str)
         match_only_year = re.match(r"(\d{4})", date_str)
-        match_month_year = re.match(r"([A-Za-z]+\.?) (\d{4})", date_str)
+        match_month_year = re.match(r"([A-Za-z]+) (\d{4})", date_str)
 
         if match_iso:
             return datetime.strptime(match_iso.group(1), "%Y-%m-%d")
-        elif match_day_month_full_year:
-            day, month, year = match_day_month_full_year.groups()
-            if len(month) > 3:
-                return datetime.strptime(f"{day} {month} {year}", "%d %B %Y")
-            else:
-                return datetime.strptime(f"{day} {month} {year}", "%d %b %Y")
         elif match_day_month_year:
             day, month, year = match_day_month_year.groups()
-            if '.' in month:  # Si el mes tiene un punto
-                return datetime.strptime(f"{day} {month[:-1]} {year}", "%d %b %Y")
-            else:
-                return datetime.strptime(f"{day} {month} {year}", "%d %b %Y")
+            return datetime.strptime(f"{day} {month} {year}", f"%d {ArticleMetadata._month_format(month)} %Y")
         elif match_range:
-            # Solo usamos el primer día del rango, pero puedes ajustar esto según lo necesites.
-            day, month, year = match_range.groups()[1:]
-            if '.' in month:  # Si el mes tiene un punto
-                return datetime.strptime(f"{day} {month[:-1]} {year}", "%d %b %Y")
-            else:
-                return datetime.strptime(f"{day} {month} {year}", "%d %b %Y")
+            # Rangos de congresos ("5-9 June 2023"): se usa el primer día
+            day, _, month, year = match_range.groups()
+            return datetime.strptime(f"{day} {month} {year}", f"%d {ArticleMetadata._month_format(month)} %Y")
         elif match_only_year:
             year = match_only_year.group(1)
             return datetime.strptime(year, "%Y")
         elif match_month_year:
             month, year = match_month_year.groups()
-            if '.' in month:
-                return datetime.strptime(f"{month[:-1]} {year}", "%b %Y")
-            else:
-                return datetime.strptime(f"{month} {year}", "%B %Y")
+            return datetime.strptime(f"{month} {year}", f"{ArticleMetadata._month_format(month)} %Y")
         else:
             # Si todo falla y no hemos superado el límite de intentos de limpieza, intentamos limpiar la cadena y volver a parsearla
             if cleaning_attempts < 5:
-                cleaned_str = self.clean_date_string(date_str)
-                return self._parse_date(cleaned_str, cleaning_attempts + 1)
+                cleaned_str = ArticleMetadata.clean_date_string(date_str)
+                return ArticleMetadata._parse_date(cleaned_str, cleaning_attempts + 1)
             else:
                 raise ValueError(f"Couldn't parse the date string after multiple cleaning attempts: {date_str}")
     def __repr__(self) -> str:
@@ -93,20 +95,83 @@ class ArticleMetadata:
             'title': self.title,
             'summary': self.summary,
             'published': self.published.isoformat(),
-            'link': self.link
+            'link': self.link,
+            'keywords': self.keywords
         }
 
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> "ArticleMetadata":
+        """Inverso exacto de ``to_dict``: la fecha se recupera con hora y zona horaria."""
+        return cls(data['title'], data['summary'], datetime.fromisoformat(data['published']), data['link'],
+                   data.get('keywords'))
+
+def parse_date(date_str: str) -> datetime:
+    """La fecha de un artículo tal como la interpreta ``ArticleMetadata``; lanza ``ValueError`` si no se puede."""
+    return ArticleMetadata._parse_date(date_str)
+
+def parse_cron_string(cron_string: str) -> dict:
+    """Convierte una expresión cron de cinco campos en los argumentos del trigger 'cron' de APScheduler."""
+    try:
+        minute, hour, day_of_month, month, day_of_week = cron_string.split()
+    except ValueError:
+        raise ValueError(f"Invalid cron string format: {cron_string}")
+    return {
+        "minute": minute,
+        "hour": hour,
+        "day": day_of_month,
+        "month": month,
+        "day_of_week": day_of_week
+    }
+
+@dataclass(frozen=True)
+class Destination:
+    """Un canal de una plataforma al que se envía el resumen de una programación."""
+    app: str
+    channel: str
+
+    def __str__(self) -> str:
+        return f"{self.app}:{self.channel}"
+
+
 class Schedule:
     def __init__(self, 
                  channel: str, 
                  app: str, 
                  cron_schedule: str, 
-                 search_keywords: List[str]) -> None:
+                 search_keywords: List[str],
+                 id: Optional[str] = None,
+                 providers: Optional[List[str]] = None,
+                 next_fire_at: Optional[float] = None,
+                 last_fire_at: Optional[float] = None,
+                 destinations: Optional[List[Destination]] = None) -> None:
         self.channel = channel
         self.app = app
+        # Todos los canales que reciben el resumen; el primero es siempre (app, channel).
+        # Una búsqueda por disparo, sea cual sea el número de destinos
+        primary = Destination(app, channel)
+        self.destinations = [primary] + [d for d in dict.fromkeys(destinations or []) if d != primary]
         self.cron_schedule = cron_schedule
         self.search_keywords = search_keywords
+        # Identificador estable entre recargas de la configuración
+        self.id = id or f"{app}:{channel}"
+        # Proveedores a consultar; None significa todos los registrados
+        self.providers = providers
+        # Próximo y último disparo (epoch) tal como los guarda ScheduleStore; no forman parte del fingerprint
+        self.next_fire_at = next_fire_at
+        self.last_fire_at = last_fire_at
+
+    def fingerprint(self) -> tuple:
+        """Valores que, si cambian, obligan a actualizar la programación en ejecución."""
+        return (self.app, self.channel, self.cron_schedule, tuple(self.search_keywords),
+                tuple(self.providers or ()), tuple(self.destinations))
+
+    def apps(self) -> List[str]:
+        """Plataformas de los destinos, sin repetir y en orden."""
+        return list(dict.fromkeys(destination.app for destination in self.destinations))
 
     def __str__(self) -> str:
-        return f"Channel: {self.channel}, App: {self.app}, Cron: {self.cron_schedule}, Keywords: {', '.join(self.search_keywords)}"
+        text = f"Channel: {self.channel}, App: {self.app}, Cron: {self.cron_schedule}, Keywords: {', '.join(self.search_keywords)}"
+        if len(self.destinations) > 1:
+            text += f", Also to: {', '.join(str(d) for d in self.destinations[1:])}"
+        return text
 
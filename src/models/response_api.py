@@ -1,6 +1,277 @@
-from typing import List
-from typing import Any
-from dataclasses import dataclass
+"""
+Decodificación declarativa de las respuestas de los proveedores.
+
+Cada proveedor describe con un esquema dónde están, dentro de su respuesta,
+los cuatro campos que usa ``ArticleMetadata`` (título, resumen, fecha y
+enlace). El esquema recorre los registros una sola vez, lee solo esos campos
+y descarta los registros que no se pueden interpretar sin perder el resto de
+la página. Si ``orjson`` está instalado se usa para decodificar el JSON.
+"""
+
+import copy
 import json
+import xml.etree.ElementTree as ElementTree
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+from models.logger_model import LoggerConfig
+from models.paper_model import ArticleMetadata, parse_date
+
+try:
+    import orjson
+    _loads = orjson.loads
+    FAST_JSON = True
+except ImportError:
+    _loads = json.loads
+    FAST_JSON = False
+
+config = LoggerConfig(name="ResponseDecoder", log_file="decoder.log")
+logger = config.get_logger()
+
+Payload = Union[bytes, str, dict]
+_MISSING = object()
+
+
+def loads(body: Union[bytes, str]) -> Any:
+    """Decodifica JSON con orjson si está disponible y con la librería estándar si no."""
+    return _loads(body)
+
+
+def _split(path: str) -> Tuple[Union[str, int], ...]:
+    # "result.0.total" -> ("result", 0, "total"); "" es el propio registro
+    return tuple(int(part) if part.isdigit() else part for part in path.split(".") if part)
+
+
+def _lookup(value: Any, keys: Tuple[Union[str, int], ...]) -> Any:
+    for key in keys:
+        try:
+            value = value[key]
+        except (KeyError, IndexError, TypeError):
+            return _MISSING
+    return value
+
+
+@dataclass(frozen=True)
+class Field:
+    """
+    Dónde leer un campo. Se prueban las rutas en orden y se usa la primera
+    presente y no vacía; ``convert`` transforma el valor leído. Si ``convert``
+    falla, se pasa a la siguiente ruta y solo se propaga el error cuando
+    ninguna sirve.
+    """
+    paths: Tuple[str, ...]
+    required: bool = True
+    default: Any = ""
+    convert: Optional[Callable[[Any], Any]] = None
+    keys: Tuple[Tuple[Union[str, int], ...], ...] = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        object.__setattr__(self, "keys", tuple(_split(path) for path in self.paths))
+
+    def read(self, record: Any) -> Any:
+        error = None
+        for keys in self.keys:
+            value = _lookup(record, keys)
+            if value is not _MISSING and value not in (None, ""):
+                if not self.convert:
+                    return value
+                try:
+                    return self.convert(value)
+                except (KeyError, TypeError, ValueError) as e:
+                    error = e
+        if error is not None:
+            raise error
+        if self.required:
+            raise KeyError(self.paths[0])
+        return self.default
+
+
+def path(*paths: str, required: bool = True, default: Any = "", convert: Optional[Callable] = None) -> Field:
+    return Field(paths, required, default, convert)
+
+
+@dataclass
+class DecodedPage:
+    """Artículos de una página, registros descartados y total de resultados si el proveedor lo indica."""
+    articles: List[ArticleMetadata]
+    skipped: int = 0
+    total: Optional[int] = None
+
+    def copy(self) -> "DecodedPage":
+        """Copia con artículos propios, para reutilizar una página ya decodificada sin compartir sus objetos."""
+        articles = []
+        for article in self.articles:
+            article = copy.copy(article)
+            article.keywords = list(article.keywords)
+            articles.append(article)
+        return DecodedPage(articles, self.skipped, self.total)
+
+
+@dataclass(frozen=True)
+class ResponseSchema:
+    """Esquema de una respuesta JSON: la lista de registros y los campos de ``ArticleMetadata``."""
+    provider: str
+    records: str
+    title: Field
+    summary: Field
+    published: Field
+    link: Field
+    total: Optional[str] = None
+
+    def decode(self, payload: Payload) -> DecodedPage:
+        data = loads(payload) if isinstance(payload, (bytes, str)) else payload
+        records = _lookup(data, _split(self.records))
+        page = self.decode_records([] if records is _MISSING or records is None else records)
+        if self.total:
+            total = _lookup(data, _split(self.total))
+            page.total = int(total) if total is not _MISSING and total not in (None, "") else None
+        return page
+
+    def decode_records(self, records: List[Any]) -> DecodedPage:
+        articles = []
+        skipped = 0
+        title, summary, published, link = self.title, self.summary, self.published, self.link
+        for record in records:
+            try:
+                articles.append(ArticleMetadata(title.read(record), summary.read(record),
+                                                published.read(record), link.read(record)))
+            except Exception as e:
+                skipped += 1
+                logger.debug(f"Skipping {self.provider} record: {e!r}")
+        if skipped:
+            logger.warning(f"Skipped {skipped} of {len(records)} {self.provider} records that could not be decoded.")
+        return DecodedPage(articles, skipped)
+
+
+@dataclass(frozen=True)
+class XmlField:
+    """Campo de un registro XML: ruta de ElementTree y, opcionalmente, atributo a leer."""
+    path: str
+    attribute: Optional[str] = None
+    required: bool = True
+    default: str = ""
+
+    def read(self, element, namespaces: Dict[str, str]) -> str:
+        found = element.find(self.path, namespaces)
+        if found is not None:
+            value = found.get(self.attribute) if self.attribute else found.text
+            if value:
+                return " ".join(value.split())
+        if self.required:
+            raise KeyError(self.path)
+        return self.default
+
+
+@dataclass(frozen=True)
+class XmlSchema:
+    """Esquema de un feed XML (Atom): elemento de cada registro y campos de ``ArticleMetadata``."""
+    provider: str
+    records: str
+    namespaces: Dict[str, str]
+    title: XmlField
+    summary: XmlField
+    published: XmlField
+    link: XmlField
+    total: Optional[str] = None
+
+    def decode(self, payload: Union[bytes, str]) -> DecodedPage:
+        root = ElementTree.fromstring(payload)
+        articles = []
+        skipped = 0
+        entries = root.findall(self.records, self.namespaces)
+        for entry in entries:
+            try:
+                articles.append(ArticleMetadata(self.title.read(entry, self.namespaces),
+                                                self.summary.read(entry, self.namespaces),
+                                                self.published.read(entry, self.namespaces),
+                                                self.link.read(entry, self.namespaces)))
+            except Exception as e:
+                skipped += 1
+                logger.debug(f"Skipping {self.provider} record: {e!r}")
+        if skipped:
+            logger.warning(f"Skipped {skipped} of {len(entries)} {self.provider} records that could not be decoded.")
+        total = root.findtext(self.total, None, self.namespaces) if self.total else None
+        return DecodedPage(articles, skipped, int(total) if total and total.strip().isdigit() else None)
+
+
+def springer_link(record: dict) -> str:
+    """Enlace HTML del registro o, si no lo hay, el DOI."""
+    urls = record.get("url") or []
+    for url in urls:
+        if url.get("format") == "html" and url.get("value"):
+            return url["value"]
+    if record.get("doi"):
+        return f"https://doi.org/{record['doi']}"
+    if urls and urls[0].get("value"):
+        return urls[0]["value"]
+    raise KeyError("url")
+
+
+def published_date(value: Any) -> datetime:
+    """La fecha ya interpretada, para que ``ArticleMetadata`` no vuelva a leerla; ``ValueError`` si no se entiende."""
+    return parse_date(str(value))
+
+
+def springer_abstract(abstract: Any) -> str:
+    # Formato estructurado: {"h1": "Abstract", "p": [...]}
+    if isinstance(abstract, dict):
+        paragraphs = abstract.get("p") or []
+        return " ".join(paragraphs) if isinstance(paragraphs, list) else str(paragraphs)
+    return abstract
+
+
+ARXIV = XmlSchema(
+    provider="arxiv",
+    records="atom:entry",
+    namespaces={"atom": "http://www.w3.org/2005/Atom", "opensearch": "http://a9.com/-/spec/opensearch/1.1/"},
+    title=XmlField("atom:title"),
+    summary=XmlField("atom:summary", required=False),
+    published=XmlField("atom:published"),
+    link=XmlField("atom:link[@rel='alternate']", attribute="href"),
+    total="opensearch:totalResults",
+)
+
+CAMBRIDGE = ResponseSchema(
+    provider="cambridge",
+    records="itemHits",
+    title=path("item.title"),
+    summary=path("item.abstract", required=False),
+    published=path("item.publishedDate"),
+    # El DOI se usa como enlace
+    link=path("item.doi"),
+    total="totalCount",
+)
+
+XPLORE = ResponseSchema(
+    provider="xplore",
+    records="articles",
+    title=path("title"),
+    summary=path("abstract", required=False),
+    # Fechas de congreso ("5-9 June 2023") o solo el año si la fecha no se entiende
+    published=path("publication_date", "publication_year", convert=published_date),
+    link=path("html_url", "abstract_url"),
+    total="total_records",
+)
+
+SPRINGER = ResponseSchema(
+    provider="springer",
+    records="records",
+    title=path("title"),
+    summary=path("abstract", required=False, convert=springer_abstract),
+    published=path("publicationDate", "onlineDate"),
+    link=path("", convert=springer_link),
+    total="result.0.total",
+)
+
 
+@dataclass
+class CambrigeResponse:
+    """Respuesta de Cambridge: los registros (``itemHits``) sin decodificar y el total."""
+    itemHits: List[dict]
+    totalCount: Optional[int] = None
 
+    @classmethod
+    def from_payload(cls, payload: Payload) -> "CambrigeResponse":
+        data = loads(payload) if isinstance(payload, (bytes, str)) else payload
+        return cls(itemHits=data.get("itemHits") or [], totalCount=data.get("totalCount"))
@@ -1,47 +1,79 @@
+import asyncio
+import copy
 from datetime import timezone
 import logging
 from typing import List, Dict, Type, Optional
+from infrastructure.plugins import PluginRegistry
 from models.paper_model import ArticleMetadata
 from models.api_model import APIResponse, APISuccessResponse
-from service.service_arxiv import ArxivAPI
-from service.service_cambrige import CambridgeAPI
-from service.service_explorerieee import XploreAPI
+
+# Los módulos de cada proveedor (y sus dependencias, como pycurl) se importan
+# solo cuando una búsqueda los usa por primera vez.
+PROVIDERS = PluginRegistry("provider")
+PROVIDERS.register("arxiv", "service.service_arxiv:ArxivAPI")
+PROVIDERS.register("cambridge", "service.service_cambrige:CambridgeAPI")
+PROVIDERS.register("xplore", "service.service_explorerieee:XploreAPI")
+PROVIDERS.register("springer", "service.service_springer:SpringerAPI")
+
+# Agrupar las palabras clave en consultas OR en los proveedores que lo admiten
+BATCH_QUERIES = False
+
+
+def configure_search(batch_queries: Optional[bool] = None):
+    """Configuración de búsqueda del proceso; se aplica a los ``ResearchPaperSearcher`` sin valor propio."""
+    global BATCH_QUERIES
+    if batch_queries is not None:
+        BATCH_QUERIES = batch_queries
 
 class ResearchPaperSearcher:
-    def __init__(self, tokens: Dict[str, str], logger: Optional[logging.Logger] = None):
+    def __init__(self, tokens: Dict[str, str], logger: Optional[logging.Logger] = None,
+                 providers: Optional[List[str]] = None, batch_queries: Optional[bool] = None):
         """
         Inicializa una nueva instancia de la clase ResearchPaperSearcher.
 
         Args:
             tokens (dict): Un diccionario que contiene tokens para los diferentes servicios.
             logger (logging.Logger): Logger para registrar eventos y errores.
+            providers (list, optional): Proveedores a consultar por defecto. Si no se indica, todos los registrados.
+            batch_queries (bool, optional): Agrupar las palabras clave en consultas OR en los proveedores
+                que lo admiten (``search_batched``). Por defecto, lo indicado en ``configure_search``.
         """
         self.tokens = tokens
-        self.services = {
-            "arxiv": ArxivAPI,
-            "cambridge": CambridgeAPI,
-            "xplore": XploreAPI,
-        }
+        self.providers = providers or PROVIDERS.names()
+        self.batch_queries = batch_queries
         self.logger = logger or logging.getLogger(__name__)
         self.logger.info("ResearchPaperSearcher initialized.")
 
-    def search(self, terms: List[str]) -> List[ArticleMetadata]:
+    def create_api(self, service_name: str):
+        """Instancia del proveedor, importando su módulo la primera vez."""
+        service_class = PROVIDERS.load(service_name)
+        if service_name in self.tokens:
+            return service_class(api_access_key=self.tokens[service_name])
+        return service_class()
+
+    def batching(self, api) -> bool:
+        enabled = BATCH_QUERIES if self.batch_queries is None else self.batch_queries
+        return enabled and hasattr(api, "search_batched")
+
+    def collect(self, service_name: str, response: APIResponse) -> List[ArticleMetadata]:
+        if isinstance(response, APISuccessResponse):
+            self.logger.info(f"Found {len(response.data)} articles in {service_name}.")
+            return response.data
+        self.logger.warning(f"No articles from {service_name}: {getattr(response, 'error_message', response)}")
+        return []
+
+    def search(self, terms: List[str], providers: Optional[List[str]] = None) -> List[ArticleMetadata]:
         self.logger.info(f"Starting search for terms: {terms}")
         all_articles = []
 
-        for service_name, service_class in self.services.items():
+        for service_name in providers or self.providers:
             try:
-                if service_name in self.tokens:
-                    api = service_class(api_access_key=self.tokens[service_name])
-                    response = api.search_multiple_terms(terms)
-                    if isinstance(response, APISuccessResponse):
-                        all_articles.extend(response.data)
+                api = self.create_api(service_name)
+                if self.batching(api):
+                    response = api.search_batched(terms)
                 else:
-                    api = service_class()
                     response = api.search_multiple_terms(terms)
-                    if isinstance(response, APISuccessResponse):
-                        all_articles.extend(response.data)
-                self.logger.info(f"Found {len(response.data)} articles in {service_name}.")
+                all_articles.extend(self.collect(service_name, response))
             except Exception as e:
                 self.logger.error(f"Error searching in {service_name}: {str(e)}")
 
@@ -49,17 +81,95 @@ class ResearchPaperSearcher:
         self.logger.info(f"Search completed. Found {len(all_articles)} articles.")
         return all_articles
 
+    async def search_async(self, terms: List[str], providers: Optional[List[str]] = None) -> List[ArticleMetadata]:
+        """
+        Igual que ``search``, pero consulta todos los proveedores a la vez y sin
+        bloquear el bucle de eventos: los que tienen ``search_multiple_terms_async``
+        se esperan directamente y el resto se ejecuta en un hilo. Con ``batch_queries``,
+        los proveedores que lo admiten reciben las palabras clave agrupadas en consultas OR.
+        """
+        self.logger.info(f"Starting search for terms: {terms}")
+
+        async def search_provider(service_name: str) -> List[ArticleMetadata]:
+            try:
+                api = self.create_api(service_name)
+                if self.batching(api):
+                    response = await api.search_batched_async(terms)
+                elif hasattr(api, "search_multiple_terms_async"):
+                    response = await api.search_multiple_terms_async(terms)
+                else:
+                    response = await asyncio.to_thread(api.search_multiple_terms, terms)
+                return self.collect(service_name, response)
+            except Exception as e:
+                self.logger.error(f"Error searching in {service_name}: {str(e)}")
+                return []
+
+        results = await asyncio.gather(*(search_provider(name) for name in providers or self.providers))
+        all_articles = [article for articles in results for article in articles]
+        all_articles = self.filter_articles(all_articles)
+        self.logger.info(f"Search completed. Found {len(all_articles)} articles.")
+        return all_articles
+
+    async def search_tagged(self, plan: Dict[str, List[str]]) -> Dict[str, List[ArticleMetadata]]:
+        """
+        Busca ``plan[proveedor]`` (palabras clave) en cada proveedor, todos a la vez,
+        y devuelve los artículos de cada uno sin filtrar, con ``keywords`` indicando
+        las palabras clave que los encontraron. Lo usa ``QueryPlanner``.
+        """
+        async def search_term(api, term: str) -> APIResponse:
+            if hasattr(api, "search_multiple_terms_async"):
+                response = await api.search_multiple_terms_async([term])
+            else:
+                response = await asyncio.to_thread(api.search_multiple_terms, [term])
+            if isinstance(response, APISuccessResponse):
+                for article in response.data:
+                    article.keywords = [term]
+            return response
+
+        async def search_provider(service_name: str, terms: List[str]) -> List[ArticleMetadata]:
+            try:
+                api = self.create_api(service_name)
+                if self.batching(api):
+                    # Los grupos mezclan palabras de varias programaciones: un artículo sin
+                    # ninguna en su título o resumen no se puede atribuir y se descarta
+                    return self.collect(service_name, await api.search_batched_async(terms, fallback=False))
+                responses = await asyncio.gather(*(search_term(api, term) for term in terms))
+                return [article for response in responses
+                        for article in self.collect(service_name, response)]
+            except Exception as e:
+                self.logger.error(f"Error searching in {service_name}: {str(e)}")
+                return []
+
+        names = list(plan)
+        results = await asyncio.gather(*(search_provider(name, plan[name]) for name in names))
+        return dict(zip(names, results))
+
     def filter_unique_articles(self, articles: List[ArticleMetadata]) -> List[ArticleMetadata]:
         self.logger.info("Filtering unique articles...")
-        seen_titles = set()
-        seen_links = set()
+        # Título o enlace -> posición en unique_articles
+        by_title = {}
+        by_link = {}
         unique_articles = []
+        copied = set()
 
         for article in articles:
-            if article.title not in seen_titles and article.link not in seen_links:
-                seen_titles.add(article.title)
-                seen_links.add(article.link)
+            index = by_title.get(article.title)
+            if index is None:
+                index = by_link.get(article.link)
+            if index is None:
+                by_title[article.title] = by_link[article.link] = len(unique_articles)
                 unique_articles.append(article)
+                continue
+            # El mismo artículo encontrado con otras palabras clave; se unen en una copia
+            # para no modificar los artículos recibidos, que pueden estar compartidos
+            extra = [k for k in article.keywords if k not in unique_articles[index].keywords]
+            if extra:
+                if index not in copied:
+                    kept = copy.copy(unique_articles[index])
+                    kept.keywords = list(kept.keywords)
+                    unique_articles[index] = kept
+                    copied.add(index)
+                unique_articles[index].keywords.extend(dict.fromkeys(extra))
 
         self.logger.info(f"Filtered {len(articles) - len(unique_articles)} duplicate articles.")
         return unique_articles
@@ -0,0 +1,114 @@
+"""
+Ejecución única de todas las programaciones, sin conexión a ningún chat.
+
+``main.py --once`` (o ``--dry-run``) busca a la vez los artículos de cada
+programación con la misma canalización que un disparo normal (proveedores,
+``--batch-queries``, ``--plan-queries``, filtrado y orden) y escribe cada
+resumen como una línea JSON en lugar de enviarlo. No hace falta ningún token
+de chat ni se tocan las horas de disparo guardadas. Sirve para probar una
+configuración, para lanzarla desde un cron externo y para perfilar la
+canalización completa contra los proveedores simulados de ``benchmarks/``.
+"""
+
+import asyncio
+import json
+import statistics
+import time
+from typing import IO, List, Optional
+
+from models.paper_model import Schedule
+from service.api_consumer import ResearchPaperSearcher
+from service.query_planner import QueryPlanner
+
+
+def _percentiles(values: List[float]) -> dict:
+    if not values:
+        return {"p50": None, "p95": None, "max": None}
+    if len(values) == 1:
+        return {"p50": values[0], "p95": values[0], "max": values[0]}
+    cuts = statistics.quantiles(values, n=100, method="inclusive")
+    return {"p50": cuts[49], "p95": cuts[94], "max": max(values)}
+
+
+def digest_record(schedule: Schedule, articles: list, search_s: float, error: Optional[str] = None) -> dict:
+    """La línea JSON del resumen de una programación."""
+    return {
+        "schedule": schedule.id,
+        "destinations": [{"app": d.app, "channel": d.channel} for d in schedule.destinations],
+        "keywords": schedule.search_keywords,
+        "providers": schedule.providers,
+        "search_s": round(search_s, 6),
+        "error": error,
+        "articles": [article.to_dict() for article in articles],
+    }
+
+
+async def run_once(schedules: List[Schedule],
+                   searcher: ResearchPaperSearcher,
+                   output: IO[str],
+                   planner: Optional[QueryPlanner] = None,
+                   concurrency: int = 20) -> dict:
+    """
+    Busca los artículos de todas las programaciones a la vez y escribe en
+    ``output`` una línea JSON por programación, en el orden de ``schedules``.
+
+    Args:
+        schedules (List[Schedule]): Las programaciones a ejecutar.
+        searcher (ResearchPaperSearcher): El buscador, compartido por todas.
+        output (IO[str]): Dónde se escriben las líneas JSON.
+        planner (QueryPlanner, optional): Si se indica, todas las búsquedas forman un único plan.
+        concurrency (int): Búsquedas en marcha a la vez, como ``max_concurrent_runs`` del dispatcher.
+
+    Returns:
+        dict: Resumen de tiempos y recuentos (ver ``format_summary``).
+    """
+    semaphore = asyncio.Semaphore(max(concurrency, 1))
+    started = time.perf_counter()
+
+    async def run(schedule: Schedule, search: Optional[asyncio.Future]):
+        async with semaphore:
+            begun = time.perf_counter()
+            try:
+                if search is None:
+                    search = searcher.search_async(schedule.search_keywords, providers=schedule.providers)
+                articles = await search
+                return digest_record(schedule, articles, time.perf_counter() - begun)
+            except Exception as e:
+                return digest_record(schedule, [], time.perf_counter() - begun, error=str(e))
+
+    # Con planificador, todas las búsquedas se registran antes de ejecutar el plan
+    searches = [planner.submit(s.search_keywords, s.providers) if planner else None for s in schedules]
+    if planner:
+        planner.flush()
+    records = await asyncio.gather(*(run(s, search) for s, search in zip(schedules, searches)))
+    elapsed = time.perf_counter() - started
+
+    for record in records:
+        output.write(json.dumps(record, ensure_ascii=False) + "\n")
+    output.flush()
+
+    return {
+        "schedules": len(records),
+        "failed": sum(1 for record in records if record["error"]),
+        "empty": sum(1 for record in records if not record["error"] and not record["articles"]),
+        "articles": sum(len(record["articles"]) for record in records),
+        "elapsed_s": elapsed,
+        "search_s": _percentiles([record["search_s"] for record in records]),
+    }
+
+
+def format_summary(summary: dict, http_stats: Optional[dict] = None) -> str:
+    def seconds(value):
+        return "n/a" if value is None else f"{value:.3f} s"
+
+    search = summary["search_s"]
+    lines = [
+        f"Ran {summary['schedules']} schedules in {summary['elapsed_s']:.3f} s: "
+        f"{summary['articles']} articles, {summary['empty']} empty, {summary['failed']} failed.",
+        f"Search per schedule: p50 {seconds(search['p50'])}  p95 {seconds(search['p95'])}  "
+        f"max {seconds(search['max'])}",
+    ]
+    if http_stats:
+        lines.append(f"Provider requests: {http_stats['requests']} "
+                     f"({http_stats['cache_hits']} cache hits, {http_stats['not_modified']} not modified)")
+    return "\n".join(lines)
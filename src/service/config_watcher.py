@@ -0,0 +1,65 @@
+import asyncio
+import logging
+import os
+from typing import Awaitable, Callable, List, Optional
+
+from models.paper_model import Schedule
+
+
+class ConfigWatcher:
+    """
+    Polls a configuration file and hands the reloaded schedules to a callback
+    whenever the file changes.
+
+    Polling the file's modification time keeps this dependency-free and works
+    with editors that replace the file instead of writing it in place.
+    """
+
+    def __init__(self,
+                 path: str,
+                 loader: Callable[[str], List[Schedule]],
+                 on_change: Callable[[List[Schedule]], Awaitable[None]],
+                 interval: float = 5.0,
+                 logger: Optional[logging.Logger] = None):
+        """
+        Args:
+            path (str): Path of the YAML configuration file.
+            loader (Callable): Parses the file into a list of schedules.
+            on_change (Callable): Coroutine receiving the new list of schedules.
+            interval (float): Seconds between checks.
+            logger (logging.Logger): Logger para registrar eventos y errores.
+        """
+        self.path = path
+        self.loader = loader
+        self.on_change = on_change
+        self.interval = interval
+        self.logger = logger or logging.getLogger(__name__)
+        self._signature = self._stat()
+
+    def _stat(self):
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+
+    async def check(self) -> bool:
+        """Reload the file if it changed since the last check. Returns whether it did."""
+        signature = self._stat()
+        if signature is None or signature == self._signature:
+            return False
+        self._signature = signature
+        try:
+            schedules = self.loader(self.path)
+        except Exception as e:
+            # Keep the current schedules while the file is half-written or invalid
+            self.logger.error(f"Could not reload {self.path}: {e}")
+            return False
+        self.logger.info(f"Configuration file {self.path} changed, applying {len(schedules)} schedules.")
+        await self.on_change(schedules)
+        return True
+
+    async def watch(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            await self.check()
@@ -0,0 +1,267 @@
+"""
+Reparto de las programaciones entre varias réplicas de ``main.py --store``.
+
+Cada réplica se anuncia en un ``LeaseStore`` con un latido y calcula, con
+rendezvous hashing sobre las réplicas vivas, qué shards le corresponden
+(``schedule_store.shard_of``). Solo dispara las programaciones de los shards
+cuyo lease tiene. Si una réplica muere, deja de latir, sus leases caducan y
+las demás se quedan con sus shards. Si se añade una, solo se mueven los shards
+que pasan a ser suyos.
+
+El lease reparte el trabajo; que cada programación se dispare una sola vez lo
+garantiza ``ScheduleStore.claim``, de modo que un relevo en curso o una réplica
+pausada más allá de su lease no duplican resúmenes.
+
+``SqliteLeaseStore`` (un fichero SQLite compartido) y ``FileLeaseStore`` (un
+directorio con un fichero JSON protegido con ``fcntl.flock``) sirven para
+varias réplicas en la misma máquina; para varias máquinas hace falta un
+``LeaseStore`` sobre un almacén compartido.
+"""
+
+import fcntl
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from abc import ABC, abstractmethod
+from typing import Dict, Iterable, List, Optional, Set
+
+from models.logger_model import LoggerConfig
+from service.schedule_store import SHARD_COUNT, shard_of
+
+config = LoggerConfig(name="Coordinator", log_file="coordinator.log")
+logger = config.get_logger()
+
+
+class LeaseStore(ABC):
+    """Latidos de las réplicas y leases con caducidad, con operaciones atómicas."""
+
+    @abstractmethod
+    def heartbeat(self, worker_id: str, ttl: float, now: float):
+        """Anuncia que ``worker_id`` sigue vivo hasta ``now + ttl``."""
+
+    @abstractmethod
+    def workers(self, now: float) -> List[str]:
+        """Réplicas con latido vigente."""
+
+    @abstractmethod
+    def acquire(self, names: Iterable[str], owner: str, ttl: float, now: float) -> Set[str]:
+        """Toma o renueva los leases libres, caducados o ya suyos; devuelve los que tiene."""
+
+    @abstractmethod
+    def release(self, names: Iterable[str], owner: str):
+        """Suelta los leases de ``owner`` para que otra réplica pueda tomarlos."""
+
+    def leave(self, worker_id: str):
+        """Retira la réplica y suelta todos sus leases."""
+
+    def close(self):
+        pass
+
+
+class SqliteLeaseStore(LeaseStore):
+
+    def __init__(self, path: str, timeout: float = 10.0):
+        self.path = path
+        self.connection = sqlite3.connect(path, timeout=timeout, isolation_level=None)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.executescript("""
+            CREATE TABLE IF NOT EXISTS workers (id TEXT PRIMARY KEY, expires_at REAL NOT NULL);
+            CREATE TABLE IF NOT EXISTS leases (name TEXT PRIMARY KEY, owner TEXT NOT NULL, expires_at REAL NOT NULL);
+        """)
+
+    def _transaction(self, statements):
+        # BEGIN IMMEDIATE: la lectura y la escritura de un acquire no se intercalan con otra réplica
+        self.connection.execute("BEGIN IMMEDIATE")
+        try:
+            result = statements()
+            self.connection.execute("COMMIT")
+            return result
+        except BaseException:
+            self.connection.execute("ROLLBACK")
+            raise
+
+    def heartbeat(self, worker_id: str, ttl: float, now: float):
+        self.connection.execute(
+            "INSERT INTO workers (id, expires_at) VALUES (?, ?) "
+            "ON CONFLICT (id) DO UPDATE SET expires_at = excluded.expires_at",
+            (worker_id, now + ttl))
+
+    def workers(self, now: float) -> List[str]:
+        return [worker for (worker,) in self.connection.execute(
+            "SELECT id FROM workers WHERE expires_at > ? ORDER BY id", (now,))]
+
+    def acquire(self, names: Iterable[str], owner: str, ttl: float, now: float) -> Set[str]:
+        names = list(names)
+
+        def statements():
+            held = set()
+            for name in names:
+                cursor = self.connection.execute(
+                    "INSERT INTO leases (name, owner, expires_at) VALUES (?, ?, ?) "
+                    "ON CONFLICT (name) DO UPDATE SET owner = excluded.owner, expires_at = excluded.expires_at "
+                    "WHERE leases.owner = excluded.owner OR leases.expires_at <= ?",
+                    (name, owner, now + ttl, now))
+                if cursor.rowcount:
+                    held.add(name)
+            return held
+
+        return self._transaction(statements) if names else set()
+
+    def release(self, names: Iterable[str], owner: str):
+        names = list(names)
+        if names:
+            self._transaction(lambda: self.connection.executemany(
+                "DELETE FROM leases WHERE name = ? AND owner = ?", [(name, owner) for name in names]))
+
+    def leave(self, worker_id: str):
+        def statements():
+            self.connection.execute("DELETE FROM workers WHERE id = ?", (worker_id,))
+            self.connection.execute("DELETE FROM leases WHERE owner = ?", (worker_id,))
+        self._transaction(statements)
+
+    def close(self):
+        self.connection.close()
+
+
+class FileLeaseStore(LeaseStore):
+    """Estado en ``<directorio>/leases.json``; cada operación lo lee y escribe con ``leases.lock`` tomado."""
+
+    def __init__(self, directory: str):
+        os.makedirs(directory, exist_ok=True)
+        self.state_path = os.path.join(directory, "leases.json")
+        self.lock_path = os.path.join(directory, "leases.lock")
+
+    def _update(self, change):
+        with open(self.lock_path, "a") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                try:
+                    with open(self.state_path) as file:
+                        state = json.load(file)
+                except (OSError, ValueError):
+                    state = {"workers": {}, "leases": {}}
+                result = change(state)
+                temporary = self.state_path + ".tmp"
+                with open(temporary, "w") as file:
+                    json.dump(state, file)
+                os.replace(temporary, self.state_path)
+                return result
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def heartbeat(self, worker_id: str, ttl: float, now: float):
+        self._update(lambda state: state["workers"].__setitem__(worker_id, now + ttl))
+
+    def workers(self, now: float) -> List[str]:
+        return self._update(lambda state: sorted(
+            worker for worker, expires_at in state["workers"].items() if expires_at > now))
+
+    def acquire(self, names: Iterable[str], owner: str, ttl: float, now: float) -> Set[str]:
+        names = list(names)
+
+        def change(state):
+            held = set()
+            for name in names:
+                lease = state["leases"].get(name)
+                if lease is None or lease[0] == owner or lease[1] <= now:
+                    state["leases"][name] = [owner, now + ttl]
+                    held.add(name)
+            return held
+
+        return self._update(change) if names else set()
+
+    def release(self, names: Iterable[str], owner: str):
+        names = list(names)
+
+        def change(state):
+            for name in names:
+                if state["leases"].get(name, [None])[0] == owner:
+                    del state["leases"][name]
+
+        if names:
+            self._update(change)
+
+    def leave(self, worker_id: str):
+        def change(state):
+            state["workers"].pop(worker_id, None)
+            for name in [name for name, lease in state["leases"].items() if lease[0] == worker_id]:
+                del state["leases"][name]
+        self._update(change)
+
+
+def open_lease_store(path: str) -> LeaseStore:
+    """Un directorio usa ``FileLeaseStore``; cualquier otra ruta, un fichero ``SqliteLeaseStore``."""
+    if os.path.isdir(path) or path.endswith(os.sep):
+        return FileLeaseStore(path)
+    return SqliteLeaseStore(path)
+
+
+class ShardCoordinator:
+    """Shards de ``SHARD_COUNT`` que tiene esta réplica, renovados en cada ``tick``."""
+
+    def __init__(self, store: LeaseStore, worker_id: str, lease_ttl: float = 30.0):
+        """
+        Args:
+            store (LeaseStore): Latidos y leases compartidos por todas las réplicas.
+            worker_id (str): Identificador único de esta réplica.
+            lease_ttl (float): Segundos sin latido tras los que una réplica se da por muerta.
+        """
+        self.store = store
+        self.worker_id = worker_id
+        self.lease_ttl = lease_ttl
+        self.owned: Set[int] = set()
+        self.members: List[str] = []
+        self.last_tick: Optional[float] = None
+
+    @property
+    def renew_interval(self) -> float:
+        """Cada cuánto hay que llamar a ``tick`` para no perder los leases."""
+        return self.lease_ttl / 3
+
+    @staticmethod
+    def _weight(worker: str, shard: int) -> int:
+        digest = hashlib.blake2b(f"{worker}/{shard}".encode("utf-8"), digest_size=8).digest()
+        return int.from_bytes(digest, "big")
+
+    def assignment(self, members: List[str]) -> Dict[int, str]:
+        """Réplica de cada shard: la de mayor peso (rendezvous hashing), así que cambiar de réplicas mueve pocos shards."""
+        if not members:
+            return {}
+        return {shard: max(members, key=lambda worker: self._weight(worker, shard))
+                for shard in range(SHARD_COUNT)}
+
+    def tick(self, now: Optional[float] = None) -> Set[int]:
+        """Late, recalcula el reparto con las réplicas vivas, suelta los shards que ya no son suyos y toma el resto."""
+        now = now if now is not None else time.time()
+        self.store.heartbeat(self.worker_id, self.lease_ttl, now)
+        members = self.store.workers(now)
+        assignment = self.assignment(members)
+        wanted = {shard for shard, worker in assignment.items() if worker == self.worker_id}
+
+        lost = self.owned - wanted
+        if lost:
+            self.store.release([self._lease(shard) for shard in lost], self.worker_id)
+        held = self.store.acquire([self._lease(shard) for shard in wanted], self.worker_id, self.lease_ttl, now)
+        owned = {int(name.split(":", 1)[1]) for name in held}
+
+        if members != self.members or owned != self.owned:
+            logger.info(f"Worker {self.worker_id}: {len(members)} live workers, owns {len(owned)} of "
+                        f"{SHARD_COUNT} shards ({len(wanted - owned)} still held by others).")
+        self.members = members
+        self.owned = owned
+        self.last_tick = now
+        return owned
+
+    def owns(self, schedule_id: str) -> bool:
+        return shard_of(schedule_id) in self.owned
+
+    def leave(self):
+        """Se retira al apagar, para que las demás réplicas tomen sus shards sin esperar a que caduquen."""
+        self.store.leave(self.worker_id)
+        self.owned = set()
+
+    @staticmethod
+    def _lease(shard: int) -> str:
+        return f"shard:{shard}"
@@ -0,0 +1,292 @@
+import asyncio
+import json
+import sqlite3
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from models.logger_model import LoggerConfig
+from models.paper_model import ArticleMetadata
+
+config = LoggerConfig(name="DeliveryQueue", log_file="delivery_queue.log")
+logger = config.get_logger()
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS deliveries (
+    id              INTEGER PRIMARY KEY AUTOINCREMENT,
+    app             TEXT NOT NULL,
+    channel         TEXT NOT NULL,
+    articles        TEXT NOT NULL,
+    status          TEXT NOT NULL DEFAULT 'pending',
+    attempts        INTEGER NOT NULL DEFAULT 0,
+    next_attempt_at REAL NOT NULL,
+    created_at      REAL NOT NULL,
+    last_error      TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_deliveries_due ON deliveries (status, next_attempt_at);
+"""
+
+ChannelKey = Tuple[str, str]
+
+
+class Delivery:
+    """A digest waiting in the queue: the articles of one run for one channel."""
+
+    def __init__(self, id: int, app: str, channel: str, articles: List[ArticleMetadata], attempts: int):
+        self.id = id
+        self.app = app
+        self.channel = channel
+        self.articles = articles
+        self.attempts = attempts
+
+    @property
+    def key(self) -> ChannelKey:
+        return (self.app, self.channel)
+
+
+class DeliveryQueue:
+    """
+    SQLite-backed outbox of digests.
+
+    Runs only enqueue their articles; a DeliveryWorker claims them later. A
+    claimed delivery is leased for ``lease_seconds``: if the process dies before
+    it is completed, it becomes due again and is sent on the next start.
+    """
+
+    def __init__(self, path: str, lease_seconds: float = 300.0):
+        """
+        Args:
+            path (str): Path of the SQLite database (created if missing). ``:memory:`` works for tests.
+            lease_seconds (float): How long a claimed delivery stays hidden from other claims.
+        """
+        self.path = path
+        self.lease_seconds = lease_seconds
+        self.connection = sqlite3.connect(path)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.executescript(SCHEMA)
+
+    def close(self):
+        self.connection.close()
+
+    def enqueue(self, app: str, channel: str, articles: List[ArticleMetadata]) -> int:
+        now = time.time()
+        with self.connection:
+            cursor = self.connection.execute(
+                """INSERT INTO deliveries (app, channel, articles, next_attempt_at, created_at)
+                   VALUES (?, ?, ?, ?, ?)""",
+                (app, channel, json.dumps([article.to_dict() for article in articles]), now, now))
+        return cursor.lastrowid
+
+    def claim(self, limit: int, now: Optional[float] = None,
+              exclude: Iterable[ChannelKey] = ()) -> List[Delivery]:
+        """
+        Leases up to ``limit`` due deliveries, oldest first, skipping the
+        channels in ``exclude`` (those with a delivery already in flight).
+        """
+        now = now if now is not None else time.time()
+        exclude = list(exclude)
+        skip = "".join(" AND NOT (app = ? AND channel = ?)" for _ in exclude)
+        params = [now] + [value for key in exclude for value in key] + [limit]
+        with self.connection:
+            rows = self.connection.execute(
+                f"""SELECT id, app, channel, articles, attempts FROM deliveries
+                    WHERE status = 'pending' AND next_attempt_at <= ?{skip}
+                    ORDER BY next_attempt_at, id LIMIT ?""",
+                params).fetchall()
+            self.connection.executemany(
+                "UPDATE deliveries SET attempts = attempts + 1, next_attempt_at = ? WHERE id = ?",
+                [(now + self.lease_seconds, row[0]) for row in rows])
+        return [Delivery(row[0], row[1], row[2],
+                         [ArticleMetadata.from_dict(article) for article in json.loads(row[3])], row[4] + 1)
+                for row in rows]
+
+    def complete(self, ids: Iterable[int]):
+        with self.connection:
+            self.connection.executemany("DELETE FROM deliveries WHERE id = ?", [(i,) for i in ids])
+
+    def retry(self, ids: Iterable[int], error: str, delay: float, dead: bool = False):
+        """Makes the deliveries due again after ``delay`` seconds, or parks them as dead letters."""
+        status = "dead" if dead else "pending"
+        with self.connection:
+            self.connection.executemany(
+                "UPDATE deliveries SET status = ?, next_attempt_at = ?, last_error = ? WHERE id = ?",
+                [(status, time.time() + delay, error, i) for i in ids])
+
+    def release(self, ids: Iterable[int]):
+        """Returns claimed deliveries to the queue without counting the attempt."""
+        with self.connection:
+            self.connection.executemany(
+                "UPDATE deliveries SET attempts = attempts - 1, next_attempt_at = ? WHERE id = ?",
+                [(time.time(), i) for i in ids])
+
+    def pending_count(self) -> int:
+        return self.connection.execute(
+            "SELECT COUNT(*) FROM deliveries WHERE status = 'pending'").fetchone()[0]
+
+    def dead_count(self) -> int:
+        return self.connection.execute(
+            "SELECT COUNT(*) FROM deliveries WHERE status = 'dead'").fetchone()[0]
+
+
+class RateLimiter:
+    """Token bucket: ``rate`` acquisitions per second on average, bursts of up to ``burst``."""
+
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self.lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class DeliveryWorker:
+    """
+    Sends the digests of a DeliveryQueue through the chat bots.
+
+    Due deliveries for the same channel are merged into one digest, so a
+    backlog costs one packed send per channel instead of one per run. Each
+    channel has at most one send in flight and its own rate limit, and every
+    send also takes a token from a global limit. Failed sends are retried with
+    exponential backoff and parked as dead letters after ``max_attempts``.
+    """
+
+    def __init__(self,
+                 queue: DeliveryQueue,
+                 bot_for: Callable[[str], object],
+                 global_rate: float = 10.0,
+                 channel_rate: float = 1.0,
+                 batch_size: int = 100,
+                 max_in_flight: int = 20,
+                 max_attempts: int = 5,
+                 retry_delay: float = 5.0,
+                 max_retry_delay: float = 300.0,
+                 poll_interval: float = 1.0):
+        """
+        Args:
+            queue (DeliveryQueue): Where the digests are waiting.
+            bot_for (Callable): Returns the bot that delivers for an app name.
+            global_rate (float): Sends per second across all channels.
+            channel_rate (float): Sends per second to any one channel.
+            batch_size (int): Deliveries claimed per query.
+            max_in_flight (int): Channels being sent to at the same time.
+            max_attempts (int): Attempts before a delivery becomes a dead letter.
+            retry_delay (float): Delay before the first retry; doubles on every attempt.
+            max_retry_delay (float): Upper bound of the retry delay.
+            poll_interval (float): Sleep between claims when nothing is due.
+        """
+        self.queue = queue
+        self.bot_for = bot_for
+        self.global_limiter = RateLimiter(global_rate, burst=max(1, int(global_rate)))
+        self.channel_rate = channel_rate
+        self.channel_limiters: Dict[ChannelKey, RateLimiter] = {}
+        self.batch_size = batch_size
+        self.max_in_flight = max_in_flight
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        self.max_retry_delay = max_retry_delay
+        self.poll_interval = poll_interval
+        self.in_flight: Set[ChannelKey] = set()
+        self.tasks: Set[asyncio.Task] = set()
+        self.stats = {"sent": 0, "digests": 0, "retried": 0, "dead": 0}
+
+    def channel_limiter(self, key: ChannelKey) -> RateLimiter:
+        if key not in self.channel_limiters:
+            self.channel_limiters[key] = RateLimiter(self.channel_rate)
+        return self.channel_limiters[key]
+
+    def dispatch(self, now: Optional[float] = None) -> int:
+        """Claims due deliveries and starts one send per free channel. Returns how many were claimed."""
+        free = self.max_in_flight - len(self.in_flight)
+        if free <= 0:
+            return 0
+        deliveries = self.queue.claim(self.batch_size, now, exclude=self.in_flight)
+        groups: "OrderedDict[ChannelKey, List[Delivery]]" = OrderedDict()
+        for delivery in deliveries:
+            groups.setdefault(delivery.key, []).append(delivery)
+        for key, group in groups.items():
+            if len(self.in_flight) >= self.max_in_flight:
+                # Sin hueco: se devuelven para la siguiente pasada
+                self.queue.release([d.id for d in group])
+                continue
+            self.in_flight.add(key)
+            task = asyncio.create_task(self._send(key, group), name=f"deliver:{key[0]}:{key[1]}")
+            self.tasks.add(task)
+            task.add_done_callback(self.tasks.discard)
+        return len(deliveries)
+
+    async def run_forever(self, finished: Optional[asyncio.Event] = None):
+        """
+        Delivers as deliveries become due. With ``finished``, returns once it is
+        set and nothing is pending or in flight any more.
+        """
+        while True:
+            if finished is not None and finished.is_set() and not self.tasks and not self.queue.pending_count():
+                return
+            if not self.dispatch():
+                await asyncio.sleep(self.poll_interval)
+            else:
+                await asyncio.sleep(0)
+
+    async def drain(self, timeout: Optional[float] = None):
+        """Delivers until nothing is due or in flight (used by benchmarks and on shutdown)."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self.dispatch() or self.tasks:
+            if deadline is not None and time.monotonic() > deadline:
+                return
+            if self.tasks:
+                await asyncio.wait(list(self.tasks), return_when=asyncio.FIRST_COMPLETED)
+
+    async def shutdown(self):
+        for task in list(self.tasks):
+            task.cancel()
+
+    async def _send(self, key: ChannelKey, group: List[Delivery]):
+        ids = [delivery.id for delivery in group]
+        try:
+            await self.channel_limiter(key).acquire()
+            await self.global_limiter.acquire()
+            articles = self._merge(group)
+            await self.bot_for(key[0]).deliver(articles, key[1])
+        except asyncio.CancelledError:
+            # La entrega sigue arrendada y se reintentará al vencer el arriendo
+            raise
+        except Exception as e:
+            attempts = max(delivery.attempts for delivery in group)
+            dead = attempts >= self.max_attempts
+            delay = min(self.max_retry_delay, self.retry_delay * 2 ** (attempts - 1))
+            self.queue.retry(ids, str(e), delay, dead=dead)
+            if dead:
+                self.stats["dead"] += len(ids)
+                logger.error(f"Giving up on {len(ids)} deliveries to {key[1]} after {attempts} attempts: {e}")
+            else:
+                self.stats["retried"] += len(ids)
+                logger.warning(f"Delivery to {key[1]} failed (attempt {attempts}), retrying in {delay:.0f}s: {e}")
+        else:
+            self.queue.complete(ids)
+            self.stats["sent"] += 1
+            self.stats["digests"] += len(ids)
+        finally:
+            self.in_flight.discard(key)
+
+    @staticmethod
+    def _merge(group: List[Delivery]) -> List[ArticleMetadata]:
+        """Joins the digests of one channel, dropping articles repeated between runs."""
+        seen = set()
+        articles = []
+        for delivery in group:
+            for article in delivery.articles:
+                if article.link not in seen:
+                    seen.add(article.link)
+                    articles.append(article)
+        return articles
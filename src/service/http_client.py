@@ -0,0 +1,222 @@
+import threading
+import time
+from collections import Counter, OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional, Tuple, Union
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.request import ACCEPT_ENCODING
+
+from models.response_api import loads
+
+Timeout = Union[float, Tuple[float, float]]
+
+# Tamaño de los trozos en que se lee (y descomprime) el cuerpo de la respuesta
+CHUNK_SIZE = 64 * 1024
+
+
+@dataclass
+class CachedResponse:
+    """Cuerpo de una respuesta, sus validadores y lo ya decodificado a partir de él (por proveedor)."""
+    body: bytes
+    expires_at: float
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    decoded: Dict[str, Any] = field(default_factory=dict)
+
+    def validators(self) -> Dict[str, str]:
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+@dataclass
+class Fetched:
+    """Resultado de una petición: estado, cuerpo ya descomprimido y bytes recibidos por la red."""
+    status: int
+    body: bytes = b""
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    wire_bytes: int = 0
+
+
+class HttpClient:
+    """
+    Transporte HTTP compartido por todos los proveedores.
+
+    Una única ``requests.Session`` reutiliza las conexiones entre búsquedas
+    (y entre hilos), todas las peticiones llevan timeout, y las respuestas
+    se guardan durante ``cache_ttl`` segundos, de modo que varias programaciones
+    que buscan lo mismo en el mismo intervalo solo generan una petición.
+
+    Las peticiones aceptan respuestas comprimidas (gzip, deflate y brotli si
+    está instalado), que se descomprimen a medida que se leen. Pasado
+    ``cache_ttl``, la respuesta guardada se revalida con ``If-None-Match`` /
+    ``If-Modified-Since``: un 304 reutiliza el cuerpo y lo ya decodificado
+    (``get_decoded``) sin volver a descargarlo ni a interpretarlo. ``traffic``
+    cuenta, por proveedor, los bytes recibidos y los ahorrados.
+    """
+
+    def __init__(self,
+                 timeout: Timeout = (5.0, 30.0),
+                 pool_size: int = 20,
+                 cache_ttl: float = 300.0,
+                 cache_size: int = 256,
+                 revalidate: bool = True):
+        """
+        Args:
+            timeout (float | tuple): Timeout de conexión y de lectura, en segundos.
+            pool_size (int): Conexiones abiertas que se conservan por host.
+            cache_ttl (float): Segundos que una respuesta sigue siendo válida (0 desactiva la caché).
+            cache_size (int): Número máximo de respuestas guardadas.
+            revalidate (bool): Guardar ``ETag``/``Last-Modified`` y hacer peticiones condicionales.
+        """
+        self.timeout = timeout
+        self.cache_ttl = cache_ttl
+        self.cache_size = cache_size
+        self.revalidate = revalidate
+        self.session = requests.Session()
+        self.session.headers["Accept-Encoding"] = ", ".join(ACCEPT_ENCODING.split(","))
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.cache: "OrderedDict[str, CachedResponse]" = OrderedDict()
+        self.lock = threading.Lock()
+        self.stats = {"requests": 0, "cache_hits": 0, "not_modified": 0}
+        # Proveedor (u host) -> contadores de tráfico; ver traffic_report()
+        self.traffic: Dict[str, Counter] = {}
+
+    def close(self):
+        self.session.close()
+
+    def clear_cache(self):
+        with self.lock:
+            self.cache.clear()
+
+    @staticmethod
+    def cache_key(url: str, params: Optional[dict] = None) -> str:
+        return requests.Request("GET", url, params=params).prepare().url
+
+    def get(self, url: str, params: Optional[dict] = None, timeout: Optional[Timeout] = None,
+            label: Optional[str] = None) -> bytes:
+        """Cuerpo de la respuesta a ``GET url?params``; lanza ``requests.HTTPError`` si el estado no es 2xx."""
+        return self._get(url, params, timeout, label).body
+
+    def get_json(self, url: str, params: Optional[dict] = None, timeout: Optional[Timeout] = None):
+        return loads(self.get(url, params, timeout))
+
+    def get_decoded(self, url: str, params: Optional[dict], schema, timeout: Optional[Timeout] = None):
+        """
+        ``schema.decode`` del cuerpo de la respuesta. Si el cuerpo no ha cambiado
+        (caché o 304) se devuelve una copia de lo decodificado la vez anterior.
+        """
+        entry = self._get(url, params, timeout, schema.provider)
+        with self.lock:
+            page = entry.decoded.get(schema.provider)
+        if page is None:
+            page = schema.decode(entry.body)
+            with self.lock:
+                entry.decoded[schema.provider] = page
+        return page.copy()
+
+    def _get(self, url: str, params: Optional[dict], timeout: Optional[Timeout],
+             label: Optional[str]) -> CachedResponse:
+        key = self.cache_key(url, params)
+        label = label or urlsplit(key).netloc
+        with self.lock:
+            entry = self.cache.get(key)
+            if entry is not None:
+                self.cache.move_to_end(key)
+                if entry.expires_at > time.monotonic():
+                    self.stats["cache_hits"] += 1
+                    self._count(label, cache_hits=1, bytes_saved=len(entry.body))
+                    return entry
+
+        headers = entry.validators() if entry is not None and self.revalidate else None
+        fetched = self._fetch(url, params, timeout or self.timeout, headers)
+
+        with self.lock:
+            self._count(label, requests=1, wire_bytes=fetched.wire_bytes)
+            if fetched.status == 304 and entry is not None:
+                self.stats["not_modified"] += 1
+                self._count(label, not_modified=1, bytes_saved=len(entry.body))
+                entry.expires_at = time.monotonic() + self.cache_ttl
+                return entry
+
+            self._count(label, body_bytes=len(fetched.body),
+                        bytes_saved=max(0, len(fetched.body) - fetched.wire_bytes))
+            entry = CachedResponse(fetched.body, time.monotonic() + self.cache_ttl,
+                                   fetched.etag if self.revalidate else None,
+                                   fetched.last_modified if self.revalidate else None)
+            if self.cache_ttl > 0 or entry.validators():
+                self.cache[key] = entry
+                self.cache.move_to_end(key)
+                while len(self.cache) > self.cache_size:
+                    self.cache.popitem(last=False)
+            return entry
+
+    def _count(self, label: str, **counts: int):
+        self.traffic.setdefault(label, Counter()).update(counts)
+
+    def _fetch(self, url: str, params: Optional[dict], timeout: Timeout,
+               headers: Optional[Dict[str, str]] = None) -> Fetched:
+        with self.lock:
+            self.stats["requests"] += 1
+        with self.session.get(url, params=params, timeout=timeout, headers=headers, stream=True) as response:
+            # iter_content descomprime trozo a trozo; leerlo todo devuelve la conexión al pool
+            body = b"".join(response.iter_content(CHUNK_SIZE))
+            wire_bytes = response.raw.tell() if hasattr(response.raw, "tell") else len(body)
+            if response.status_code == 304:
+                return Fetched(304, wire_bytes=wire_bytes)
+            response.raise_for_status()
+            return Fetched(response.status_code, body, response.headers.get("ETag"),
+                           response.headers.get("Last-Modified"), wire_bytes)
+
+    def traffic_report(self) -> Dict[str, dict]:
+        """Por proveedor: peticiones, bytes recibidos, bytes del cuerpo, respuestas 304 y bytes ahorrados."""
+        with self.lock:
+            return {label: dict(counts) for label, counts in self.traffic.items()}
+
+    def log_traffic(self, logger):
+        for label, counts in sorted(self.traffic_report().items()):
+            logger.info(f"HTTP {label}: {counts.get('requests', 0)} requests, "
+                        f"{counts.get('wire_bytes', 0)} bytes received, "
+                        f"{counts.get('not_modified', 0)} not modified, "
+                        f"{counts.get('cache_hits', 0)} cache hits, "
+                        f"{counts.get('bytes_saved', 0)} bytes saved.")
+
+
+_client: Optional[HttpClient] = None
+_client_lock = threading.Lock()
+
+
+def get_http_client() -> HttpClient:
+    """Cliente del proceso, creado en el primer uso."""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = HttpClient()
+    return _client
+
+
+def configure_http(timeout: Optional[Timeout] = None,
+                   pool_size: Optional[int] = None,
+                   cache_ttl: Optional[float] = None,
+                   cache_size: Optional[int] = None,
+                   revalidate: Optional[bool] = None) -> HttpClient:
+    """Sustituye el cliente del proceso por uno con la configuración indicada. Ver ``HttpClient``."""
+    global _client
+    options = {"timeout": timeout, "pool_size": pool_size, "cache_ttl": cache_ttl, "cache_size": cache_size,
+               "revalidate": revalidate}
+    with _client_lock:
+        previous = _client
+        _client = HttpClient(**{key: value for key, value in options.items() if value is not None})
+    if previous is not None:
+        previous.close()
+    return _client
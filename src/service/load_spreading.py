@@ -0,0 +1,77 @@
+"""
+Reparto en el tiempo de los disparos de las programaciones.
+
+Casi todas las expresiones cron son redondas (``0 * * * *``, ``*/5 * * * *``),
+así que todas las programaciones consultan a los proveedores en el mismo
+segundo. Con una ventana de jitter, cada programación se dispara con un
+desfase fijo dentro de la ventana, derivado de su id: es determinista (el
+mismo en cada réplica y en cada reinicio) y no cambia entre disparos, de modo
+que el intervalo entre dos resúmenes sigue siendo el del cron.
+
+Además, ``start_slot`` limita cuántas ejecuciones empiezan por segundo en
+todo el proceso, para alisar los picos que el jitter no reparte (por ejemplo,
+tras una recuperación de disparos perdidos o con ventanas pequeñas).
+"""
+
+import hashlib
+from datetime import timedelta
+from typing import Optional
+
+from apscheduler.triggers.cron import CronTrigger
+from tzlocal import get_localzone
+
+from service.delivery_queue import RateLimiter
+
+# Segundos en los que se reparten los disparos (0 los deja tal cual los escribe el cron)
+JITTER_WINDOW = 0.0
+# Ejecuciones que pueden empezar por segundo en el proceso (None sin límite)
+_start_limiter: Optional[RateLimiter] = None
+
+
+def configure_spreading(jitter_window: Optional[float] = None, max_starts_per_second: Optional[float] = None):
+    """Configuración del proceso; ``max_starts_per_second`` a 0 quita el límite."""
+    global JITTER_WINDOW, _start_limiter
+    if jitter_window is not None:
+        JITTER_WINDOW = max(0.0, jitter_window)
+    if max_starts_per_second is not None:
+        _start_limiter = RateLimiter(max_starts_per_second) if max_starts_per_second > 0 else None
+
+
+def fire_offset(schedule_id: str, window: Optional[float] = None) -> float:
+    """Desfase en segundos, en ``[0, window)``, de los disparos de ``schedule_id``."""
+    window = JITTER_WINDOW if window is None else window
+    if window <= 0:
+        return 0.0
+    digest = hashlib.blake2b(schedule_id.encode("utf-8"), digest_size=8).digest()
+    return window * int.from_bytes(digest, "big") / 2 ** 64
+
+
+class OffsetCronTrigger(CronTrigger):
+    """``CronTrigger`` cuyos disparos llegan ``offset`` segundos más tarde."""
+
+    def __init__(self, offset: float = 0.0, **cron_args):
+        super().__init__(**cron_args)
+        self.offset = timedelta(seconds=offset)
+
+    def get_next_fire_time(self, previous_fire_time, now):
+        previous = previous_fire_time - self.offset if previous_fire_time else None
+        fire_time = super().get_next_fire_time(previous, now - self.offset)
+        return fire_time + self.offset if fire_time else None
+
+    def __str__(self):
+        return f"{super().__str__()} {self.offset.total_seconds():+.0f}s"
+
+
+def cron_trigger(cron_args: dict, schedule_id: Optional[str] = None, lead: float = 0.0) -> CronTrigger:
+    """
+    Trigger de APScheduler para ``cron_args`` (``parse_cron_string``) con el
+    desfase de ``schedule_id``, adelantado ``lead`` segundos (ver ``service.prefetch``).
+    """
+    return OffsetCronTrigger((fire_offset(schedule_id) if schedule_id else 0.0) - lead,
+                             timezone=get_localzone(), **cron_args)
+
+
+async def start_slot():
+    """Espera a que una ejecución pueda empezar sin pasar de ``max_starts_per_second``."""
+    if _start_limiter is not None:
+        await _start_limiter.acquire()
@@ -0,0 +1,76 @@
+"""
+Recuperación de los disparos perdidos mientras el proceso estaba parado.
+
+``ScheduleStore`` guarda el próximo y el último disparo de cada programación.
+Al arrancar (o tras una pausa larga), las programaciones cuyo próximo disparo
+quedó más de ``grace`` segundos atrás se dan por perdidas y ``CatchUpPolicy``
+decide cuántas veces se ejecutan y cuándo:
+
+- ``skip``: ninguna; se espera al siguiente disparo.
+- ``coalesce``: una sola ejecución por programación, aunque se perdieran varias.
+- ``all``: una por disparo perdido, hasta ``max_runs``.
+
+Las ejecuciones de recuperación se reparten a lo largo de ``spread`` segundos,
+intercalando las programaciones, para no lanzar todas a la vez contra los
+proveedores y las plataformas de chat justo al arrancar.
+"""
+
+import time
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+from models.paper_model import Schedule
+from service.schedule_store import next_fire_time
+
+MISFIRE_MODES = ("skip", "coalesce", "all")
+
+
+def missed_fire_times(cron_schedule: str, first: float, now: float, limit: int,
+                      schedule_id: Optional[str] = None) -> List[float]:
+    """
+    Disparos de ``cron_schedule`` (con el jitter de ``schedule_id``) desde
+    ``first`` (incluido) hasta ``now``, como mucho ``limit``.
+    """
+    missed = []
+    fire_time = first
+    while fire_time is not None and fire_time <= now and len(missed) < limit:
+        missed.append(fire_time)
+        fire_time = next_fire_time(cron_schedule, fire_time, schedule_id)
+    return missed
+
+
+@dataclass
+class CatchUpPolicy:
+    """Qué hacer con los disparos perdidos; ver el docstring del módulo."""
+    mode: str = "coalesce"
+    grace: float = 60.0
+    spread: float = 300.0
+    max_runs: int = 10
+
+    def __post_init__(self):
+        if self.mode not in MISFIRE_MODES:
+            raise ValueError(f"Unknown misfire mode: {self.mode} (expected one of {', '.join(MISFIRE_MODES)})")
+
+    def is_overdue(self, next_fire_at: Optional[float], now: float) -> bool:
+        """Un disparo con más de ``grace`` segundos de retraso ya no se ejecuta como si fuera puntual."""
+        return next_fire_at is not None and next_fire_at < now - self.grace
+
+    def runs(self, schedule: Schedule, next_fire_at: float, now: float) -> List[float]:
+        """Disparos perdidos de ``schedule`` que se van a recuperar."""
+        if self.mode == "skip":
+            return []
+        limit = 1 if self.mode == "coalesce" else max(1, self.max_runs)
+        return missed_fire_times(schedule.cron_schedule, next_fire_at, now, limit, schedule.id)
+
+    def plan(self, overdue: List[Tuple[Schedule, float]], now: Optional[float] = None) -> List[Tuple[float, Schedule]]:
+        """
+        ``(retraso, programación)`` de cada ejecución de recuperación. Primero va
+        una ronda con la primera de cada programación, luego la segunda, etc.,
+        espaciadas por igual a lo largo de ``spread`` segundos.
+        """
+        now = now if now is not None else time.time()
+        pending = [(schedule, len(self.runs(schedule, next_fire_at, now))) for schedule, next_fire_at in overdue]
+        rounds = max((count for _, count in pending), default=0)
+        ordered = [schedule for n in range(rounds) for schedule, count in pending if n < count]
+        step = self.spread / len(ordered) if ordered else 0.0
+        return [(i * step, schedule) for i, schedule in enumerate(ordered)]
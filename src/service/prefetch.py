@@ -0,0 +1,92 @@
+"""
+Búsquedas adelantadas al disparo de las programaciones.
+
+Con un adelanto (``--prefetch``), la búsqueda de cada programación empieza
+``lead`` segundos antes de su próximo disparo, calculado con el mismo trigger
+que el disparo (cron más jitter). Cuando el cron se dispara, el resumen ya
+está buscado y ordenado y el bot solo tiene que enviarlo, de modo que llega en
+el minuto programado en lugar de cuando terminan de responder los proveedores.
+
+Si cuando llega el disparo la búsqueda adelantada ha fallado o ha caducado
+(el disparo no llegó, o la programación cambió), la ejecución busca como siempre.
+"""
+
+import asyncio
+import time
+from typing import Awaitable, Dict, Hashable, Optional, Tuple
+
+from models.logger_model import LoggerConfig
+
+config = LoggerConfig(name="Prefetcher", log_file="prefetch.log")
+logger = config.get_logger()
+
+# Segundos de adelanto de las búsquedas (0 busca al dispararse)
+PREFETCH_LEAD = 0.0
+# Margen tras el disparo previsto durante el que una búsqueda adelantada sigue sirviendo
+PREFETCH_SLACK = 60.0
+
+
+def configure_prefetch(lead: Optional[float] = None):
+    """Configuración del proceso; se aplica a los bots y dispatchers creados después."""
+    global PREFETCH_LEAD
+    if lead is not None:
+        PREFETCH_LEAD = max(0.0, lead)
+
+
+class Prefetcher:
+    """Búsquedas en curso (o terminadas) por clave, hasta que su ejecución las recoge o caducan."""
+
+    def __init__(self, slack: float = PREFETCH_SLACK):
+        self.slack = slack
+        self.entries: Dict[Hashable, Tuple[asyncio.Task, float]] = {}
+        self.stats = {"started": 0, "used": 0, "expired": 0, "failed": 0}
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self.entries
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def start(self, key: Hashable, search: Awaitable, fire_at: float) -> asyncio.Task:
+        """Empieza ``search`` para el disparo de ``fire_at`` (epoch); sustituye a la anterior de ``key``."""
+        self.discard(key)
+        task = asyncio.ensure_future(search)
+        # Sin recoger, una búsqueda fallida avisaría de "exception was never retrieved"
+        task.add_done_callback(lambda done: done.cancelled() or done.exception())
+        self.entries[key] = (task, fire_at + self.slack)
+        self.stats["started"] += 1
+        return task
+
+    def take(self, key: Hashable, now: Optional[float] = None) -> Optional[asyncio.Task]:
+        """La búsqueda adelantada de ``key`` si sigue vigente; la ejecución la espera en lugar de buscar."""
+        now = now if now is not None else time.time()
+        entry = self.entries.pop(key, None)
+        if entry is None:
+            return None
+        task, expires_at = entry
+        if expires_at < now or (task.done() and (task.cancelled() or task.exception())):
+            self.stats["failed" if expires_at >= now else "expired"] += 1
+            task.cancel()
+            return None
+        self.stats["used"] += 1
+        return task
+
+    def discard(self, key: Hashable):
+        entry = self.entries.pop(key, None)
+        if entry is not None:
+            entry[0].cancel()
+
+    def expire(self, now: Optional[float] = None) -> int:
+        """Cancela las búsquedas cuyo disparo pasó sin recogerlas (otra réplica lo reclamó, o cambió el cron)."""
+        now = now if now is not None else time.time()
+        stale = [key for key, (_, expires_at) in self.entries.items() if expires_at < now]
+        for key in stale:
+            self.discard(key)
+        self.stats["expired"] += len(stale)
+        if stale:
+            logger.info(f"Dropped {len(stale)} prefetched searches whose fire time passed unused.")
+        return len(stale)
+
+    def clear(self):
+        for key in list(self.entries):
+            self.discard(key)
@@ -0,0 +1,129 @@
+"""
+Agrupación de las palabras clave de una programación en consultas OR.
+
+En lugar de una petición por palabra clave, los proveedores que admiten
+consultas booleanas reciben tantas palabras como quepan en una sola consulta
+``a OR b OR ...``, dentro de los límites de longitud y de términos de cada
+API. Después, cada artículo recibido se atribuye a las palabras clave que
+aparecen en su título o resumen (``ArticleMetadata.keywords``).
+"""
+
+import asyncio
+import re
+from abc import ABC, abstractmethod
+from typing import Callable, List, Optional
+
+from models.api_model import APIErrorResponse, APIResponse, APISuccessResponse
+from models.paper_model import ArticleMetadata
+
+
+def pack_terms(terms: List[str], render: Callable[[List[str]], str],
+               max_length: int, max_terms: Optional[int] = None) -> List[List[str]]:
+    """
+    Reparte los términos, en orden, en el menor número de grupos cuya consulta
+    (``render(grupo)``) no pasa de ``max_length`` caracteres ni de ``max_terms``
+    términos. Un término que por sí solo supera el límite va en su propio grupo.
+    """
+    batches: List[List[str]] = []
+    current: List[str] = []
+    for term in dict.fromkeys(terms):
+        candidate = current + [term]
+        if current and (len(render(candidate)) > max_length or (max_terms and len(candidate) > max_terms)):
+            batches.append(current)
+            candidate = [term]
+        current = candidate
+    if current:
+        batches.append(current)
+    return batches
+
+
+def quote_term(term: str) -> str:
+    """Frase entre comillas si tiene varias palabras, para que el OR no la parta."""
+    return f'"{term}"' if len(term.split()) > 1 else term
+
+
+def _pattern(term: str) -> Optional["re.Pattern"]:
+    # Todas las palabras del término, cada una al principio de una palabra del texto
+    words = re.findall(r"\w+", term.lower())
+    if not words:
+        return None
+    return re.compile("".join(rf"(?=.*\b{re.escape(word)})" for word in words), re.DOTALL)
+
+
+def attribute_keywords(articles: List[ArticleMetadata], terms: List[str],
+                       fallback: bool = True) -> List[ArticleMetadata]:
+    """
+    Anota en cada artículo las palabras clave del grupo que aparecen en su título
+    o resumen. Si no aparece ninguna (el proveedor también busca en otros campos),
+    con ``fallback`` se le atribuye el grupo completo; sin él, el artículo se
+    descarta. Sin ``fallback`` es lo que necesita un grupo con palabras de
+    varias programaciones, donde el grupo completo no pertenece a ninguna.
+    """
+    patterns = [(term, _pattern(term)) for term in terms]
+    attributed = []
+    for article in articles:
+        text = f"{article.title} {article.summary}".lower()
+        matched = [term for term, pattern in patterns if pattern is not None and pattern.match(text)]
+        if matched or fallback:
+            article.keywords = matched or list(terms)
+            attributed.append(article)
+    return attributed
+
+
+class BatchedSearch(ABC):
+    """
+    Búsqueda por grupos de palabras clave para los proveedores con consultas OR.
+
+    El proveedor define ``MAX_QUERY_LENGTH``, ``MAX_BATCH_TERMS`` (``None`` si
+    la API no limita el número de términos), ``batch_query(terms)``, la consulta
+    tal y como se envía, y ``fetch_batch(terms)``, los artículos de un grupo.
+    """
+
+    MAX_QUERY_LENGTH = 1000
+    MAX_BATCH_TERMS: Optional[int] = None
+
+    @abstractmethod
+    def batch_query(self, terms: List[str]) -> str:
+        """La consulta OR de un grupo, tal y como se envía al proveedor."""
+        pass
+
+    @abstractmethod
+    def fetch_batch(self, terms: List[str]) -> List[ArticleMetadata]:
+        """Los artículos de un grupo; lanza si la petición falla."""
+        pass
+
+    def batches(self, terms: List[str]) -> List[List[str]]:
+        return pack_terms(terms, self.batch_query, self.MAX_QUERY_LENGTH, self.MAX_BATCH_TERMS)
+
+    def search_batched(self, terms: List[str], fallback: bool = True) -> APIResponse:
+        """
+        Como ``search_multiple_terms``, con una petición por grupo en lugar de una
+        por término. ``fallback`` se pasa a ``attribute_keywords``.
+        """
+        articles, errors = [], []
+        for batch in self.batches(terms):
+            try:
+                articles.extend(attribute_keywords(self.fetch_batch(batch), batch, fallback))
+            except Exception as e:
+                errors.append(str(e))
+        return self._batched_response(articles, errors)
+
+    async def search_batched_async(self, terms: List[str], fallback: bool = True) -> APIResponse:
+        batches = self.batches(terms)
+        results = await asyncio.gather(*(asyncio.to_thread(self.fetch_batch, batch) for batch in batches),
+                                       return_exceptions=True)
+        articles, errors = [], []
+        for batch, result in zip(batches, results):
+            if isinstance(result, Exception):
+                errors.append(str(result))
+            else:
+                articles.extend(attribute_keywords(result, batch, fallback))
+        return self._batched_response(articles, errors)
+
+    @staticmethod
+    def _batched_response(articles: List[ArticleMetadata], errors: List[str]) -> APIResponse:
+        if articles:
+            return APISuccessResponse(data=articles)
+        if errors:
+            return APIErrorResponse(error_message="; ".join(errors))
+        return APIErrorResponse(error_message="No results found for any term.")
@@ -0,0 +1,110 @@
+import asyncio
+import copy
+from typing import Dict, List, Optional, Tuple
+
+from models.logger_model import LoggerConfig
+from models.paper_model import ArticleMetadata
+from service.api_consumer import ResearchPaperSearcher
+
+config = LoggerConfig(name="QueryPlanner", log_file="planner.log")
+logger = config.get_logger()
+
+# Palabras clave, proveedores y resultado pendiente de una búsqueda
+_Request = Tuple[List[str], List[str], asyncio.Future]
+
+
+class QueryPlanner:
+    """
+    Agrupa las búsquedas de todas las programaciones que se disparan a la vez.
+
+    Las búsquedas que llegan dentro de ``window`` segundos (o hasta que se llama
+    a ``flush``) forman un plan: las palabras clave de todas ellas, sin repetir,
+    por proveedor. El plan se busca una sola vez y cada programación recibe solo
+    los artículos que corresponden a sus palabras clave y proveedores, de modo que
+    las peticiones dependen de las palabras clave distintas y no del número de
+    programaciones. Se usa en lugar del ``ResearchPaperSearcher`` de los bots.
+    """
+
+    def __init__(self, searcher: ResearchPaperSearcher, window: float = 1.0):
+        """
+        Args:
+            searcher (ResearchPaperSearcher): Busca el plan en los proveedores.
+            window (float): Segundos que se espera a otras búsquedas antes de ejecutar el plan.
+        """
+        self.searcher = searcher
+        self.window = window
+        self.pending: List[_Request] = []
+        self.timer: Optional[asyncio.TimerHandle] = None
+        self.tasks = set()
+        self.stats = {"plans": 0, "searches": 0, "keywords": 0, "unique_keywords": 0}
+
+    @property
+    def providers(self) -> List[str]:
+        return self.searcher.providers
+
+    def submit(self, terms: List[str], providers: Optional[List[str]] = None) -> asyncio.Future:
+        """Añade una búsqueda al próximo plan; el futuro se resuelve con sus artículos ya filtrados."""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self.pending.append((list(terms), list(providers or self.searcher.providers), future))
+        if self.timer is None:
+            self.timer = loop.call_later(self.window, self.flush)
+        return future
+
+    async def search_async(self, terms: List[str], providers: Optional[List[str]] = None) -> List[ArticleMetadata]:
+        """Igual que ``ResearchPaperSearcher.search_async``, compartiendo las peticiones con el resto del plan."""
+        return await self.submit(terms, providers)
+
+    def flush(self):
+        """Ejecuta ya el plan con las búsquedas pendientes."""
+        if self.timer is not None:
+            self.timer.cancel()
+            self.timer = None
+        requests, self.pending = self.pending, []
+        if requests:
+            task = asyncio.get_running_loop().create_task(self.execute(requests))
+            self.tasks.add(task)
+            task.add_done_callback(self.tasks.discard)
+
+    @staticmethod
+    def plan(requests: List[_Request]) -> Dict[str, List[str]]:
+        """Palabras clave distintas de cada proveedor, en el orden en que aparecen."""
+        plan: Dict[str, Dict[str, None]] = {}
+        for terms, providers, _ in requests:
+            for provider in providers:
+                plan.setdefault(provider, {}).update(dict.fromkeys(terms))
+        return {provider: list(terms) for provider, terms in plan.items()}
+
+    async def execute(self, requests: List[_Request]):
+        plan = self.plan(requests)
+        keywords = sum(len(terms) * len(providers) for terms, providers, _ in requests)
+        unique = sum(len(terms) for terms in plan.values())
+        self.stats["plans"] += 1
+        self.stats["searches"] += len(requests)
+        self.stats["keywords"] += keywords
+        self.stats["unique_keywords"] += unique
+        logger.info(f"Planning {len(requests)} searches: {unique} unique provider keywords instead of {keywords}.")
+
+        try:
+            results = await self.searcher.search_tagged(plan)
+        except Exception as e:
+            for _, _, future in requests:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for terms, providers, future in requests:
+            if future.done():
+                continue
+            wanted = set(terms)
+            # Cada búsqueda recibe sus propias copias, con solo sus palabras clave: los artículos
+            # del plan se comparten y lo que filtra una programación no debe verse en las demás
+            articles = []
+            for provider in providers:
+                for article in results.get(provider, []):
+                    keywords = [k for k in article.keywords if k in wanted]
+                    if keywords:
+                        article = copy.copy(article)
+                        article.keywords = keywords
+                        articles.append(article)
+            future.set_result(self.searcher.filter_articles(articles))
@@ -0,0 +1,269 @@
+import json
+import sqlite3
+import time
+import zlib
+from datetime import datetime
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+from tzlocal import get_localzone
+
+from models.paper_model import Destination, Schedule, parse_cron_string
+from service.load_spreading import cron_trigger
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS schedules (
+    id              TEXT PRIMARY KEY,
+    app             TEXT NOT NULL,
+    channel         TEXT NOT NULL,
+    cron_schedule   TEXT NOT NULL,
+    search_keywords TEXT NOT NULL,
+    providers       TEXT,
+    destinations    TEXT,
+    shard           INTEGER,
+    next_fire_at    REAL,
+    last_fire_at    REAL,
+    updated_at      REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_schedules_app ON schedules (app);
+CREATE INDEX IF NOT EXISTS idx_schedules_channel ON schedules (app, channel);
+CREATE INDEX IF NOT EXISTS idx_schedules_next_fire ON schedules (next_fire_at);
+"""
+
+_COLUMNS = "id, app, channel, cron_schedule, search_keywords, providers, next_fire_at, last_fire_at, destinations"
+
+# Las programaciones se reparten en un número fijo de shards; las réplicas se reparten los shards
+SHARD_COUNT = 64
+
+
+def shard_of(schedule_id: str) -> int:
+    """Shard de una programación; estable entre procesos y versiones de Python."""
+    return zlib.crc32(schedule_id.encode("utf-8")) % SHARD_COUNT
+
+
+def next_fire_time(cron_schedule: str, after: Optional[float] = None,
+                   schedule_id: Optional[str] = None) -> Optional[float]:
+    """
+    Next time (epoch seconds) the cron expression fires strictly after ``after``,
+    shifted by the jitter of ``schedule_id`` when given.
+
+    Uses the same trigger as the bots' APScheduler jobs, so both scheduling
+    paths agree on when a schedule is due.
+    """
+    timezone = get_localzone()
+    trigger = cron_trigger(parse_cron_string(cron_schedule), schedule_id)
+    now = datetime.fromtimestamp((after if after is not None else time.time()) + 1e-3, timezone)
+    fire_time = trigger.get_next_fire_time(None, now)
+    return fire_time.timestamp() if fire_time else None
+
+
+class ScheduleStore:
+    """
+    SQLite-backed store of schedules, indexed by app, channel and next fire time.
+
+    Only the rows that are needed are read: the dispatcher asks for the page
+    of schedules that are due, so startup costs the same regardless of how
+    many schedules are defined.
+    """
+
+    def __init__(self, path: str):
+        """
+        Args:
+            path (str): Path of the SQLite database (created if missing). ``:memory:`` works for tests.
+        """
+        self.path = path
+        self.connection = sqlite3.connect(path)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.executescript(SCHEMA)
+        self._migrate()
+
+    def _migrate(self):
+        # Bases creadas antes de que las programaciones pudieran elegir proveedores
+        columns = {row[1] for row in self.connection.execute("PRAGMA table_info(schedules)")}
+        if "providers" not in columns:
+            with self.connection:
+                self.connection.execute("ALTER TABLE schedules ADD COLUMN providers TEXT")
+        # Bases creadas antes del reparto entre réplicas
+        if "shard" not in columns:
+            with self.connection:
+                self.connection.execute("ALTER TABLE schedules ADD COLUMN shard INTEGER")
+        unsharded = [schedule_id for (schedule_id,) in
+                     self.connection.execute("SELECT id FROM schedules WHERE shard IS NULL")]
+        if unsharded:
+            with self.connection:
+                self.connection.executemany("UPDATE schedules SET shard = ? WHERE id = ?",
+                                            [(shard_of(i), i) for i in unsharded])
+        self.connection.execute("CREATE INDEX IF NOT EXISTS idx_schedules_shard ON schedules (shard, next_fire_at)")
+        # Bases creadas antes de guardar el último disparo
+        if "last_fire_at" not in columns:
+            with self.connection:
+                self.connection.execute("ALTER TABLE schedules ADD COLUMN last_fire_at REAL")
+        # Bases creadas antes de los destinos múltiples
+        if "destinations" not in columns:
+            with self.connection:
+                self.connection.execute("ALTER TABLE schedules ADD COLUMN destinations TEXT")
+
+    def close(self):
+        self.connection.close()
+
+    @staticmethod
+    def _to_schedule(row) -> Schedule:
+        schedule_id, app, channel, cron_schedule, keywords, providers, next_fire_at, last_fire_at, destinations = row
+        return Schedule(channel=channel, app=app, cron_schedule=cron_schedule,
+                        search_keywords=json.loads(keywords), id=schedule_id,
+                        providers=json.loads(providers) if providers else None,
+                        next_fire_at=next_fire_at, last_fire_at=last_fire_at,
+                        destinations=[Destination(*d) for d in json.loads(destinations)] if destinations else None)
+
+    @staticmethod
+    def _destinations(schedule: Schedule) -> Optional[str]:
+        """Destinos además del principal, (app, channel), como JSON; None si no hay más."""
+        extra = schedule.destinations[1:]
+        return json.dumps([[d.app, d.channel] for d in extra]) if extra else None
+
+    def upsert(self, schedule: Schedule):
+        self.upsert_many([schedule])
+
+    def upsert_many(self, schedules: Iterable[Schedule]):
+        """Insert or update schedules; the next fire time is recomputed only when the cron changes."""
+        now = time.time()
+        rows = [(s.id, s.app, s.channel, s.cron_schedule, json.dumps(s.search_keywords),
+                 json.dumps(s.providers) if s.providers else None, self._destinations(s), shard_of(s.id),
+                 next_fire_time(s.cron_schedule, now, s.id), now) for s in schedules]
+        with self.connection:
+            self.connection.executemany(
+                """INSERT INTO schedules (id, app, channel, cron_schedule, search_keywords, providers,
+                                          destinations, shard, next_fire_at, updated_at)
+                   VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                   ON CONFLICT (id) DO UPDATE SET
+                       app = excluded.app,
+                       channel = excluded.channel,
+                       search_keywords = excluded.search_keywords,
+                       providers = excluded.providers,
+                       destinations = excluded.destinations,
+                       next_fire_at = CASE WHEN schedules.cron_schedule = excluded.cron_schedule
+                                           THEN schedules.next_fire_at ELSE excluded.next_fire_at END,
+                       cron_schedule = excluded.cron_schedule,
+                       updated_at = excluded.updated_at""",
+                rows)
+
+    def delete(self, schedule_id: str):
+        with self.connection:
+            self.connection.execute("DELETE FROM schedules WHERE id = ?", (schedule_id,))
+
+    def sync(self, schedules: List[Schedule]):
+        """Make the store hold exactly ``schedules`` (used to import a YAML file)."""
+        self.upsert_many(schedules)
+        wanted = {schedule.id for schedule in schedules}
+        stale = [schedule_id for (schedule_id,) in self.connection.execute("SELECT id FROM schedules")
+                 if schedule_id not in wanted]
+        with self.connection:
+            self.connection.executemany("DELETE FROM schedules WHERE id = ?", [(i,) for i in stale])
+
+    def get(self, schedule_id: str) -> Optional[Schedule]:
+        row = self.connection.execute(
+            f"SELECT {_COLUMNS} FROM schedules WHERE id = ?", (schedule_id,)).fetchone()
+        return self._to_schedule(row) if row else None
+
+    def count(self) -> int:
+        return self.connection.execute("SELECT COUNT(*) FROM schedules").fetchone()[0]
+
+    def apps(self) -> List[str]:
+        return [app for (app,) in self.connection.execute("SELECT DISTINCT app FROM schedules")]
+
+    def by_app(self, app: str, limit: int = 500, after_id: str = "") -> List[Schedule]:
+        rows = self.connection.execute(
+            f"SELECT {_COLUMNS} FROM schedules WHERE app = ? AND id > ? ORDER BY id LIMIT ?",
+            (app, after_id, limit))
+        return [self._to_schedule(row) for row in rows]
+
+    def by_channel(self, app: str, channel: str) -> List[Schedule]:
+        rows = self.connection.execute(
+            f"SELECT {_COLUMNS} FROM schedules WHERE app = ? AND channel = ?", (app, channel))
+        return [self._to_schedule(row) for row in rows]
+
+    def iter_pages(self, page_size: int = 500, app: Optional[str] = None) -> Iterator[List[Schedule]]:
+        """Yields all schedules (of ``app`` if given) in pages, using keyset pagination on the id."""
+        after_id = ""
+        while True:
+            if app:
+                page = self.by_app(app, page_size, after_id)
+            else:
+                rows = self.connection.execute(
+                    f"SELECT {_COLUMNS} FROM schedules WHERE id > ? ORDER BY id LIMIT ?", (after_id, page_size))
+                page = [self._to_schedule(row) for row in rows]
+            if not page:
+                return
+            yield page
+            after_id = page[-1].id
+
+    @staticmethod
+    def _shard_filter(shards: Optional[Iterable[int]]):
+        if shards is None:
+            return "", []
+        shards = sorted(shards)
+        return f" AND shard IN ({', '.join('?' * len(shards))})", shards
+
+    def due(self, before: float, limit: int = 500, shards: Optional[Iterable[int]] = None,
+            after: Optional[Tuple[float, str]] = None) -> List[Schedule]:
+        """
+        Schedules (of ``shards`` if given) whose next fire time is at or before ``before``,
+        earliest first. ``after``, the ``(next_fire_at, id)`` of the last schedule of the
+        previous page, reads the following page without claiming the schedules.
+        """
+        shard_sql, shard_args = self._shard_filter(shards)
+        after_sql, after_args = ("", []) if after is None else (" AND (next_fire_at, id) > (?, ?)", list(after))
+        rows = self.connection.execute(
+            f"""SELECT {_COLUMNS} FROM schedules
+                WHERE next_fire_at IS NOT NULL AND next_fire_at <= ?{shard_sql}{after_sql}
+                ORDER BY next_fire_at, id LIMIT ?""",
+            (before, *shard_args, *after_args, limit))
+        return [self._to_schedule(row) for row in rows]
+
+    def next_due_at(self, shards: Optional[Iterable[int]] = None, after: Optional[float] = None) -> Optional[float]:
+        """Earliest next fire time (of ``shards`` if given, and later than ``after`` if given)."""
+        shard_sql, shard_args = self._shard_filter(shards)
+        after_sql, after_args = ("", []) if after is None else (" AND next_fire_at > ?", [after])
+        return self.connection.execute(
+            f"SELECT MIN(next_fire_at) FROM schedules WHERE 1 = 1{shard_sql}{after_sql}",
+            [*shard_args, *after_args]).fetchone()[0]
+
+    def advance(self, schedules: Iterable[Schedule], now: Optional[float] = None):
+        """Moves each schedule's next fire time past ``now`` once it has been dispatched."""
+        now = now if now is not None else time.time()
+        with self.connection:
+            self.connection.executemany(
+                "UPDATE schedules SET next_fire_at = ? WHERE id = ?",
+                [(next_fire_time(s.cron_schedule, now, s.id), s.id) for s in schedules])
+
+    def claim(self, schedules: Iterable[Schedule], now: Optional[float] = None) -> List[Schedule]:
+        """
+        Like ``advance``, but only for schedules still due at ``now``, and returns
+        those. When several replicas share the store, a fire time can be claimed
+        by only one of them, so each schedule fires exactly once.
+        """
+        now = now if now is not None else time.time()
+        claimed = []
+        with self.connection:
+            for schedule in schedules:
+                cursor = self.connection.execute(
+                    """UPDATE schedules SET next_fire_at = ?
+                       WHERE id = ? AND next_fire_at IS NOT NULL AND next_fire_at <= ?""",
+                    (next_fire_time(schedule.cron_schedule, now, schedule.id), schedule.id, now))
+                if cursor.rowcount:
+                    claimed.append(schedule)
+        return claimed
+
+    def mark_fired(self, schedule_ids: Iterable[str], fired_at: Optional[float] = None):
+        """Records when the runs of ``schedule_ids`` started."""
+        fired_at = fired_at if fired_at is not None else time.time()
+        with self.connection:
+            self.connection.executemany("UPDATE schedules SET last_fire_at = ? WHERE id = ?",
+                                        [(fired_at, schedule_id) for schedule_id in schedule_ids])
+
+    def record_fire(self, schedule: Schedule, fired_at: Optional[float] = None):
+        """Records a run started elsewhere (by an APScheduler job) and moves the next fire time past it."""
+        fired_at = fired_at if fired_at is not None else time.time()
+        with self.connection:
+            self.connection.execute(
+                "UPDATE schedules SET last_fire_at = ?, next_fire_at = ? WHERE id = ?",
+                (fired_at, next_fire_time(schedule.cron_schedule, fired_at, schedule.id), schedule.id))
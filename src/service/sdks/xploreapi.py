@@ -3,11 +3,169 @@ import urllib.request, urllib.parse, urllib.error
 import xml.etree.ElementTree as ET
 import json
 import pathlib
+import threading
 import time
+from collections import deque
 import pycurl
 import certifi
 from io import BytesIO
 
+try:
+    import orjson
+    _loadJSON = orjson.loads
+except ImportError:
+    # json.loads does not accept memoryview, so the body is copied once
+    def _loadJSON(data):
+        return json.loads(bytes(data) if isinstance(data, memoryview) else data)
+
+
+class CurlResponse:
+
+    # Result of one transfer; the body stays in the transfer buffer
+    # (body is a memoryview over it) so decoders read it without copies
+    def __init__(self, buffer, status=0, error=None):
+
+        self.buffer = buffer
+        self.status = status
+        self.error = error
+
+
+    @property
+    def body(self):
+
+        return self.buffer.getbuffer()
+
+
+    # body decoded as text (needed for the raw output format)
+    # return string
+    def text(self):
+
+        return str(self.body, 'utf-8')
+
+
+class CurlPool:
+
+    # Shared transport for the SDK: easy handles are kept and reused, so their
+    # connections stay open, and a CurlShare lets every handle reuse the DNS
+    # cache, TLS sessions and connections of the others.
+    # int maxIdle          Easy handles kept for reuse
+    # int timeout          Seconds allowed for a whole transfer
+    # int connectTimeout   Seconds allowed to connect
+    def __init__(self, maxIdle=16, timeout=30, connectTimeout=10):
+
+        self.maxIdle = maxIdle
+        self.timeout = timeout
+        self.connectTimeout = connectTimeout
+        self.share = pycurl.CurlShare()
+        self.share.setopt(pycurl.SH_SHARE, pycurl.LOCK_DATA_DNS)
+        self.share.setopt(pycurl.SH_SHARE, pycurl.LOCK_DATA_SSL_SESSION)
+        if hasattr(pycurl, 'LOCK_DATA_CONNECT'):
+            self.share.setopt(pycurl.SH_SHARE, pycurl.LOCK_DATA_CONNECT)
+        self.idle = []
+        self.lock = threading.Lock()
+
+
+    # easy handle ready for a transfer into buffer
+    # return pycurl.Curl
+    def acquire(self, url, buffer, post=None):
+
+        with self.lock:
+            handle = self.idle.pop() if self.idle else None
+
+        if handle is None:
+            handle = pycurl.Curl()
+            handle.setopt(pycurl.SHARE, self.share)
+        else:
+            # reset() keeps the handle's open connections, caches and share
+            handle.reset()
+
+        handle.setopt(pycurl.CAINFO, certifi.where())
+        handle.setopt(pycurl.TIMEOUT, self.timeout)
+        handle.setopt(pycurl.CONNECTTIMEOUT, self.connectTimeout)
+        handle.setopt(pycurl.NOSIGNAL, 1)
+        handle.setopt(pycurl.URL, url)
+        handle.setopt(pycurl.WRITEDATA, buffer)
+        if post is not None:
+            handle.setopt(pycurl.POST, 1)
+            handle.setopt(pycurl.POSTFIELDS, post)
+        return handle
+
+
+    def release(self, handle):
+
+        with self.lock:
+            if len(self.idle) < self.maxIdle:
+                self.idle.append(handle)
+                return
+        handle.close()
+
+
+    # single blocking transfer
+    # string url    Full URL
+    # string post   URL-encoded POST body, or None for GET
+    # return CurlResponse
+    def perform(self, url, post=None):
+
+        buffer = BytesIO()
+        handle = self.acquire(url, buffer, post)
+        try:
+            handle.perform()
+            return CurlResponse(buffer, handle.getinfo(pycurl.RESPONSE_CODE))
+        except pycurl.error as e:
+            return CurlResponse(buffer, 0, str(e))
+        finally:
+            self.release(handle)
+
+
+    # runs many transfers concurrently on one multi handle and yields them as they complete
+    # iterable requests   (key, url, post) tuples; post is None for GET
+    # int maxConcurrent   Transfers in flight at the same time
+    # return generator of (key, CurlResponse)
+    def performMany(self, requests, maxConcurrent=16):
+
+        pending = deque(requests)
+        active = {}
+        multi = pycurl.CurlMulti()
+
+        try:
+            while pending or active:
+
+                while pending and len(active) < maxConcurrent:
+                    key, url, post = pending.popleft()
+                    buffer = BytesIO()
+                    handle = self.acquire(url, buffer, post)
+                    multi.add_handle(handle)
+                    active[handle] = (key, buffer)
+
+                while True:
+                    ret, running = multi.perform()
+                    if ret != pycurl.E_CALL_MULTI_PERFORM:
+                        break
+
+                finished = []
+                while True:
+                    queued, ok, failed = multi.info_read()
+                    finished.extend((handle, None) for handle in ok)
+                    finished.extend((handle, message) for handle, errno, message in failed)
+                    if queued == 0:
+                        break
+
+                for handle, error in finished:
+                    key, buffer = active.pop(handle)
+                    status = handle.getinfo(pycurl.RESPONSE_CODE)
+                    multi.remove_handle(handle)
+                    self.release(handle)
+                    yield key, CurlResponse(buffer, status, error)
+
+                if active and not finished:
+                    multi.select(1.0)
+        finally:
+            for handle in active:
+                multi.remove_handle(handle)
+                self.release(handle)
+            multi.close()
+
+
 class XPLORE:
  
     # default API endpoint (used for most queries)
@@ -25,6 +183,26 @@ class XPLORE:
     # request auth token
     authTokenEndPoint = "https://ieeexploreapi.ieee.org/api/v1/auth/token"
 
+    # transport shared by every instance, created on first use
+    pool = None
+    poolLock = threading.Lock()
+
+    # auth tokens shared by every instance: apiKey -> (token, expiresAt)
+    tokenCache = {}
+
+    # one lock per apiKey so only one caller requests a new token at a time
+    tokenLocks = {}
+    tokenLocksLock = threading.Lock()
+
+    # seconds an auth token is valid after it is issued
+    tokenLifetime = 600
+
+    # tokens are replaced this many seconds before they expire
+    tokenRefreshMargin = 60
+
+    # keep a copy of the token in <apiKey>_token.txt so it survives restarts
+    persistToken = True
+
     def __init__(self, apiKey):
 
     	# API key
@@ -33,6 +211,9 @@ class XPLORE:
         # auth token
         self.authToken = ''
 
+        # last full text / usage token used by this instance
+        self.tokenValue = None
+
     	# flag that some search criteria has been provided
         self.queryProvided = False
 
@@ -463,6 +644,12 @@ class XPLORE:
         tokenValid = True
         errorXML = '<ApiResponse><error>Token Expired</error></ApiResponse>'
         errorJSON = '{"error":"Token Expired"}'
+        if isinstance(response, CurlResponse):
+            response = response.body
+        if isinstance(response, (bytes, memoryview)):
+            # compare without decoding the whole body
+            errorXML = errorXML.encode('utf-8')
+            errorJSON = errorJSON.encode('utf-8')
         if response == errorXML or response == errorJSON: 
             tokenValid = False
 
@@ -507,7 +694,7 @@ class XPLORE:
             if self.queryProvided is False:
                 print("No search criteria provided")
         
-            data = self.queryAPI(apiQry)
+            data = self.queryAPIResponse(apiQry)
 
         # does API response indicate an expired token?
         if self.requestingFullText is True or self.requestingUsage is True:
@@ -520,7 +707,7 @@ class XPLORE:
                     apiQry = self.buildFullTextRequestQuery(True)
                 elif self.requestingUsage is True:
                    apiQry = self.buildUsageRequestQuery(True)
-                data = self.queryAPI(apiQry)
+                data = self.queryAPIResponse(apiQry)
             
             formattedData = self.formatData(data)
 
@@ -530,6 +717,48 @@ class XPLORE:
         return formattedData
 
 
+    # calls the API for many queries at once over the shared curl pool
+    # list queries        XPLORE instances (searches, citations, openAccess, ...)
+    # int maxConcurrent   Requests in flight at the same time
+    # return generator of (query, data, error) in completion order; data is formatted as in callAPI
+    @classmethod
+    def callMany(cls, queries, maxConcurrent=16):
+
+        queries = list(queries)
+        requests = []
+        for index, query in enumerate(queries):
+            if query.queryProvided is False:
+                print("No search criteria provided")
+            requests.append((index, query.callAPI(False), None))
+
+        for index, response in cls.curlPool().performMany(requests, maxConcurrent):
+
+            query = queries[index]
+
+            if response.error:
+                yield query, None, response.error
+                continue
+
+            # expired token: request a new one and repeat this query alone
+            if (query.requestingFullText is True or query.requestingUsage is True) and query.checkForTokenExpiration(response) is False:
+                yield query, query.callAPI(), None
+                continue
+
+            yield query, query.formatData(response), None
+
+
+    # shared curl pool, created on first use
+    # return CurlPool
+    @classmethod
+    def curlPool(cls):
+
+        if XPLORE.pool is None:
+            with XPLORE.poolLock:
+                if XPLORE.pool is None:
+                    XPLORE.pool = CurlPool()
+        return XPLORE.pool
+
+
     # creates the URL for the Open Access Document API call
     # return string: full URL for querying the API
     def buildOpenAccessQuery(self):
@@ -564,46 +793,90 @@ class XPLORE:
         # authentication token from user must be provided
         if not self.authToken:
             print("Authorization token not provided")
-        
-        else:
-            # file name for persistence
-            fileName = str(self.apiKey) + '_token.txt'
+            return None
+
+        cached = self.cachedAuthToken(refresh)
+        if cached is not None:
+            self.tokenValue = cached
+            return cached
 
-            # whether a new full text token needs to be requested
-            requestNewToken = False
+        # single flight: callers waiting on the lock reuse the token it produced
+        with self.authTokenLock():
 
-            # check for existing full text token
-            file = pathlib.Path(fileName)
+            cached = self.cachedAuthToken(refresh)
+            if cached is not None:
+                self.tokenValue = cached
+                return cached
 
-            # current time as timestamp
             currentTime = time.time()
+            data = self.getAuthTokenFromEndpoint()
+            obj = json.loads(data)
+            if 'token' not in obj:
+                print("Token cannot be retrieved")
+                return None
 
-            # no text file saved or cannot be accessed
-            if file.exists() is False:
-                requestNewToken = True
+            tokenValue = obj['token']
+            expiresAt = currentTime + self.tokenLifetime
+            XPLORE.tokenCache[self.apiKey] = (tokenValue, expiresAt)
+            if self.persistToken:
+                self.tokenFile().write_text(str(tokenValue) + '--////--' + str(expiresAt))
 
-            else:
-                storedValue = file.read_text()
-                storedValuesArr = storedValue.split('--////--')
-                tokenValue = storedValuesArr[0]
-                expiresAt = storedValuesArr[1]
-
-                if storedValue is False or not tokenValue or float(expiresAt) <= float(currentTime):
-                    requestNewToken = True
-
-            # request a new full text token
-            if requestNewToken is True or refresh is True:
-                data = self.getAuthTokenFromEndpoint()
-                obj = json.loads(data)
-                if 'token' not in obj:
-                    print("Token cannot be retrieved")
-                else:
-                    tokenValue = obj['token']
-                    expiresAt = currentTime + 600
-                    valueToSave = str(tokenValue) + '--////--' + str(expiresAt)
-                    file.write_text(valueToSave)
-        
-            return tokenValue
+        self.tokenValue = tokenValue
+        return tokenValue
+
+
+    # valid cached token, loading the file copy the first time
+    # boolean refresh   Whether the token this instance last used was rejected
+    # return string token, or None if a new one must be requested
+    def cachedAuthToken(self, refresh=False):
+
+        entry = XPLORE.tokenCache.get(self.apiKey)
+        if entry is None and self.persistToken:
+            entry = self.readTokenFile()
+            if entry is not None:
+                XPLORE.tokenCache.setdefault(self.apiKey, entry)
+
+        if entry is None:
+            return None
+
+        tokenValue, expiresAt = entry
+
+        # a forced refresh only discards the token that was rejected, not one
+        # another caller obtained in the meantime
+        if refresh is True and tokenValue == self.tokenValue:
+            return None
+
+        if expiresAt - self.tokenRefreshMargin <= time.time():
+            return None
+
+        return tokenValue
+
+
+    # lock serialising token requests for this apiKey
+    # return threading.Lock
+    def authTokenLock(self):
+
+        with XPLORE.tokenLocksLock:
+            return XPLORE.tokenLocks.setdefault(self.apiKey, threading.Lock())
+
+
+    # file keeping the token across restarts
+    # return pathlib.Path
+    def tokenFile(self):
+
+        return pathlib.Path(str(self.apiKey) + '_token.txt')
+
+
+    # token stored in the file copy
+    # return tuple (token, expiresAt), or None if missing or unreadable
+    def readTokenFile(self):
+
+        try:
+            storedValue = self.tokenFile().read_text()
+            tokenValue, expiresAt = storedValue.split('--////--')
+            return (tokenValue, float(expiresAt)) if tokenValue else None
+        except (OSError, ValueError):
+            return None
 
 
     # creates the URL for the non-Open Access Document API call
@@ -657,15 +930,18 @@ class XPLORE:
     # return string: Results from API
     def queryAPI(self, url):
 
-        buffer_obj = BytesIO()
-        qry_obj = pycurl.Curl()
-        qry_obj.setopt(qry_obj.URL, url)
-        qry_obj.setopt(qry_obj.WRITEDATA, buffer_obj)
-        qry_obj.setopt(qry_obj.CAINFO, certifi.where())
-        qry_obj.perform()
-        qry_obj.close()
-        response = buffer_obj.getvalue()
-        return response.decode('utf-8')
+        return self.queryAPIResponse(url).text()
+
+
+    # same as queryAPI, keeping the body undecoded for formatData
+    # string url  Full URL to pass to API
+    # return CurlResponse
+    def queryAPIResponse(self, url):
+
+        response = self.curlPool().perform(url)
+        if response.error:
+            raise pycurl.error(response.error)
+        return response
 
 
     # request chargeable full text token
@@ -676,17 +952,10 @@ class XPLORE:
         post = { 'auth-token': self.authToken, 'apikey': self.apiKey }
         post = urllib.parse.urlencode(post)
 
-        buffer_obj = BytesIO()
-        qry_obj = pycurl.Curl()
-        qry_obj.setopt(qry_obj.URL, url)
-        qry_obj.setopt(qry_obj.WRITEDATA, buffer_obj)
-        qry_obj.setopt(qry_obj.CAINFO, certifi.where())
-        qry_obj.setopt(qry_obj.POST, 1)
-        qry_obj.setopt(qry_obj.POSTFIELDS, post)
-        qry_obj.perform()
-        qry_obj.close()
-        response = buffer_obj.getvalue()
-        return response.decode('utf-8')
+        response = self.curlPool().perform(url, post)
+        if response.error:
+            raise pycurl.error(response.error)
+        return response.text()
 
 
     # creates the URL for the chargeable full text API call
@@ -737,21 +1006,25 @@ class XPLORE:
     
 
     # formats the data returned by the API
-    # string data    Result string from API
+    # string|CurlResponse data    Result from API; a CurlResponse body is decoded in place
     def formatData(self, data):
 
-        if self.outputDataFormat == 'raw':
-            return data
+        if self.outputDataFormat == 'object':
+
+            body = data.body if isinstance(data, CurlResponse) else data
 
-        elif self.outputDataFormat == 'object':
-            
             if self.outputType == 'xml':
-                obj = ET.ElementTree(ET.fromstring(data))
+                parser = ET.XMLParser()
+                parser.feed(body)
+                obj = ET.ElementTree(parser.close())
                 return obj
 
             else:
-                obj = json.loads(data) 
+                obj = _loadJSON(body)
                 return obj
 
+        elif isinstance(data, CurlResponse):
+            return data.text()
+
         else:
             return data
@@ -6,6 +6,7 @@ La clase ArxivAPI implementa la interfaz APIExtraction y proporciona los siguien
 - construct_query(queries, search_types, operators): construye una consulta a partir de una lista de términos de búsqueda, tipos de búsqueda y operadores.
 - search(queries, search_types, operators=None): realiza una búsqueda en arXiv a partir de una lista de términos de búsqueda, tipos de búsqueda y operadores.
 - search_multiple_terms(terms): realiza una búsqueda en arXiv a partir de una lista de términos de búsqueda, combinando los resultados.
+- search_batched(terms): igual que search_multiple_terms, agrupando los términos en consultas OR (ver service.query_batching).
 - is_valid_sort_value(value): verifica si un valor de ordenación es válido.
 
 Además, el módulo define las siguientes clases:
@@ -14,15 +15,15 @@ Además, el módulo define las siguientes clases:
 - APIErrorResponse(APIResponse): clase para las respuestas de error de la API.
 """
 
-from typing import List, Union
+from typing import List, Optional, Union
 import urllib.parse
-import urllib.request
-import feedparser
 from infrastructure.api_abstract import APIExtraction
 from models.api_model import APIResponse, APISuccessResponse, APIErrorResponse
-from models.paper_model import ArticleMetadata
+from models.response_api import ARXIV
+from service.http_client import HttpClient, get_http_client
+from service.query_batching import BatchedSearch, quote_term
 
-class ArxivAPI(APIExtraction):
+class ArxivAPI(BatchedSearch, APIExtraction):
     """
     Clase que representa una API para extraer información de artículos científicos de arXiv.
 
@@ -39,9 +40,14 @@ class ArxivAPI(APIExtraction):
     BASE_URL = ("http://export.arxiv.org/api/query?"
                 "search_query={}&sortBy=lastUpdatedDate&sortOrder=ascending&max_results={}")
     valid_search_types = ["ti", "au", "abs", "co", "jr", "cat", "rn", "id", "all"]
+    # Longitud máxima de search_query (ya codificada) en una consulta agrupada
+    MAX_QUERY_LENGTH = 1000
+    # Resultados máximos de una consulta agrupada
+    MAX_BATCH_RESULTS = 200
 
-    def __init__(self, max_results=10):
+    def __init__(self, max_results=10, http: Optional[HttpClient] = None):
         self.max_results = max_results
+        self.http = http or get_http_client()
 
     def is_valid_search_type(self, search_type):
         """_summary_
@@ -112,17 +118,8 @@ class ArxivAPI(APIExtraction):
         try:
             constructed_query = self.construct_query(queries, search_types, operators)
             url = self.BASE_URL.format(constructed_query, self.max_results)
-            response = urllib.request.urlopen(url)
-            feed = feedparser.parse(response.read().decode('utf-8'))
-            articles = []
-            for entry in feed.entries:
-                articles.append(ArticleMetadata(
-                            entry.title, 
-                            entry.summary, 
-                            entry.published, 
-                            entry.link
-                        ))
-            return APISuccessResponse(data=articles)
+            page = self.http.get_decoded(url, None, ARXIV)
+            return APISuccessResponse(data=page.articles)
         except Exception as e:
             return APIErrorResponse(error_message=str(e))
 
@@ -149,6 +146,15 @@ class ArxivAPI(APIExtraction):
             return APISuccessResponse(data=combined_articles)
         else:
             return APIErrorResponse(error_message="No results found for any term.")
+    def batch_query(self, terms: List[str]) -> str:
+        query = self.construct_query([quote_term(term) for term in terms], ["all"] * len(terms), ["OR"] * (len(terms) - 1))
+        return urllib.parse.quote(query, safe="+:")
+
+    def fetch_batch(self, terms: List[str]):
+        """Artículos de una consulta ``all:a+OR+all:b...``, con max_results resultados por término."""
+        url = self.BASE_URL.format(self.batch_query(terms), min(self.max_results * len(terms), self.MAX_BATCH_RESULTS))
+        return self.http.get_decoded(url, None, ARXIV).articles
+
     def is_valid_sort_value(self, value) -> bool:
         pass
 
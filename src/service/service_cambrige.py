@@ -1,8 +1,8 @@
-from typing import List, Union
-import requests
+from typing import List, Optional, Union
 
 from models.api_model import APIErrorResponse, APIResponse, APISuccessResponse
-from models.paper_model import ArticleMetadata
+from models.response_api import CAMBRIDGE
+from service.http_client import HttpClient, get_http_client
 
 class CambridgeAPI:
     """
@@ -27,14 +27,16 @@ class CambridgeAPI:
         "PUBLISHED_DATE_ASC", "PUBLISHED_DATE_DESC"
     ]
 
-    def __init__(self, max_results=10):
+    def __init__(self, max_results=10, http: Optional[HttpClient] = None):
         """
         Inicializa una nueva instancia de la clase CambridgeAPI.
 
         Args:
             max_results (int): El número máximo de resultados que se deben devolver por búsqueda.
+            http (HttpClient, optional): Transporte HTTP. Por defecto el compartido del proceso.
         """
         self.max_results = max_results
+        self.http = http or get_http_client()
 
     def is_valid_sort_value(self, value):
         """
@@ -96,21 +98,8 @@ class CambridgeAPI:
 
         params = {key: value for key, value in params.items() if value} 
         try:
-            response = requests.get(self.BASE_URL, params=params)
-            response_data = response.json()
-
-            # Creando una lista de objetos ArticleMetadata a partir de la respuesta
-            articles = [
-                ArticleMetadata(
-                    title=item["item"]["title"],
-                    summary=item["item"]["abstract"],
-                    published=item["item"]["publishedDate"],
-                    link=item["item"]["doi"]  # Asume que el DOI puede ser utilizado como enlace, modifica según sea necesario
-                )
-                for item in response_data["itemHits"]
-            ]
-
-            return APISuccessResponse(data=articles)
+            page = self.http.get_decoded(self.BASE_URL, params, CAMBRIDGE)
+            return APISuccessResponse(data=page.articles)
         except Exception as e:
             return APIErrorResponse(error_message=str(e))
     def search_multiple_terms(self, terms: List[str]) -> Union[APISuccessResponse, APIErrorResponse]:
@@ -1,13 +1,19 @@
-import requests
-from typing import List, Union
+from typing import List, Optional, Union
 import urllib.parse
 from infrastructure.api_abstract import APIExtraction
 
 from models.api_model import APIErrorResponse, APIResponse, APISuccessResponse
-from models.paper_model import ArticleMetadata
+from models.response_api import XPLORE
+from service.http_client import HttpClient, get_http_client
+from service.query_batching import BatchedSearch, quote_term
 
-class XploreAPI(APIExtraction):
+class XploreAPI(BatchedSearch, APIExtraction):
     BASE_URL = "https://ieeexploreapi.ieee.org/api/v1/search/articles?"
+    # Límites de una consulta agrupada: querytext codificado, términos por consulta booleana
+    # y registros por término (el max_records por defecto de la API)
+    MAX_QUERY_LENGTH = 1000
+    MAX_BATCH_TERMS = 10
+    RECORDS_PER_TERM = 25
     VALID_PARAMETERS = [
         "abstract", "affiliation", "article_number", "article_title", "author",
         "d-au", "doi", "d-publisher", "d-pubtype", "d-year", "end_date",
@@ -35,8 +41,9 @@ class XploreAPI(APIExtraction):
         "sort_order": ["asc", "desc"],
         "start_record": None  # To be validated for number
     }
-    def __init__(self, api_access_key: str):
+    def __init__(self, api_access_key: str, http: Optional[HttpClient] = None):
         self.api_access_key = api_access_key
+        self.http = http or get_http_client()
     def _validate_parameters(self, params: dict) -> bool:
         if "article_number" in params and len(params) > 1:
             return False
@@ -65,23 +72,8 @@ class XploreAPI(APIExtraction):
     def search(self, queries, search_types, operators=None)->APIResponse:
         try:
             constructed_query = self.construct_query(queries, search_types, operators)
-            response = requests.get(constructed_query)
-            response = response.json()
-            articles = []
-            for item in response["articles"]:
-                try:
-                    article = ArticleMetadata(
-                        title=item["title"],
-                        summary=item["abstract"],
-                        published=item["publication_date"],
-                        link=item["html_url"]  # Asume que el DOI puede ser utilizado como enlace, modifica según sea necesario
-                    )
-                    articles.append(article)
-                except Exception as e:
-                    print(f"Error mapping article: {str(e)}")
-                    
-
-            return APISuccessResponse(data=articles)
+            page = self.http.get_decoded(constructed_query, None, XPLORE)
+            return APISuccessResponse(data=page.articles)
         except Exception as e:
             return APIErrorResponse(error_message=str(e))
     
@@ -115,6 +107,14 @@ class XploreAPI(APIExtraction):
         
         parameters = {"querytext": boolean_query}
         return self.construct_query(parameters, filters, sorting_paging)
+    def batch_query(self, terms: List[str]) -> str:
+        return urllib.parse.quote("(" + " OR ".join(quote_term(term) for term in terms) + ")")
+
+    def fetch_batch(self, terms: List[str]):
+        max_records = min(self.RECORDS_PER_TERM * len(terms), self.VALID_SORTING_PAGING["max_records"][1])
+        constructed_query = self.construct_query({"querytext": self.batch_query(terms)}, None, {"max_records": max_records})
+        return self.http.get_decoded(constructed_query, None, XPLORE).articles
+
     def construct_query(self, parameters: dict, filters: dict = None, sorting_paging: dict = None) -> str:
         if not self._validate_parameters(parameters):
             raise ValueError("Invalid combination of parameters.")
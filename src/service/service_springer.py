@@ -1,109 +1,176 @@
-import requests
+import asyncio
+import urllib.parse
+from typing import List, Optional, Tuple, Union
 
-class SpringerAPI:
+from infrastructure.api_abstract import APIExtraction
+from models.api_model import APIErrorResponse, APIResponse, APISuccessResponse
+from models.paper_model import ArticleMetadata
+from models.response_api import SPRINGER
+from service.http_client import HttpClient, get_http_client
+from service.query_batching import BatchedSearch
+
+
+class SpringerAPI(BatchedSearch, APIExtraction):
     """
     Clase que proporciona una interfaz para buscar artículos en Springer API.
-    
+
     Atributos:
         BASE_URL (str): URL base para la API de Springer.
-        
+        MAX_PAGE_SIZE (int): Registros máximos por página (parámetro ``p``).
+
     Métodos:
         construct_query(): Construye una consulta basada en parámetros específicos.
         search(): Realiza una búsqueda en Springer API y devuelve los resultados.
+        search_async(): Igual que search(), en hilos para no bloquear el bucle de eventos.
         search_multiple_terms(): Realiza búsquedas múltiples en Springer API y agrega todos los resultados en una lista.
+        search_multiple_terms_async(): Igual que search_multiple_terms(), con todos los términos en paralelo.
+        search_batched(): Igual que search_multiple_terms(), agrupando los términos en consultas OR.
     """
 
-    BASE_URL = "http://api.springernature.com/metadata/json"
+    BASE_URL = "https://api.springernature.com/metadata/json"
+    MAX_PAGE_SIZE = 50
+    # Longitud máxima del parámetro q (codificado) en una consulta agrupada
+    MAX_QUERY_LENGTH = 1000
+    valid_search_types = ["all", "title", "orgname", "journal", "book", "name", "keyword", "subject", "doi", "year"]
 
-    def __init__(self, api_key, default_results=10):
+    def __init__(self, api_access_key, max_results=10, page_size=MAX_PAGE_SIZE, http: Optional[HttpClient] = None):
         """
         Inicializa una nueva instancia de la clase SpringerAPI.
-        
+
         Args:
-            api_key (str): La clave de API para Springer.
-            default_results (int): El número predeterminado de resultados que se deben devolver por búsqueda.
+            api_access_key (str): La clave de API para Springer.
+            max_results (int): El número máximo de resultados que se deben devolver por búsqueda.
+            page_size (int): Registros pedidos por página; se pagina con ``s`` hasta llegar a max_results.
+            http (HttpClient, optional): Transporte HTTP. Por defecto el compartido del proceso.
         """
-        self.api_key = api_key
-        self.default_results = default_results
+        self.api_access_key = api_access_key
+        self.max_results = max_results
+        self.page_size = max(1, min(page_size, self.MAX_PAGE_SIZE))
+        self.http = http or get_http_client()
 
-    def construct_query(self, term=None, title=None, orgname=None, journal=None, book=None, name=None):
+    def is_valid_search_type(self, search_type) -> bool:
+        return search_type in self.valid_search_types
+
+    def is_valid_sort_value(self, value) -> bool:
+        # La API de metadatos no admite ordenación
+        return False
+
+    def construct_query(self, queries, search_types, operators=None) -> str:
         """
         Construye una consulta basada en parámetros específicos.
 
         Args:
-            term (str): Término general para buscar.
-            title (str): Título del artículo o capítulo.
-            orgname (str): Nombre de la organización.
-            journal (str): Título del journal.
-            book (str): Título del libro.
-            name (str): Nombre del autor.
+            queries (List[str]): Términos a buscar.
+            search_types (List[str]): Campo de cada término ("all" busca en todos los campos).
+            operators (List[str], optional): Operadores entre términos. Por defecto "AND".
 
         Returns:
             str: Una consulta construida para la API.
         """
-        query_parts = []
-        
-        if term:
-            query_parts.append(f'"{term}"')
-        if title:
-            query_parts.append(f'title:"{title}"')
-        if orgname:
-            query_parts.append(f'orgname:"{orgname}"')
-        if journal:
-            query_parts.append(f'journal:"{journal}"')
-        if book:
-            query_parts.append(f'book:"{book}"')
-        if name:
-            query_parts.append(f'name:"{name}"')
-
-        return ' AND '.join(query_parts)
-
-    def search(self, **kwargs):
+        if not all(self.is_valid_search_type(st) for st in search_types):
+            raise ValueError("Invalid search type provided.")
+        if operators is None:
+            operators = ["AND"] * (len(queries) - 1)
+        parts = []
+        for i, (query, search_type) in enumerate(zip(queries, search_types)):
+            parts.append(f'"{query}"' if search_type == "all" else f'{search_type}:"{query}"')
+            if i < len(queries) - 1:
+                parts.append(operators[i])
+        return " ".join(parts)
+
+    def _page_params(self, query: str, start: int, size: int) -> dict:
+        # 's' es la posición (desde 1) del primer registro y 'p' el tamaño de la página
+        return {"q": query, "api_key": self.api_access_key, "s": start, "p": size}
+
+    def _pages(self, total: int) -> List[Tuple[int, int]]:
+        """Páginas (s, p) que faltan tras la primera, sin pasar de max_results ni del total disponible."""
+        wanted = min(total, self.max_results)
+        return [(start, min(self.page_size, wanted - start + 1))
+                for start in range(self.page_size + 1, wanted + 1, self.page_size)]
+
+    def batch_query(self, terms: List[str]) -> str:
+        return urllib.parse.quote(self.construct_query(terms, ["all"] * len(terms), ["OR"] * (len(terms) - 1)))
+
+    def fetch_batch(self, terms: List[str]) -> List[ArticleMetadata]:
+        """Una sola página con hasta max_results registros por término."""
+        query = self.construct_query(terms, ["all"] * len(terms), ["OR"] * (len(terms) - 1))
+        return self._fetch_page(query, 1, min(self.max_results * len(terms), self.MAX_PAGE_SIZE))[0]
+
+    def _fetch_page(self, query: str, start: int, size: int) -> Tuple[List[ArticleMetadata], int]:
+        page = self.http.get_decoded(self.BASE_URL, self._page_params(query, start, size), SPRINGER)
+        return page.articles, page.total or 0
+
+    def search(self, queries, search_types, operators=None) -> APIResponse:
         """
-        Realiza una búsqueda en Springer API y devuelve los resultados.
-
-        Args:
-            **kwargs: Argumentos variables que se pasarán al constructor de consultas.
+        Realiza una búsqueda en Springer API y devuelve los resultados, página a página.
 
         Returns:
-            list: Una lista de diccionarios que representan los artículos que coinciden con la consulta.
+            APIResponse: Respuesta con los artículos (ArticleMetadata) encontrados.
         """
-        query = self.construct_query(**kwargs)
-
-        params = {
-            "q": query,
-            "api_key": self.api_key,
-            "p": self.default_results
-        }
-
-        response = requests.get(self.BASE_URL, params=params)
-        return response.json().get('records', [])
-
-    def search_multiple_terms(self, terms, **kwargs):
+        try:
+            query = self.construct_query(queries, search_types, operators)
+            articles, total = self._fetch_page(query, 1, min(self.page_size, self.max_results))
+            for start, size in self._pages(total):
+                articles.extend(self._fetch_page(query, start, size)[0])
+            return APISuccessResponse(data=articles)
+        except Exception as e:
+            return APIErrorResponse(error_message=str(e))
+
+    async def search_async(self, queries, search_types, operators=None) -> APIResponse:
+        """
+        Igual que ``search``, pero sin bloquear el bucle de eventos: las peticiones
+        (síncronas, por el ``HttpClient`` compartido y su caché) se hacen en hilos.
+        La primera página indica el total y las restantes, que solo existen si
+        max_results supera page_size, se piden todas a la vez.
+        """
+        try:
+            query = self.construct_query(queries, search_types, operators)
+            articles, total = await asyncio.to_thread(
+                self._fetch_page, query, 1, min(self.page_size, self.max_results))
+            pages = await asyncio.gather(*(asyncio.to_thread(self._fetch_page, query, start, size)
+                                           for start, size in self._pages(total)))
+            for page_articles, _ in pages:
+                articles.extend(page_articles)
+            return APISuccessResponse(data=articles)
+        except Exception as e:
+            return APIErrorResponse(error_message=str(e))
+
+    def search_multiple_terms(self, terms) -> Union[APISuccessResponse, APIErrorResponse]:
         """
         Realiza búsquedas múltiples en Springer API y agrega todos los resultados en una lista.
 
         Args:
             terms (list): Lista de términos a buscar.
-            **kwargs: Argumentos variables que se pasarán al constructor de consultas.
 
         Returns:
-            list: Una lista de diccionarios que representan los artículos que coinciden con las consultas.
+            APIResponse: Todos los artículos encontrados, o un error si ningún término dio resultados.
         """
-        all_results = []
+        return self._combine([self.search([term], ["all"]) for term in terms])
 
-        for term in terms:
-            term_results = self.search(term=term, **kwargs)
-            all_results.extend(term_results)
+    async def search_multiple_terms_async(self, terms) -> Union[APISuccessResponse, APIErrorResponse]:
+        responses = await asyncio.gather(*(self.search_async([term], ["all"]) for term in terms))
+        return self._combine(responses)
+
+    @staticmethod
+    def _combine(responses: List[APIResponse]) -> Union[APISuccessResponse, APIErrorResponse]:
+        all_results = []
+        for response in responses:
+            if isinstance(response, APISuccessResponse):
+                all_results.extend(response.data)
+        if all_results:
+            return APISuccessResponse(data=all_results)
+        return APIErrorResponse(error_message="No results found for any term.")
 
-        return all_results
 
 if __name__ == "__main__":
     YOUR_API_KEY = "yourKeyHere"
-    api = SpringerAPI(api_key=YOUR_API_KEY, default_results=10)
-    
+    api = SpringerAPI(api_access_key=YOUR_API_KEY, max_results=20)
+
     # Ejemplo de búsqueda utilizando el nombre del autor y el título del artículo:
-    search_results = api.search(name="Salvador", title="Quantum Computing")
-    
-    for paper in search_results:
-        print(paper)
+    search_results = api.search(["Salvador", "Quantum Computing"], ["name", "title"])
+
+    if isinstance(search_results, APISuccessResponse):
+        for paper in search_results.data:
+            print(paper)
+    else:
+        print(f"Error: {search_results.error_message}")
@@ -0,0 +1,144 @@
+import asyncio
+import time
+from datetime import datetime, timezone
+
+import pytest
+
+from models.paper_model import ArticleMetadata
+from service.delivery_queue import DeliveryQueue, DeliveryWorker
+
+
+
+def article(link: str, published="2023-06-05") -> ArticleMetadata:
+    return ArticleMetadata(f"Paper {link}", "summary", published, link, ["ml"])
+
+
+class FakeBot:
+    def __init__(self, failures: int = 0):
+        self.failures = failures
+        self.sent = []
+
+    async def deliver(self, articles, channel):
+        if self.failures:
+            self.failures -= 1
+            raise ConnectionError("send failed")
+        self.sent.append((channel, [a.link for a in articles]))
+
+
+@pytest.fixture
+def queue():
+    queue = DeliveryQueue(":memory:", lease_seconds=300)
+    yield queue
+    queue.close()
+
+
+def make_due(queue: DeliveryQueue):
+    with queue.connection:
+        queue.connection.execute("UPDATE deliveries SET next_attempt_at = 0")
+
+
+def test_claim_leases_deliveries_until_the_lease_expires(queue):
+    queue.enqueue("discord", "papers", [article("a")])
+    now = time.time()
+
+    assert [d.attempts for d in queue.claim(10, now=now)] == [1]
+    assert queue.claim(10, now=now + 299) == []
+    # El proceso murió sin completarla: vuelve a estar disponible
+    assert [d.attempts for d in queue.claim(10, now=now + 301)] == [2]
+
+
+def test_claim_skips_channels_in_flight(queue):
+    queue.enqueue("discord", "busy", [article("a")])
+    queue.enqueue("discord", "free", [article("b")])
+
+    claimed = queue.claim(10, exclude=[("discord", "busy")])
+
+    assert [d.channel for d in claimed] == ["free"]
+
+
+def test_articles_keep_their_exact_date_through_the_queue(queue):
+    original = article("a")
+    original.published = datetime(2023, 6, 5, 14, 30, tzinfo=timezone.utc)
+    queue.enqueue("discord", "papers", [original])
+
+    restored = queue.claim(10)[0].articles[0]
+
+    assert restored.published == original.published
+    assert restored.to_dict() == original.to_dict()
+
+
+def test_due_deliveries_of_a_channel_are_merged_without_repeats(queue):
+    queue.enqueue("discord", "papers", [article("a"), article("b")])
+    queue.enqueue("discord", "papers", [article("b"), article("c")])
+    bot = FakeBot()
+    worker = DeliveryWorker(queue, lambda app: bot, global_rate=1000, channel_rate=1000)
+
+    asyncio.run(worker.drain(timeout=5))
+
+    assert bot.sent == [("papers", ["a", "b", "c"])]
+    assert worker.stats["sent"] == 1 and worker.stats["digests"] == 2
+    assert queue.pending_count() == 0
+
+
+def test_failed_send_is_retried_with_backoff(queue):
+    queue.enqueue("discord", "papers", [article("a")])
+    bot = FakeBot(failures=1)
+    worker = DeliveryWorker(queue, lambda app: bot, global_rate=1000, channel_rate=1000,
+                            retry_delay=5, max_retry_delay=300)
+
+    before = time.time()
+    asyncio.run(worker.drain(timeout=5))
+
+    assert bot.sent == [] and worker.stats["retried"] == 1
+    (next_attempt_at, last_error), = queue.connection.execute(
+        "SELECT next_attempt_at, last_error FROM deliveries").fetchall()
+    assert last_error == "send failed"
+    assert next_attempt_at >= before + 5
+
+    make_due(queue)
+    asyncio.run(worker.drain(timeout=5))
+    assert bot.sent == [("papers", ["a"])]
+    assert queue.pending_count() == 0
+
+
+def test_retry_delay_doubles_up_to_the_maximum(queue):
+    queue.enqueue("discord", "papers", [article("a")])
+    worker = DeliveryWorker(queue, lambda app: FakeBot(failures=10), global_rate=1000, channel_rate=1000,
+                            max_attempts=10, retry_delay=5, max_retry_delay=12)
+    delays = []
+    for _ in range(3):
+        make_due(queue)
+        before = time.time()
+        asyncio.run(worker.drain(timeout=5))
+        next_attempt_at, = queue.connection.execute("SELECT next_attempt_at FROM deliveries").fetchone()
+        delays.append(round(next_attempt_at - before))
+
+    assert delays == [5, 10, 12]
+
+
+def test_delivery_becomes_a_dead_letter_after_max_attempts(queue):
+    queue.enqueue("discord", "papers", [article("a")])
+    worker = DeliveryWorker(queue, lambda app: FakeBot(failures=10), global_rate=1000, channel_rate=1000,
+                            max_attempts=2, retry_delay=0)
+
+    for _ in range(3):
+        make_due(queue)
+        asyncio.run(worker.drain(timeout=5))
+
+    assert queue.pending_count() == 0
+    assert queue.dead_count() == 1
+    assert worker.stats["retried"] == 1 and worker.stats["dead"] == 1
+
+
+def test_run_forever_returns_once_finished_and_empty(queue):
+    queue.enqueue("discord", "papers", [article("a")])
+    bot = FakeBot()
+    worker = DeliveryWorker(queue, lambda app: bot, global_rate=1000, channel_rate=1000, poll_interval=0.01)
+
+    async def run():
+        finished = asyncio.Event()
+        finished.set()
+        await asyncio.wait_for(worker.run_forever(finished), 5)
+    asyncio.run(run())
+
+    assert bot.sent == [("papers", ["a"])]
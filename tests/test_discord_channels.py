@@ -0,0 +1,55 @@
+from types import SimpleNamespace
+
+from chats.discord_channels import ChannelIndex
+
+LAB = SimpleNamespace(id=1, name="lab")
+HOME = SimpleNamespace(id=2, name="home")
+
+
+def channel(id: int, name: str, guild=LAB):
+    return SimpleNamespace(id=id, name=name, guild=guild)
+
+
+def test_channels_are_found_by_id_qualified_name_and_name():
+    papers = channel(10, "papers")
+    index = ChannelIndex()
+    index.rebuild([papers, channel(11, "general")])
+
+    assert index.get(10) is papers
+    assert index.get("10") is papers
+    assert index.get("lab/papers") is papers
+    assert index.get("papers") is papers
+    assert index.get("missing") is None
+
+
+def test_a_name_in_several_guilds_uses_the_lowest_id_unless_qualified():
+    first, second = channel(20, "papers", HOME), channel(10, "papers", LAB)
+    index = ChannelIndex()
+    index.rebuild([first, second])
+
+    assert index.get("papers") is second
+    assert index.get("home/papers") is first
+
+
+def test_renamed_channel_is_found_only_by_its_new_name():
+    before, after = channel(10, "papers"), channel(10, "research")
+    index = ChannelIndex()
+    index.add(before)
+
+    index.update(before, after)
+
+    assert index.get("papers") is None and index.get("lab/papers") is None
+    assert index.get("research") is after and index.get(10) is after
+    assert len(index) == 1
+
+
+def test_deleted_channels_and_left_guilds_are_forgotten():
+    papers, news, other = channel(10, "papers"), channel(11, "news"), channel(20, "papers", HOME)
+    index = ChannelIndex()
+    index.rebuild([papers, news, other])
+
+    index.remove(news)
+    assert index.get("news") is None
+    index.remove_guild(LAB)
+    assert index.get("papers") is other
+    assert len(index) == 1
@@ -0,0 +1,51 @@
+from chats.discord_digest import (EMBED_DESCRIPTION_LIMIT, EMBED_TOTAL_LIMIT, EMBEDS_PER_MESSAGE, MESSAGE_LIMIT,
+                                  article_line, pack_embeds, pack_text)
+from models.paper_model import ArticleMetadata
+
+
+def article(n: int, title_size: int = 40) -> ArticleMetadata:
+    return ArticleMetadata(f"{n} " + "x" * title_size, "", "2023-06-05", f"https://example.org/{n}")
+
+
+def embed_size(embed: dict) -> int:
+    return len(embed.get("title", "")) + len(embed["description"])
+
+
+def test_a_short_digest_is_one_embed_with_the_title():
+    messages = pack_embeds([article(1), article(2)], title="2 new papers")
+
+    assert len(messages) == 1 and len(messages[0]) == 1
+    embed = messages[0][0]
+    assert embed["title"] == "2 new papers"
+    assert embed["description"] == "\n".join([article_line(article(1)), article_line(article(2))])
+
+
+def test_large_digests_stay_within_every_discord_limit_and_keep_all_articles():
+    articles = [article(n, title_size=200) for n in range(300)]
+
+    messages = pack_embeds(articles)
+
+    lines = [line for embeds in messages for embed in embeds for line in embed["description"].split("\n")]
+    assert lines == [article_line(a) for a in articles]
+    for embeds in messages:
+        assert len(embeds) <= EMBEDS_PER_MESSAGE
+        assert sum(embed_size(embed) for embed in embeds) <= EMBED_TOTAL_LIMIT
+        assert all(len(embed["description"]) <= EMBED_DESCRIPTION_LIMIT for embed in embeds)
+    # Solo el primer embed lleva título
+    titles = [embed.get("title") for embeds in messages for embed in embeds]
+    assert titles[0] == "New papers" and not any(titles[1:])
+
+
+def test_links_with_markdown_characters_are_encoded():
+    line = article_line(ArticleMetadata("T", "", "2023-06-05", "https://doi.org/10.1002/(SICI)1097"))
+
+    assert line.endswith("(https://doi.org/10.1002/%28SICI%291097)")
+
+
+def test_pack_text_splits_on_lines_at_the_message_limit():
+    lines = ["x" * 900] * 5
+
+    messages = pack_text(lines)
+
+    assert [len(message) for message in messages] == [1801, 1801, 900]
+    assert all(len(message) <= MESSAGE_LIMIT for message in messages)
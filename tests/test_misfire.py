@@ -0,0 +1,68 @@
+import pytest
+
+from models.paper_model import Schedule
+from service.misfire import CatchUpPolicy, missed_fire_times
+from service.schedule_store import next_fire_time
+
+NOW = 1_700_000_000.0
+HOURLY = "0 * * * *"
+
+
+def schedule(id: str, cron: str = HOURLY) -> Schedule:
+    return Schedule("papers", "discord", cron, ["ml"], id=id)
+
+
+def hours_ago(schedule: Schedule, hours: int) -> float:
+    """Primer disparo perdido de ``schedule`` hace unas ``hours`` horas."""
+    return next_fire_time(schedule.cron_schedule, NOW - hours * 3600 - 1, schedule.id)
+
+
+def test_missed_fire_times_lists_each_fire_up_to_the_limit():
+    a = schedule("a")
+    missed = missed_fire_times(HOURLY, hours_ago(a, 5), NOW, limit=10, schedule_id="a")
+
+    assert len(missed) == 5
+    assert all(later - earlier == 3600 for earlier, later in zip(missed, missed[1:]))
+    assert len(missed_fire_times(HOURLY, hours_ago(a, 5), NOW, limit=2, schedule_id="a")) == 2
+
+
+@pytest.mark.parametrize("mode, runs", [("skip", 0), ("coalesce", 1), ("all", 3)])
+def test_modes_decide_how_many_fires_are_caught_up(mode, runs):
+    a = schedule("a")
+
+    assert len(CatchUpPolicy(mode=mode).runs(a, hours_ago(a, 3), NOW)) == runs
+
+
+def test_all_mode_stops_at_max_runs():
+    a = schedule("a")
+
+    assert len(CatchUpPolicy(mode="all", max_runs=2).runs(a, hours_ago(a, 5), NOW)) == 2
+
+
+def test_plan_interleaves_schedules_over_the_spread():
+    a, b = schedule("a"), schedule("b")
+    policy = CatchUpPolicy(mode="all", spread=300)
+
+    plan = policy.plan([(a, hours_ago(a, 2)), (b, hours_ago(b, 1))], NOW)
+
+    assert [s.id for _, s in plan] == ["a", "b", "a"]
+    assert [delay for delay, _ in plan] == [0, 100, 200]
+
+
+def test_plan_is_empty_when_skipping():
+    a = schedule("a")
+
+    assert CatchUpPolicy(mode="skip").plan([(a, hours_ago(a, 3))], NOW) == []
+
+
+def test_only_fires_later_than_the_grace_are_overdue():
+    policy = CatchUpPolicy(grace=60)
+
+    assert policy.is_overdue(NOW - 61, NOW)
+    assert not policy.is_overdue(NOW - 59, NOW)
+    assert not policy.is_overdue(None, NOW)
+
+
+def test_unknown_mode_is_rejected():
+    with pytest.raises(ValueError):
+        CatchUpPolicy(mode="sometimes")
@@ -0,0 +1,101 @@
+import asyncio
+
+from models.api_model import APIErrorResponse, APISuccessResponse
+from models.paper_model import ArticleMetadata
+from service.query_batching import BatchedSearch, attribute_keywords, pack_terms, quote_term
+
+
+def render(terms):
+    return " OR ".join(quote_term(term) for term in terms)
+
+
+def article(title: str, summary: str = "") -> ArticleMetadata:
+    return ArticleMetadata(title, summary, "2023-06-05", f"https://example.org/{title}")
+
+
+class FakeProvider(BatchedSearch):
+    MAX_QUERY_LENGTH = 20
+
+    def __init__(self, results, failing=()):
+        self.results = results
+        self.failing = set(failing)
+        self.queries = []
+
+    def batch_query(self, terms):
+        return render(terms)
+
+    def fetch_batch(self, terms):
+        self.queries.append(list(terms))
+        if self.failing & set(terms):
+            raise ConnectionError(f"failed: {terms}")
+        return [article(title) for title in self.results if any(t in title.lower() for t in terms)]
+
+
+def test_pack_terms_fills_each_query_up_to_the_length_limit():
+    assert pack_terms(["aa", "bb", "cc", "dd"], render, max_length=8) == [["aa", "bb"], ["cc", "dd"]]
+
+
+def test_pack_terms_respects_the_term_limit_and_drops_repeats():
+    assert pack_terms(["a", "b", "a", "c"], render, max_length=1000, max_terms=2) == [["a", "b"], ["c"]]
+
+
+def test_a_term_longer_than_the_limit_goes_alone():
+    assert pack_terms(["a", "very long term", "b"], render, max_length=8) == [["a"], ["very long term"], ["b"]]
+
+
+def test_quoted_phrases_count_towards_the_length():
+    assert pack_terms(["deep learning", "ml"], render, max_length=20) == [["deep learning"], ["ml"]]
+
+
+def test_articles_get_the_keywords_in_their_title_or_summary():
+    articles = attribute_keywords([article("Deep Learning for graphs"), article("Other", "about robotics")],
+                                  ["deep learning", "graph", "robot"])
+
+    assert [a.keywords for a in articles] == [["deep learning", "graph"], ["robot"]]
+
+
+def test_every_word_of_a_phrase_must_start_a_word_of_the_text():
+    articles = attribute_keywords([article("Learning deeply"), article("Undeep learning")],
+                                  ["deep learning"], fallback=False)
+
+    assert [a.title for a in articles] == ["Learning deeply"]
+
+
+def test_unmatched_article_gets_the_whole_batch_with_fallback():
+    articles = attribute_keywords([article("Unrelated")], ["ml", "ai"])
+
+    assert [a.keywords for a in articles] == [["ml", "ai"]]
+
+
+def test_unmatched_article_is_dropped_without_fallback():
+    articles = attribute_keywords([article("ML paper"), article("Unrelated")], ["ml", "ai"], fallback=False)
+
+    assert [(a.title, a.keywords) for a in articles] == [("ML paper", ["ml"])]
+
+
+def test_search_batched_sends_one_request_per_batch():
+    provider = FakeProvider(["ml one", "ai two", "robots three"])
+
+    response = provider.search_batched(["ml", "ai", "robots", "quantum"])
+
+    assert provider.queries == [["ml", "ai", "robots"], ["quantum"]]
+    assert isinstance(response, APISuccessResponse)
+    assert [(a.title, a.keywords) for a in response.data] == [
+        ("ml one", ["ml"]), ("ai two", ["ai"]), ("robots three", ["robots"])]
+
+
+def test_failed_batches_are_reported_only_without_any_articles():
+    provider = FakeProvider(["ml one"], failing=["quantum"])
+
+    assert isinstance(provider.search_batched(["ml", "ai", "robots", "quantum"]), APISuccessResponse)
+    response = provider.search_batched(["quantum"])
+    assert isinstance(response, APIErrorResponse)
+    assert "quantum" in response.error_message
+
+
+def test_async_search_matches_the_sync_one():
+    provider = FakeProvider(["ml one", "ai two"])
+
+    response = asyncio.run(provider.search_batched_async(["ml", "ai"]))
+
+    assert [(a.title, a.keywords) for a in response.data] == [("ml one", ["ml"]), ("ai two", ["ai"])]
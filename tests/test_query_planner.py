@@ -0,0 +1,78 @@
+import asyncio
+
+from models.paper_model import ArticleMetadata
+from service.api_consumer import ResearchPaperSearcher
+from service.query_batching import BatchedSearch
+from service.query_planner import QueryPlanner
+
+
+def article(title: str, day: int = 5) -> ArticleMetadata:
+    return ArticleMetadata(title, "", f"2023-06-{day:02d}", f"https://example.org/{title}")
+
+
+class OrProvider(BatchedSearch):
+    """Devuelve, para cualquier grupo, todos sus artículos: también los que no nombran ninguna palabra."""
+
+    def __init__(self, titles):
+        self.titles = titles
+        self.batches_fetched = []
+
+    def batch_query(self, terms):
+        return " OR ".join(terms)
+
+    def fetch_batch(self, terms):
+        self.batches_fetched.append(list(terms))
+        return [article(title, day) for day, title in enumerate(self.titles, start=1)]
+
+
+class FakeSearcher(ResearchPaperSearcher):
+    def __init__(self, api):
+        super().__init__({}, providers=["fake"], batch_queries=True)
+        self.api = api
+
+    def create_api(self, service_name):
+        return self.api
+
+
+def run_plan(searcher, *keyword_lists):
+    async def run():
+        planner = QueryPlanner(searcher, window=10)
+        futures = [planner.submit(keywords) for keywords in keyword_lists]
+        planner.flush()
+        return await asyncio.gather(*futures)
+    return asyncio.run(run())
+
+
+def test_each_schedule_gets_only_its_own_keywords():
+    api = OrProvider(["ml and ai survey", "ml tricks", "ai agents"])
+
+    ml, ai = run_plan(FakeSearcher(api), ["ml"], ["ai"])
+
+    assert api.batches_fetched == [["ml", "ai"]]
+    assert {a.title: a.keywords for a in ml} == {"ml and ai survey": ["ml"], "ml tricks": ["ml"]}
+    assert {a.title: a.keywords for a in ai} == {"ml and ai survey": ["ai"], "ai agents": ["ai"]}
+
+
+def test_unmatched_articles_of_a_shared_batch_reach_no_schedule():
+    api = OrProvider(["ml tricks", "matched only in the full text"])
+
+    ml, ai = run_plan(FakeSearcher(api), ["ml"], ["ai"])
+
+    assert [a.title for a in ml] == ["ml tricks"]
+    assert ai == []
+
+
+def test_schedules_do_not_share_article_objects():
+    api = OrProvider(["ml and ai survey"])
+
+    ml, both = run_plan(FakeSearcher(api), ["ml"], ["ml", "ai"])
+
+    assert ml[0] is not both[0]
+    assert ml[0].keywords == ["ml"]
+    assert both[0].keywords == ["ml", "ai"]
+
+
+def test_repeated_keywords_are_searched_once():
+    assert QueryPlanner.plan([(["ml", "ai"], ["arxiv", "springer"], None),
+                              (["ai", "robots"], ["arxiv"], None)]) == {
+        "arxiv": ["ml", "ai", "robots"], "springer": ["ml", "ai"]}
@@ -0,0 +1,88 @@
+import json
+import os
+from datetime import datetime, timezone
+
+import pytest
+
+from models.response_api import ARXIV, CAMBRIDGE, SPRINGER, XPLORE, Field, path
+
+FIXTURES = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks", "fixtures")
+
+
+def fixture(name: str) -> bytes:
+    with open(os.path.join(FIXTURES, name), "rb") as file:
+        return file.read()
+
+
+@pytest.mark.parametrize("schema, name, total", [
+    (ARXIV, "arxiv_atom.xml", 48213),
+    (CAMBRIDGE, "cambridge_items.json", 1342),
+    (XPLORE, "xplore_articles.json", 5310),
+    (SPRINGER, "springer_records.json", 1523),
+])
+def test_every_fixture_record_is_decoded(schema, name, total):
+    page = schema.decode(fixture(name))
+
+    assert (len(page.articles), page.skipped, page.total) == (10, 0, total)
+    assert all(article.title and article.link for article in page.articles)
+
+
+def test_arxiv_keeps_the_time_and_timezone():
+    article = ARXIV.decode(fixture("arxiv_atom.xml")).articles[0]
+
+    assert article.link == "http://arxiv.org/abs/2310.01234v1"
+    assert article.published == datetime(2023, 10, 2, 17, 59, 1, tzinfo=timezone.utc)
+
+
+@pytest.mark.parametrize("publication_date, expected", [
+    ("5-9 June 2023", datetime(2023, 6, 5)),
+    ("18-22 Sept. 2023", datetime(2023, 9, 18)),
+    ("1 Sept 2023", datetime(2023, 9, 1)),
+    ("Sept. 2023", datetime(2023, 9, 1)),
+    ("12 Jan. 2023", datetime(2023, 1, 12)),
+    # Sin fecha legible se usa el año
+    ("sometime", datetime(2021, 1, 1)),
+])
+def test_xplore_dates(publication_date, expected):
+    record = {"title": "t", "html_url": "u", "publication_date": publication_date, "publication_year": 2021}
+
+    page = XPLORE.decode(json.dumps({"articles": [record]}))
+
+    assert page.skipped == 0
+    assert page.articles[0].published == expected
+
+
+def test_records_without_a_required_field_are_skipped():
+    records = [{"title": "kept", "html_url": "u", "publication_year": 2021},
+               {"html_url": "u", "publication_year": 2021},
+               {"title": "no date", "html_url": "u", "publication_date": "sometime"}]
+
+    page = XPLORE.decode(json.dumps({"articles": records}))
+
+    assert [article.title for article in page.articles] == ["kept"]
+    assert page.skipped == 2
+
+
+def test_springer_links_to_the_doi_without_an_html_url():
+    record = {"title": "t", "publicationDate": "2023-10-02", "doi": "10.1007/x", "url": []}
+
+    page = SPRINGER.decode(json.dumps({"records": [record]}))
+
+    assert page.articles[0].link == "https://doi.org/10.1007/x"
+
+
+def test_field_uses_the_first_present_path_and_its_default():
+    field = path("a.b", "c", required=False, default="none")
+
+    assert field.read({"a": {"b": ""}, "c": "from c"}) == "from c"
+    assert field.read({}) == "none"
+    with pytest.raises(KeyError):
+        Field(("a",)).read({})
+
+
+def test_field_tries_the_next_path_when_conversion_fails():
+    field = path("a", "b", convert=int)
+
+    assert field.read({"a": "x", "b": "2"}) == 2
+    with pytest.raises(ValueError):
+        field.read({"a": "x", "b": "y"})
@@ -0,0 +1,104 @@
+import pytest
+
+from models.paper_model import Schedule
+from service.coordination import FileLeaseStore, ShardCoordinator, SqliteLeaseStore
+from service.schedule_store import SHARD_COUNT, ScheduleStore, next_fire_time
+
+NOW = 1_700_000_000.0
+
+
+def schedule(id: str, cron: str = "*/5 * * * *") -> Schedule:
+    return Schedule("papers", "discord", cron, ["ml"], id=id)
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = ScheduleStore(str(tmp_path / "schedules.db"))
+    yield store
+    store.close()
+
+
+def make_due(store: ScheduleStore, *schedules: Schedule, at: float = NOW - 60):
+    store.upsert_many(schedules)
+    with store.connection:
+        store.connection.executemany("UPDATE schedules SET next_fire_at = ? WHERE id = ?",
+                                     [(at, s.id) for s in schedules])
+
+
+def test_claim_advances_due_schedules_past_now(store):
+    make_due(store, schedule("a"), schedule("b"))
+
+    claimed = store.claim(store.due(NOW), now=NOW)
+
+    assert [s.id for s in claimed] == ["a", "b"]
+    assert store.due(NOW) == []
+    assert store.get("a").next_fire_at == next_fire_time("*/5 * * * *", NOW, "a")
+    assert store.get("a").next_fire_at > NOW
+
+
+def test_a_fire_time_is_claimed_only_once_across_connections(store, tmp_path):
+    make_due(store, schedule("a"))
+    other = ScheduleStore(str(tmp_path / "schedules.db"))
+    try:
+        due_here, due_there = store.due(NOW), other.due(NOW)
+
+        assert [s.id for s in store.claim(due_here, now=NOW)] == ["a"]
+        assert other.claim(due_there, now=NOW) == []
+    finally:
+        other.close()
+
+
+def test_claim_skips_schedules_not_yet_due(store):
+    make_due(store, schedule("late"), at=NOW + 60)
+
+    assert store.claim([schedule("late")], now=NOW) == []
+    assert store.get("late").next_fire_at == NOW + 60
+
+
+@pytest.fixture(params=["sqlite", "file"])
+def leases(request, tmp_path):
+    store = SqliteLeaseStore(str(tmp_path / "leases.db")) if request.param == "sqlite" else FileLeaseStore(str(tmp_path))
+    yield store
+    store.close()
+
+
+def test_lease_is_exclusive_until_it_expires(leases):
+    assert leases.acquire(["shard:1"], "w1", ttl=30, now=NOW) == {"shard:1"}
+    assert leases.acquire(["shard:1"], "w2", ttl=30, now=NOW + 10) == set()
+    # El dueño lo renueva
+    assert leases.acquire(["shard:1"], "w1", ttl=30, now=NOW + 20) == {"shard:1"}
+    assert leases.acquire(["shard:1"], "w2", ttl=30, now=NOW + 40) == set()
+    # Sin renovar, caduca y otro lo toma
+    assert leases.acquire(["shard:1"], "w2", ttl=30, now=NOW + 50) == {"shard:1"}
+
+
+def test_released_lease_can_be_taken_at_once(leases):
+    leases.acquire(["shard:1"], "w1", ttl=30, now=NOW)
+    leases.release(["shard:1"], "w2")
+    assert leases.acquire(["shard:1"], "w2", ttl=30, now=NOW) == set()
+    leases.release(["shard:1"], "w1")
+    assert leases.acquire(["shard:1"], "w2", ttl=30, now=NOW) == {"shard:1"}
+
+
+def test_workers_drop_out_when_their_heartbeat_expires(leases):
+    leases.heartbeat("w1", ttl=30, now=NOW)
+    leases.heartbeat("w2", ttl=30, now=NOW + 20)
+
+    assert leases.workers(NOW + 25) == ["w1", "w2"]
+    assert leases.workers(NOW + 35) == ["w2"]
+
+
+def test_replicas_split_the_shards_and_take_over_a_dead_one(leases):
+    first = ShardCoordinator(leases, "w1", lease_ttl=30)
+    second = ShardCoordinator(leases, "w2", lease_ttl=30)
+
+    first.tick(NOW)
+    second.tick(NOW)
+    # w1 suelta los shards que ahora son de w2 y w2 los toma
+    first.tick(NOW + 1)
+    second.tick(NOW + 1)
+    assert first.owned.isdisjoint(second.owned)
+    assert first.owned | second.owned == set(range(SHARD_COUNT))
+
+    # w1 deja de latir: sus leases caducan y w2 se queda con todo
+    assert second.tick(NOW + 40) == set(range(SHARD_COUNT))